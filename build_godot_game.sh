@@ -6,8 +6,19 @@ echo "  Godot Fighter - Build & Integration"
 echo "=========================================="
 echo ""
 
+REPO_DIR="$(cd "$(dirname "$0")" && pwd)"
+
+# Import changed pipeline outputs up front (sharded + cached) so the export
+# below finds .godot/imported already warm. The export still imports anything
+# this step could not handle, so a failure here is not fatal.
+if command -v python3 &> /dev/null; then
+    echo "Warming Godot import cache..."
+    (cd "$REPO_DIR" && python3 -m pipeline godot-import) || echo "⚠ Import stage failed, export will import instead"
+    echo ""
+fi
+
 # Change to godot_fighter directory
-cd "$(dirname "$0")/godot_fighter"
+cd "$REPO_DIR/godot_fighter"
 
 # Run the export script
 ./export_web.sh
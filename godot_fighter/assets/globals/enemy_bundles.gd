@@ -0,0 +1,110 @@
+class_name EnemyBundles
+extends Node
+
+# Loads per-enemy resource bundles built by `python3 -m pipeline bundle`.
+#
+# var bundles = EnemyBundles.new()
+# add_child(bundles)
+# await bundles.ensure(["ogrork_enemy"])
+# var scene = load("res://battle-manager/enemies/ogrork_enemy.tscn")
+#
+# Bundles of one encounter download in parallel and are kept in user://
+# under their content hash, so a returning player only downloads changed
+# enemies. Builds that still ship the enemies never download. That is every
+# build today: battle scenes instance their enemies directly and the Web
+# preset does not exclude them yet (see pipeline/README.md, `bundle`).
+
+signal bundles_ready(names: PackedStringArray)
+signal _download_finished
+
+const MANIFEST_FILE := "manifest.json"
+const CACHE_DIR := "user://bundles/"
+
+var base_url := "" # folder holding manifest.json; defaults to bundles/ next to the web page
+var manifest := {}
+var mounted := {}
+
+func _ready():
+	if base_url == "" and OS.has_feature("web"):
+		base_url = str(JavaScriptBridge.eval("new URL('bundles/', document.baseURI).href"))
+	DirAccess.make_dir_recursive_absolute(CACHE_DIR)
+
+func fetch_manifest() -> bool:
+	var request := HTTPRequest.new()
+	add_child(request)
+	request.request(base_url + MANIFEST_FILE)
+	var response = await request.request_completed # [result, code, headers, body]
+	request.queue_free()
+	if response[0] != HTTPRequest.RESULT_SUCCESS or response[1] != 200:
+		push_warning("EnemyBundles: no manifest at %s" % base_url)
+		return false
+	var data = JSON.parse_string(response[3].get_string_from_utf8())
+	manifest = data.get("bundles", {}) if data is Dictionary else {}
+	return true
+
+# Make the scenes of the named bundles loadable; returns the names that failed.
+func ensure(names: Array) -> PackedStringArray:
+	var failed := PackedStringArray()
+	var downloads := {}
+	var results := {} # bundle name -> downloaded ok, filled as each request completes
+	for bundle_name in names:
+		if mounted.has(bundle_name):
+			continue
+		if manifest.is_empty() and not ResourceLoader.exists(_scene_path(bundle_name)):
+			await fetch_manifest()
+		if not manifest.has(bundle_name):
+			if not ResourceLoader.exists(_scene_path(bundle_name)):
+				failed.append(bundle_name)
+			continue
+		var path := CACHE_DIR + manifest[bundle_name]["file"]
+		if not _is_valid(bundle_name, path):
+			downloads[bundle_name] = _download(bundle_name, manifest[bundle_name]["file"], path, results)
+	# Downloads finish in any order; awaiting each request in turn would miss
+	# the ones that completed while an earlier one was awaited.
+	while results.size() < downloads.size():
+		await _download_finished
+	for request in downloads.values():
+		request.queue_free()
+	for bundle_name in names:
+		if mounted.has(bundle_name) or not manifest.has(bundle_name):
+			continue
+		var path := CACHE_DIR + manifest[bundle_name]["file"]
+		if results.get(bundle_name, true) and _is_valid(bundle_name, path) \
+				and ProjectSettings.load_resource_pack(path, false):
+			mounted[bundle_name] = path
+		else:
+			failed.append(bundle_name)
+	_remove_stale()
+	bundles_ready.emit(PackedStringArray(mounted.keys()))
+	return failed
+
+func _scene_path(bundle_name: String) -> String:
+	if manifest.has(bundle_name):
+		return manifest[bundle_name]["scene"]
+	return "res://battle-manager/enemies/%s.tscn" % bundle_name
+
+func _download(bundle_name: String, file: String, path: String, results: Dictionary) -> HTTPRequest:
+	var request := HTTPRequest.new()
+	add_child(request)
+	request.download_file = path
+	request.request_completed.connect(_on_download_completed.bind(bundle_name, results), CONNECT_ONE_SHOT)
+	if request.request(base_url + file) != OK:
+		results[bundle_name] = false # never completes
+	return request
+
+func _on_download_completed(result: int, code: int, _headers, _body, bundle_name: String, results: Dictionary):
+	results[bundle_name] = result == HTTPRequest.RESULT_SUCCESS and code == 200
+	_download_finished.emit()
+
+func _is_valid(bundle_name: String, path: String) -> bool:
+	return FileAccess.file_exists(path) and FileAccess.get_sha256(path) == manifest[bundle_name]["sha256"]
+
+func _remove_stale():
+	if manifest.is_empty():
+		return
+	var current := {}
+	for bundle_name in manifest:
+		current[manifest[bundle_name]["file"]] = true
+	for file in DirAccess.get_files_at(CACHE_DIR):
+		if not current.has(file):
+			DirAccess.remove_absolute(CACHE_DIR + file)
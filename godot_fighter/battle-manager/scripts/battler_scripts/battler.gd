@@ -83,6 +83,10 @@ var is_default_target: bool = false
 var is_keyboard_selected: bool = false  # Track if selected via keyboard
 var is_mouse_selected: bool = false    # Track if selected via mouse
 
+# Per-bone areas from `python3 -m pipeline hit-volumes` hover like the battler's own Area3D.
+# Adjacent limbs overlap, so hover ends only when the pointer has left all of them.
+var _hovered_volumes: int = 0
+
 func _update_highlight() -> void:
 	if !is_selectable or !is_valid_target:
 		material.next_pass = null
@@ -189,6 +193,8 @@ func _ready():
 
 	print("Groups after assignment: ", get_groups())
 
+	_connect_hit_volumes()
+
 	if stats:
 		print("Current Element: ", stats.element)
 	else:
@@ -222,6 +228,29 @@ func _mouse_exit() -> void:
 	print("=== MOUSE EXIT DEBUG ===")
 	print("Battler: ", character_name)
 	has_hover(false)
+
+func _connect_hit_volumes() -> void:
+	for area in find_children("*", "Area3D", true, false):
+		if area.is_in_group("hit_volumes"):
+			area.mouse_entered.connect(_hit_volume_entered)
+			area.mouse_exited.connect(_hit_volume_exited)
+
+func _hit_volume_entered() -> void:
+	_hovered_volumes += 1
+	if _hovered_volumes == 1:
+		_mouse_enter()
+
+func _hit_volume_exited() -> void:
+	_hovered_volumes = max(_hovered_volumes - 1, 0)
+	if _hovered_volumes == 0:
+		_mouse_exit()
+
+## The bone whose hit volume a ray or shape query hit, or "" for the battler's own shapes.
+func hit_bone(collider: Object) -> String:
+	if collider is Area3D and collider.is_in_group("hit_volumes"):
+		return collider.get_meta("bone", "")
+	return ""
+
 func has_hover(hover:bool = false) -> void:
 	# Only allow hover if this battler is a valid target
 	if hover and !is_valid_target:
@@ -0,0 +1,6 @@
+"""Asset pipeline for generated enemies.
+
+Stages run either as plain Python (hashing, publishing, GLB analysis) or
+inside Blender / Godot subprocesses. Run ``python -m pipeline --help`` from
+the repository root for the available commands.
+"""
@@ -0,0 +1,48 @@
+import argparse
+import sys
+
+from . import (actions, anim_library, bake_ao, batch, budget, cleanup, deform_check, enemy_atlas, fanout,
+               godot_import, hit_volumes, in_place, portraits, publish, rig, runtime_bench, split_anims, vat, watch,
+               web_bundles)
+from .errors import PipelineError
+
+# Each command module exposes register(subparsers) and a main(args) handler.
+COMMANDS = [
+    godot_import,
+    rig,
+    batch,
+    publish,
+    watch,
+    vat,
+    portraits,
+    deform_check,
+    enemy_atlas,
+    anim_library,
+    cleanup,
+    budget,
+    split_anims,
+    in_place,
+    actions,
+    fanout,
+    runtime_bench,
+    web_bundles,
+    bake_ao,
+    hit_volumes,
+]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline", description="Enemy asset pipeline")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for module in COMMANDS:
+        module.register(subparsers)
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except PipelineError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
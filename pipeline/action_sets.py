@@ -0,0 +1,80 @@
+"""Action sets: named, ordered lists of action generators, with stable cache keys.
+
+A set is a list of specs, each ``{"name", "generator", "params"}``:
+
+* ``keys``  keyframe tables, ``params = {"bones": {bone: {path: [[frame,
+  value...], ...]}}}`` where ``path`` is a pose-bone property
+  (``location``, ``rotation_quaternion``, ``scale``...)
+* ``clip``  the action of another file, ``params = {"source": path}``
+  (.fbx/.glb clip on the same skeleton)
+
+Sets come from ``ACTION_SETS`` or from a JSON file holding such a list.
+``spec_key`` hashes the generator, its parameters and, for clips, the
+source bytes: an action whose key is unchanged is reused, not re-baked.
+"""
+
+import json
+import math
+from pathlib import Path
+
+from .cache import file_digest, make_key
+from .errors import PipelineError
+
+GENERATORS = ("keys", "clip")
+# Bump when the way the Blender stage bakes a generator changes.
+GENERATOR_VERSION = 1
+
+
+def _x_rotation(frame, angle):
+    return [frame, math.cos(angle / 2), math.sin(angle / 2), 0.0, 0.0]
+
+
+def _breathing(name):
+    # 60 frames: rise 2 cm and swell 1% at the midpoint.
+    return {"name": name, "generator": "keys", "params": {"bones": {"Root": {
+        "location": [[0, 0, 0, 0], [30, 0, 0, 0.02], [60, 0, 0, 0]],
+        "rotation_quaternion": [[0, 1, 0, 0, 0]],
+        "scale": [[0, 1, 1, 1], [30, 1, 1, 1.01], [60, 1, 1, 1]],
+    }}}}
+
+
+# The clips of create_ogrork_animations.py, with its X tilts as quaternions
+# (the pose bones rotate in quaternion mode, so Euler keys had no effect).
+ACTION_SETS = {
+    "ogrork": [
+        _breathing("idle"),
+        {"name": "attack", "generator": "keys", "params": {"bones": {"Root": {
+            # Lean back, lunge forward, recover.
+            "location": [[0, 0, 0, 0], [10, 0, -0.2, 0], [15, 0, 0.3, 0], [25, 0, 0, 0], [30, 0, 0, 0]],
+            "rotation_quaternion": [_x_rotation(0, 0.0), _x_rotation(10, -0.15), _x_rotation(15, 0.2),
+                                    _x_rotation(25, 0.0), _x_rotation(30, 0.0)],
+            "scale": [[0, 1, 1, 1], [15, 1.1, 1.1, 1.0], [25, 1, 1, 1], [30, 1, 1, 1]],
+        }}}},
+        _breathing("battle_idle"),
+    ],
+}
+
+
+def load_action_set(name_or_path):
+    """Validated specs of a built-in set or a JSON file, in their given order."""
+    if name_or_path in ACTION_SETS:
+        specs = ACTION_SETS[name_or_path]
+    else:
+        try:
+            specs = json.loads(Path(name_or_path).read_text())
+        except (OSError, ValueError) as exc:
+            raise PipelineError(f"unknown action set {name_or_path!r} (built-in: {sorted(ACTION_SETS)}): {exc}")
+    names = [spec.get("name") for spec in specs]
+    if len(set(names)) != len(names) or not all(names):
+        raise PipelineError(f"action set {name_or_path!r} needs unique, non-empty action names")
+    for spec in specs:
+        if spec.get("generator") not in GENERATORS:
+            raise PipelineError(f"action {spec['name']!r}: generator must be one of {GENERATORS}")
+    return specs
+
+
+def spec_key(spec):
+    inputs = {}
+    if spec["generator"] == "clip":
+        inputs["source"] = file_digest(spec["params"]["source"])
+    return make_key("actions", GENERATOR_VERSION, spec["name"], spec["generator"], spec["params"], inputs)
@@ -0,0 +1,88 @@
+"""Build an action set on a rigged model and export all of it in one pass.
+
+    python3 -m pipeline actions assets/Ogrork_Goblimp_rigged.glb --set ogrork --publish
+    python3 -m pipeline actions model.glb --set my_actions.json
+
+Replaces the action swapping in ``create_ogrork_animations.py``. The set's
+actions become NLA tracks in set order, and exactly those clips are
+exported. Each baked action is cached as a one-action .blend library under
+its spec key (see ``pipeline.action_sets``), so a re-run bakes only the
+actions whose generator parameters changed.
+"""
+
+from pathlib import Path
+
+from .action_sets import load_action_set, spec_key
+from .blender_runner import run_stage
+from .cache import StageCache
+from .publish import STAGING_DIR, publish
+from .report import Report
+
+STAGE = "actions"
+
+
+def plan(specs, cache, bake_dir):
+    """Specs with a ``blend`` path (cached entry or fresh bake target) and their keys.
+
+    ``cache`` None bakes everything.
+    """
+    planned, keys = [], {}
+    for spec in specs:
+        spec = dict(spec)
+        if spec["generator"] == "clip":
+            spec["params"] = {**spec["params"], "source": str(Path(spec["params"]["source"]).resolve())}
+        key = keys[spec["name"]] = spec_key(spec)
+        entry = cache.get(key) if cache else None
+        spec["blend"] = str(entry / f"{spec['name']}.blend" if entry else bake_dir / f"{spec['name']}.blend")
+        planned.append(spec)
+    return planned, keys
+
+
+def build(source, action_set, output=None, keep_existing=False, use_cache=True, report=None):
+    report = report or Report(STAGE)
+    source = Path(source).resolve()
+    output = Path(output or STAGING_DIR / STAGE / f"{source.stem}.glb")
+    bake_dir = STAGING_DIR / STAGE / "baked" / source.stem
+    cache = StageCache(STAGE)
+    specs, keys = plan(load_action_set(action_set), cache if use_cache else None, bake_dir)
+    for spec in specs:
+        # A stale bake from an earlier run must not pass for this one.
+        if Path(spec["blend"]).parent == bake_dir:
+            Path(spec["blend"]).unlink(missing_ok=True)
+
+    job = {"source": str(source), "output": str(output), "actions": specs, "keep_existing": keep_existing}
+    with report.timed(STAGE, source.name) as entry:
+        result = run_stage(STAGE, job)
+        if not result["ok"]:
+            entry["status"] = "failed"
+            print(result["error"])
+            return result
+        for name in result["baked"]:
+            blend = bake_dir / f"{name}.blend"
+            cache.put(keys[name], {blend.name: blend}, meta={"action": name, "set": str(action_set)})
+        entry.update(actions=len(result["actions"]), baked=len(result["baked"]), reused=len(result["reused"]))
+    return result
+
+
+def register(subparsers):
+    p = subparsers.add_parser("actions", help="bake an action set as NLA tracks and export it in one pass")
+    p.add_argument("source", type=Path, help="rigged .glb")
+    p.add_argument("--set", dest="action_set", required=True,
+                   help="built-in action set name or JSON file of action specs")
+    p.add_argument("-o", "--output", type=Path, help="output .glb (default: staging/actions/<source stem>.glb)")
+    p.add_argument("--keep-existing", action="store_true", help="also export the source's own actions")
+    p.add_argument("--no-cache", action="store_true", help="re-bake every action")
+    p.add_argument("--publish", action="store_true", help="publish into battle-manager/enemies if changed")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    result = build(args.source, args.action_set, args.output, args.keep_existing, not args.no_cache, report)
+    if result["ok"]:
+        print(f"Actions: {', '.join(result['actions'])} (baked: {', '.join(result['baked']) or 'none'})")
+        if args.publish:
+            publish([result["output"]], report=report)
+    report.print_summary()
+    report.write()
+    return 0 if result["ok"] else 1
@@ -0,0 +1,66 @@
+"""Process-pool geometry analysis over shared-memory mesh arrays.
+
+A Blender stage publishes its arrays with ``pipeline.shm.share``. The
+functions here split the vertex range into chunks, and each pool process
+attaches to the same blocks by name and writes its rows of the output
+blocks in place. Only manifests and chunk bounds cross process boundaries.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from . import shm, weights
+
+# Below this many vertices the pool start-up costs more than it saves.
+MIN_CHUNK = 20000
+
+
+def chunk_bounds(count, workers, min_chunk=MIN_CHUNK):
+    parts = max(1, min(workers, count // min_chunk))
+    edges = np.linspace(0, count, parts + 1).astype(int)
+    return list(zip(edges[:-1].tolist(), edges[1:].tolist()))
+
+
+def map_chunks(fn, manifest, count, *args, workers=None):
+    """Run ``fn(manifest, start, stop, *args)`` over vertex chunks in a process pool.
+
+    A single chunk runs in-process. Returns the per-chunk results in order.
+    """
+    workers = workers or os.cpu_count() or 1
+    bounds = chunk_bounds(count, workers)
+    if len(bounds) == 1:
+        return [fn(manifest, 0, count, *args)]
+    with ProcessPoolExecutor(max_workers=len(bounds)) as pool:
+        futures = [pool.submit(fn, manifest, start, stop, *args) for start, stop in bounds]
+        return [f.result() for f in futures]
+
+
+def _weights_chunk(manifest, start, stop, heads, tails, scale):
+    with shm.attach(manifest) as arrays:
+        idx, w = weights.bone_segment_weights(arrays["positions"][start:stop], heads, tails, scale=scale)
+        arrays["indices"][start:stop] = idx
+        arrays["weights"][start:stop] = w
+    return stop - start
+
+
+def solve_weights(manifest, heads, tails, workers=None):
+    """Bone-segment weights of the shared ``positions`` array.
+
+    Returns a new manifest holding ``indices`` and ``weights`` (V, k); the
+    caller releases it.
+    """
+    with shm.attach({"positions": manifest["positions"]}) as arrays:
+        positions = arrays["positions"]
+        count = len(positions)
+        scale = max(float(np.ptp(positions, axis=0).max()), 1e-6)
+    k = min(weights.MAX_INFLUENCES, len(heads))
+    out = shm.allocate({"indices": ((count, k), np.int32), "weights": ((count, k), np.float32)})
+    try:
+        map_chunks(_weights_chunk, {"positions": manifest["positions"], **out}, count,
+                   np.asarray(heads), np.asarray(tails), scale, workers=workers)
+    except BaseException:
+        shm.release(out)
+        raise
+    return out
@@ -0,0 +1,307 @@
+"""Compile glTF clips into shared Godot AnimationLibrary resources, without Blender.
+
+Clips are read straight from rigged/animated GLBs and from the clip GLBs
+that ``watch`` makes out of FBX files. Tracks are normalised (quaternion
+hemispheres, cubic splines baked to linear keys, constant tracks collapsed
+to one key, redundant linear keys and repeated STEP keys dropped) and hashed. A clip whose tracks match in two or more characters
+goes into one shared library; the rest go into a per-character library.
+"""
+
+import hashlib
+import json
+import re
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from .config import GODOT_PROJECT
+from .gltf import Gltf
+from .publish import STAGING_DIR, publish
+from .report import Report
+from .rig import enemy_name
+
+STAGE = "anim_library"
+LIBRARY_DIR = GODOT_PROJECT / "animations" / "library"
+SKELETON_PATH = "%GeneralSkeleton"
+# glTF channel path: (Godot track type, components, reduction tolerance)
+TRACK_TYPES = {
+    "translation": ("position_3d", 3, 1e-3),
+    "rotation": ("rotation_3d", 4, 1e-4),
+    "scale": ("scale_3d", 3, 1e-3),
+}
+INTERPOLATION = {"STEP": 0, "LINEAR": 1, "CUBICSPLINE": 1}
+# Cubic splines are baked to linear keys at this rate (Godot's import default), then reduced.
+SPLINE_FPS = 30
+HASH_QUANTUM = 1e-5
+# Same rule as Godot's scene importer: "*loop" / "*cycle" clips loop.
+LOOP_RE = re.compile(r"(loop|cycle)$", re.IGNORECASE)
+BONE_NAME_RE = re.compile(r"[:/]")
+
+
+@dataclass
+class Track:
+    kind: str
+    bone: str
+    interp: int
+    times: np.ndarray
+    values: np.ndarray
+
+    @property
+    def digest(self):
+        h = hashlib.sha1(f"{self.kind}|{self.bone}|{self.interp}".encode())
+        h.update(np.round(self.times / HASH_QUANTUM).astype(np.int64).tobytes())
+        h.update(np.round(self.values / HASH_QUANTUM).astype(np.int64).tobytes())
+        return h.hexdigest()
+
+
+@dataclass
+class Clip:
+    name: str
+    source: str
+    length: float
+    tracks: list
+
+    @property
+    def digest(self):
+        h = hashlib.sha1(repr(round(self.length, 4)).encode())
+        for digest in sorted(t.digest for t in self.tracks):
+            h.update(digest.encode())
+        return h.hexdigest()
+
+
+def continuous_quaternions(values):
+    """Flip signs so consecutive quaternions lie in the same hemisphere."""
+    dots = np.einsum("ij,ij->i", values[1:], values[:-1])
+    signs = np.concatenate([[1.0], np.cumprod(np.where(dots < 0, -1.0, 1.0))])
+    return values * signs[:, None]
+
+
+def sample_cubic_spline(times, triplets, fps=SPLINE_FPS):
+    """Linear keys of a glTF CUBICSPLINE sampler, at its own keys and every 1/``fps`` s.
+
+    ``triplets`` is (in-tangent, value, out-tangent) per key.
+    """
+    tangents_in, values, tangents_out = triplets[0::3], triplets[1::3], triplets[2::3]
+    if len(times) < 2:
+        return times, values
+    grid = np.union1d(times, np.arange(times[0], times[-1], 1.0 / fps))
+    k = np.clip(np.searchsorted(times, grid, side="right") - 1, 0, len(times) - 2)
+    span = times[k + 1] - times[k]
+    s = ((grid - times[k]) / span)[:, None]
+    s2, s3 = s * s, s * s * s
+    out = ((2 * s3 - 3 * s2 + 1) * values[k] + (s3 - 2 * s2 + s) * span[:, None] * tangents_out[k]
+           + (-2 * s3 + 3 * s2) * values[k + 1] + (s3 - s2) * span[:, None] * tangents_in[k + 1])
+    return grid, out
+
+
+def reduce_keys(times, values, tolerance):
+    """Drop keys that linear interpolation of the kept keys reproduces within ``tolerance``."""
+    if np.all(np.abs(values - values[0]) <= tolerance):
+        return times[:1], values[:1]
+    if len(times) <= 2:
+        return times, values
+    keep = [0]
+    anchor = 0
+    for end in range(2, len(times)):
+        span = slice(anchor + 1, end)
+        t = (times[span] - times[anchor]) / max(times[end] - times[anchor], 1e-9)
+        lerp = values[anchor] + t[:, None] * (values[end] - values[anchor])
+        if np.abs(lerp - values[span]).max() > tolerance:
+            anchor = end - 1
+            keep.append(anchor)
+    keep.append(len(times) - 1)
+    return times[keep], values[keep]
+
+
+def reduce_step_keys(times, values):
+    """Drop STEP keys that repeat the previous value exactly; interpolation would change them."""
+    if len(times) <= 1:
+        return times, values
+    keep = np.concatenate([[True], np.any(values[1:] != values[:-1], axis=1)])
+    return times[keep], values[keep]
+
+
+def rest_values(node, path):
+    return np.asarray(node.get(path, {"translation": [0, 0, 0], "rotation": [0, 0, 0, 1],
+                                      "scale": [1, 1, 1]}[path]), dtype=np.float64)
+
+
+def read_clips(path, lossless=False):
+    """Clips of one glTF file; returns (clips, skipped channel count).
+
+    Only joint (bone) channels are kept; object-level animation has no
+    equivalent on a shared skeleton.
+    """
+    gltf = Gltf(path)
+    nodes = gltf.items("nodes")
+    names = gltf.node_names()
+    joints = set(gltf.joint_nodes())
+    # Split clip packs (see split_anims) belong to the character they came from.
+    character = enemy_name(path).replace("_rigged", "").replace("_clips", "")
+    clips, skipped = [], 0
+    for i, anim in enumerate(gltf.items("animations")):
+        tracks, length = [], 0.0
+        for channel in anim["channels"]:
+            target = channel["target"]
+            node, path_name = target.get("node"), target["path"]
+            if node not in joints or path_name not in TRACK_TYPES:
+                skipped += 1
+                continue
+            kind, width, tolerance = TRACK_TYPES[path_name]
+            sampler = anim["samplers"][channel["sampler"]]
+            interpolation = sampler.get("interpolation", "LINEAR")
+            times = gltf.accessor(sampler["input"])[:, 0].astype(np.float64)
+            values = gltf.accessor(sampler["output"]).astype(np.float64).reshape(-1, width)
+            if interpolation == "CUBICSPLINE":
+                # Godot plays the track linearly: bake the curve rather than drop its tangents.
+                times, values = sample_cubic_spline(times, values)
+                if kind == "rotation_3d":
+                    values /= np.linalg.norm(values, axis=1, keepdims=True)
+            if kind == "rotation_3d":
+                values = continuous_quaternions(values)
+            length = max(length, float(times[-1]) if len(times) else 0.0)
+            if not lossless:
+                if interpolation == "STEP":
+                    times, values = reduce_step_keys(times, values)
+                else:
+                    times, values = reduce_keys(times, values, tolerance)
+                if len(times) == 1 and np.allclose(values[0], rest_values(nodes[node], path_name),
+                                                   atol=tolerance):
+                    continue  # Constant at the rest pose: the skeleton already has it.
+            bone = BONE_NAME_RE.sub("_", names[node])
+            tracks.append(Track(kind, bone, INTERPOLATION[interpolation], times, values))
+        tracks.sort(key=lambda t: (t.bone, t.kind))
+        clips.append(Clip(anim.get("name", f"animation_{i}"), character, length or 1 / 30, tracks))
+    return clips, skipped
+
+
+def format_floats(values):
+    return ", ".join(f"{v:.7g}" for v in values)
+
+
+def animation_resource(resource_id, clip, skeleton_path):
+    lines = [f'[sub_resource type="Animation" id="{resource_id}"]',
+             f'resource_name = "{clip.name}"',
+             f"length = {clip.length:.7g}"]
+    if LOOP_RE.search(clip.name):
+        lines.append("loop_mode = 1")
+    for i, track in enumerate(clip.tracks):
+        keys = np.column_stack([track.times, np.ones(len(track.times)), track.values])
+        prefix = f"tracks/{i}/"
+        lines += [
+            f'{prefix}type = "{track.kind}"',
+            f"{prefix}imported = true",
+            f"{prefix}enabled = true",
+            f'{prefix}path = NodePath("{skeleton_path}:{track.bone}")',
+            f"{prefix}interp = {track.interp}",
+            f"{prefix}loop_wrap = true",
+            f"{prefix}keys = PackedFloat32Array({format_floats(keys.ravel())})",
+        ]
+    return "\n".join(lines)
+
+
+def library_resource(entries, skeleton_path):
+    """``.tres`` text of an AnimationLibrary; ``entries`` is [(names, clip)].
+
+    A clip listed under several names is stored once.
+    """
+    blocks = [f'[gd_resource type="AnimationLibrary" load_steps={len(entries) + 1} format=3]']
+    data = []
+    for i, (names, clip) in enumerate(entries):
+        resource_id = f"Animation_{i}"
+        blocks.append(animation_resource(resource_id, clip, skeleton_path))
+        data += [f'&"{name}": SubResource("{resource_id}")' for name in names]
+    blocks.append("[resource]\n_data = {\n" + ",\n".join(data) + "\n}")
+    return "\n\n".join(blocks) + "\n"
+
+
+def plan_libraries(clips, min_share=2):
+    """Split clips into (shared entries, {character: entries}) by content.
+
+    Entries are [(names, clip)]. Content shared by at least ``min_share``
+    characters goes into the shared library, under every name it was seen
+    with; a name used by different content there is suffixed with the
+    character that owns that version.
+    """
+    by_digest = defaultdict(list)
+    for clip in clips:
+        by_digest[clip.digest].append(clip)
+    shared, own = [], defaultdict(list)
+    for group in by_digest.values():
+        characters = {c.source for c in group}
+        names = sorted({c.name for c in group})
+        if len(characters) >= min_share:
+            shared.append((names, group[0]))
+        else:
+            own[group[0].source].append((names, group[0]))
+    taken = defaultdict(int)
+    for names, _ in shared:
+        for name in names:
+            taken[name] += 1
+    shared = [([n if taken[n] == 1 else f"{n}@{clip.source}" for n in names], clip) for names, clip in shared]
+    return sorted(shared, key=lambda e: e[0][0]), {k: sorted(v, key=lambda e: e[0][0]) for k, v in own.items()}
+
+
+def compile_libraries(sources, name="Shared-Library", skeleton_path=SKELETON_PATH, lossless=False,
+                      out_dir=None, report=None):
+    report = report or Report(STAGE)
+    out_dir = Path(out_dir or STAGING_DIR / STAGE)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    clips = []
+    for source in map(Path, sources):
+        with report.timed("read", source.name) as entry:
+            found, skipped = read_clips(source, lossless)
+            clips += found
+            entry.update(clips=len(found), tracks=sum(len(c.tracks) for c in found), skipped_channels=skipped)
+
+    with report.timed(STAGE, name) as entry:
+        shared, own = plan_libraries(clips)
+        files, index = [], {"shared": None, "characters": {}}
+        if shared:
+            path = out_dir / f"{name}.tres"
+            path.write_text(library_resource(shared, skeleton_path))
+            files.append(path)
+            index["shared"] = {"file": path.name, "clips": sorted(n for names, _ in shared for n in names)}
+        for character in sorted({c.source for c in clips}):
+            libraries = [index["shared"]["file"]] if shared else []
+            entries = own.get(character, [])
+            if entries:
+                path = out_dir / f"{character}-Library.tres"
+                path.write_text(library_resource(entries, skeleton_path))
+                files.append(path)
+                libraries.append(path.name)
+            index["characters"][character] = {"libraries": libraries}
+        index_path = out_dir / "libraries.json"
+        index_path.write_text(json.dumps(index, indent=2))
+        files.append(index_path)
+
+        tracks = [t for c in clips for t in c.tracks]
+        written = [t for _, c in shared for t in c.tracks] + [t for e in own.values() for _, c in e for t in c.tracks]
+        entry.update(clips=len(clips), shared_clips=len(shared), tracks=len(tracks),
+                     unique_tracks=len({t.digest for t in tracks}), written_tracks=len(written),
+                     keys=sum(len(t.times) for t in written),
+                     bytes=sum(f.stat().st_size for f in files))
+    return files
+
+
+def register(subparsers):
+    p = subparsers.add_parser("anim-library", help="compile GLB clips into shared Godot AnimationLibrary files")
+    p.add_argument("sources", nargs="+", type=Path, help="animated .glb/.gltf files (one per character)")
+    p.add_argument("--name", default="Shared-Library", help="shared library basename")
+    p.add_argument("--skeleton-path", default=SKELETON_PATH,
+                   help="node path of the Skeleton3D relative to the AnimationPlayer root")
+    p.add_argument("--lossless", action="store_true", help="keep every key and every constant track")
+    p.add_argument("--publish", action="store_true", help=f"publish into {LIBRARY_DIR}")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    files = compile_libraries(args.sources, args.name, args.skeleton_path, args.lossless, report=report)
+    if args.publish:
+        publish(files, LIBRARY_DIR, report=report)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
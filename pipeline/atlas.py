@@ -0,0 +1,136 @@
+"""Texture atlas packing and UV remapping on plain NumPy arrays.
+
+Rectangles use Blender's image convention: (x, y) counts pixels from the
+bottom-left corner, and UV (0, 0) is the bottom-left of the image.
+"""
+
+import struct
+
+import numpy as np
+
+MAX_ATLAS_SIZE = 8192
+# Quality used when no source tells us one (lossy WebP stores none).
+DEFAULT_QUALITY = 90
+# libjpeg's quality-50 luminance table (ITU T.81 Annex K); encoders scale it by quality.
+JPEG_LUMINANCE_SUM = sum((
+    16, 11, 10, 16, 24, 40, 51, 61, 12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56, 14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77, 24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101, 72, 92, 95, 98, 112, 100, 103, 99,
+))
+
+
+def shelf_pack(sizes, width):
+    """Place (w, h) rectangles on shelves across a ``width``-wide strip.
+
+    The tallest rectangles go first. Returns ([(x, y)] in input order, used
+    height); the used height is ``None`` if a rectangle is wider than the strip.
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf = 0
+    for i in order:
+        w, h = sizes[i]
+        if w > width:
+            return positions, None
+        if x + w > width:
+            x, y, shelf = 0, y + shelf, 0
+        positions[i] = (x, y)
+        x += w
+        shelf = max(shelf, h)
+    return positions, y + shelf
+
+
+def atlas_layout(sizes, padding=8, max_size=MAX_ATLAS_SIZE):
+    """Smallest power-of-two atlas that holds every (w, h) image plus padding.
+
+    Padding only separates images; along the atlas border it is dropped.
+    Returns ((width, height), rects), with rects[i] = (x, y, w, h) the area
+    of image i. Raises ValueError if nothing up to ``max_size`` square fits.
+    """
+    padded = [(w + 2 * padding, h + 2 * padding) for w, h in sizes]
+    best = None
+    width = 1 << max(0, (max(w for w, _ in sizes) - 1).bit_length())
+    while width <= max_size:
+        positions, used = shelf_pack(padded, width + 2 * padding)
+        if used is not None and used - 2 * padding <= max_size:
+            height = 1 << max(0, (used - 2 * padding - 1).bit_length())
+            if best is None or width * height < best[0][0] * best[0][1]:
+                best = (width, height), positions
+        width *= 2
+    if best is None:
+        raise ValueError(f"{len(sizes)} image(s) do not fit a {max_size}px atlas; lower the texel scale")
+    size, positions = best
+    return size, [(x, y, w, h) for (x, y), (w, h) in zip(positions, sizes)]
+
+
+def blit(atlas, image, rect, padding):
+    """Copy ``image`` (h, w, C) into ``rect`` and extend its edges into the padding.
+
+    The padding stops neighbouring textures bleeding into each other when
+    mipmaps are generated.
+    """
+    x, y, w, h = rect
+    p = min(padding, x, y, atlas.shape[1] - x - w, atlas.shape[0] - y - h)
+    atlas[y - p:y + h + p, x - p:x + w + p] = np.pad(image, ((p, p), (p, p), (0, 0)), mode="edge")
+
+
+def remap_transforms(rects, atlas_size):
+    """Per-rect (scale, offset) arrays, both (N, 2), mapping image UVs to atlas UVs."""
+    rects = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+    size = np.asarray(atlas_size, dtype=np.float64)
+    return rects[:, 2:] / size, rects[:, :2] / size
+
+
+def remap_uvs(uv, slot, scale, offset):
+    """Map loop UVs (L, 2) into the atlas in one pass.
+
+    ``slot`` (L,) selects the row of ``scale``/``offset`` for each loop, and
+    -1 leaves the loop unchanged. UVs are clamped to [0, 1] first, because
+    tiling cannot survive inside an atlas.
+    """
+    uv = np.asarray(uv, dtype=np.float64)
+    mapped = slot >= 0
+    s = slot[mapped]
+    out = uv.copy()
+    out[mapped] = np.clip(uv[mapped], 0.0, 1.0) * scale[s] + offset[s]
+    return out
+
+
+def jpeg_quality(data):
+    """libjpeg quality (1-100) a JPEG was saved at, from its luminance table; None if not found."""
+    data = bytes(data)
+    if data[:2] != b"\xff\xd8":
+        return None
+    i = 2
+    while i + 4 <= len(data) and data[i] == 0xFF:
+        marker = data[i + 1]
+        length = struct.unpack_from(">H", data, i + 2)[0]
+        if marker == 0xDA:  # start of scan: the tables come before it
+            break
+        pos, end = i + 4, i + 2 + length
+        while marker == 0xDB and pos < end:
+            wide, table = data[pos] >> 4, data[pos] & 15
+            dtype = ">u2" if wide else "u1"
+            values = np.frombuffer(data, dtype=dtype, count=64, offset=pos + 1)
+            if table == 0:
+                scale = 100.0 * int(values.sum()) / JPEG_LUMINANCE_SUM
+                quality = 5000.0 / scale if scale > 100 else (200.0 - scale) / 2
+                return int(np.clip(round(quality), 1, 100))
+            pos += 1 + 64 * (2 if wide else 1)
+        i += 2 + length
+    return None
+
+
+def atlas_format(sources):
+    """(Blender file format, quality) for an atlas of [(file format, bytes)] sources.
+
+    Lossless sources keep the atlas lossless (PNG). Otherwise the atlas is
+    JPEG, or WebP if any source is WebP, at the highest quality a JPEG source
+    was saved at, so packing does not add a lossless-sized image to the build.
+    """
+    formats = {fmt for fmt, _ in sources}
+    if formats - {'JPEG', 'WEBP'} or any(fmt == 'WEBP' and data[12:16] == b"VP8L" for fmt, data in sources):
+        return 'PNG', None
+    qualities = [q for q in (jpeg_quality(data) for fmt, data in sources if fmt == 'JPEG') if q]
+    return ('WEBP' if 'WEBP' in formats else 'JPEG'), max(qualities, default=DEFAULT_QUALITY)
@@ -0,0 +1,105 @@
+"""Bake ambient occlusion into the vertex colors of rigged models (see pipeline.occlusion).
+
+    python3 -m pipeline bake-ao assets/Ogrork_Goblimp_rigged.glb --publish
+    python3 -m pipeline bake-ao model.glb --rays 64 --distance 0.1 -j 4
+
+Blender only shares the mesh arrays and writes the colors back; the rays
+are marched outside it in a process pool. The output keeps the file name
+and lands in the staging area. Results are cached on the source hash, the
+bake settings and the code that produced them.
+"""
+
+import json
+from pathlib import Path
+
+from . import occlusion, shm
+from .blender_runner import run_stage
+from .cache import StageCache, file_digest, make_key
+from .config import ENEMIES_DIR
+from .errors import PipelineError
+from .publish import STAGING_DIR, publish
+from .report import Report
+
+STAGE = "ao"
+STAGE_SCRIPT = Path(__file__).parent / "blender" / "ao.py"
+
+
+def cache_key(source, settings):
+    return make_key(STAGE, file_digest(source), settings, file_digest(STAGE_SCRIPT), file_digest(occlusion.__file__))
+
+
+def bake_outside(source, settings, workers, report):
+    """Occlusion of ``source``'s vertices; returns a shm manifest to release."""
+    with report.timed("arrays", source.name) as entry:
+        shared = run_stage("arrays", {"source": str(source), "arrays": ["positions", "triangles"]})
+        if not shared["ok"]:
+            entry["status"] = "failed"
+            raise PipelineError(f"arrays stage failed:\n{shared['error']}")
+    manifest = shared["manifest"]
+    try:
+        with report.timed("occlusion", source.name) as entry:
+            solved = occlusion.bake(manifest, settings["rays"], settings["distance"], settings["resolution"],
+                                    workers)
+            entry.update(vertices=int(shared["offsets"][-1]), rays=settings["rays"])
+    finally:
+        shm.release(manifest)
+    return solved
+
+
+def bake(source, settings, workers=None, use_cache=True, report=None):
+    """Bake ``source``; returns the stage result (``ok``, ``output``, ``mean_occlusion``)."""
+    report = report or Report(STAGE)
+    source = Path(source).resolve()
+    out_dir = STAGING_DIR / STAGE / source.stem
+    output = out_dir / source.name if source.suffix.lower() == ".glb" else out_dir / f"{source.stem}.glb"
+    result_file = out_dir / f"{source.stem}_ao.json"
+    cache = StageCache(STAGE)
+    key = cache_key(source, settings)
+
+    if use_cache and cache.restore(key, out_dir):
+        result = {"ok": True, **json.loads(result_file.read_text())}
+        report.add(STAGE, source.name, 0.0, "cache-hit", mean_occlusion=result["mean_occlusion"])
+        return result
+    solved = bake_outside(source, settings, workers, report)
+    try:
+        with report.timed(STAGE, source.name) as entry:
+            result = run_stage(STAGE, {"source": str(source), "output": str(output), "occlusion_shm": solved,
+                                       "strength": settings["strength"]})
+            if not result["ok"]:
+                entry["status"] = "failed"
+                print(result["error"])
+                return result
+            entry.update(mean_occlusion=result["mean_occlusion"])
+    finally:
+        shm.release(solved)
+    stored = {k: v for k, v in result.items() if k != "ok"}
+    result_file.write_text(json.dumps(stored, indent=2) + "\n")
+    cache.put(key, {output.name: output, result_file.name: result_file}, meta={"source": source.name})
+    return result
+
+
+def register(subparsers):
+    p = subparsers.add_parser("bake-ao", help="bake ambient occlusion into vertex colors (cached)")
+    p.add_argument("sources", nargs="+", type=Path, help="rigged .glb/.gltf/.fbx files")
+    p.add_argument("--rays", type=int, default=occlusion.RAYS, help="hemisphere rays per vertex")
+    p.add_argument("--distance", type=float, default=occlusion.DISTANCE,
+                   help="ray length, as a fraction of the model's largest extent")
+    p.add_argument("--resolution", type=int, default=occlusion.RESOLUTION,
+                   help="voxels along the model's largest extent")
+    p.add_argument("--strength", type=float, default=1.0, help="0..1 darkening of fully occluded vertices")
+    p.add_argument("-j", "--workers", type=int, help="processes marching rays")
+    p.add_argument("--no-cache", action="store_true", help="ignore cached results")
+    p.add_argument("--publish", action="store_true", help=f"publish the baked models into {ENEMIES_DIR.name}/")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    settings = {"rays": args.rays, "distance": args.distance, "resolution": args.resolution,
+                "strength": args.strength}
+    results = [bake(source, settings, args.workers, not args.no_cache, report) for source in args.sources]
+    if args.publish:
+        publish([r["output"] for r in results if r["ok"]], ENEMIES_DIR, report=report)
+    report.print_summary()
+    report.write()
+    return 0 if all(r["ok"] for r in results) else 1
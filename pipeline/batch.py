@@ -0,0 +1,75 @@
+"""Rig many models under the orchestrator: timeouts, weight fallbacks, clean cancel.
+
+    python3 -m pipeline rig-batch generated/*.glb --timeout 600 --publish
+
+Each model is rigged in its own Blender process. If it hangs or leaves
+vertices unweighted, it is retried with vectorized weights, then with
+every vertex on Root. After publishing, a supervised headless Godot import
+refreshes the project.
+"""
+
+from pathlib import Path
+
+from .config import GODOT_PROJECT
+from .godot import require_godot
+from .orchestrator import Task, print_event, run_tasks
+from .publish import publish, staging_path
+from .report import Report
+from .rig import STAGE, WEIGHT_FALLBACKS, check_weights, default_output, fallback_jobs, make_job
+
+IMPORT_TIMEOUT = 900
+
+
+def rig_tasks(sources, weights="auto", join_meshes=False, timeout=None, staged=False, weld=False):
+    tasks = []
+    for source in sources:
+        output = default_output(source)
+        if staged:
+            output = staging_path(output.name)
+        job = make_job(source, output, weights, join_meshes, weld)
+        tasks.append(Task(Path(source).name, stage=STAGE, jobs=fallback_jobs(job),
+                          timeout=timeout, accept=check_weights))
+    return tasks
+
+
+def import_task(timeout=IMPORT_TIMEOUT):
+    argv = [require_godot(), "--headless", "--path", str(GODOT_PROJECT), "--import"]
+    return Task("godot --import", argv=argv, timeout=timeout, retries=0)
+
+
+def print_json_event(event):
+    print(event.to_json(), flush=True)
+
+
+def register(subparsers):
+    p = subparsers.add_parser("rig-batch", help="rig many models with timeouts and weight fallbacks")
+    p.add_argument("sources", nargs="+", type=Path, help="generated .glb/.gltf/.fbx files")
+    p.add_argument("--weights", choices=WEIGHT_FALLBACKS, default="auto", help="first strategy to try")
+    p.add_argument("--join-meshes", action="store_true")
+    p.add_argument("--weld", action="store_true", help="weld duplicated seam vertices before weighting")
+    p.add_argument("--timeout", type=float, default=600, help="seconds per attempt")
+    p.add_argument("-j", "--jobs", type=int, help="concurrent Blender processes (default: by cores and memory)")
+    p.add_argument("--events", action="store_true", help="print progress events as JSON lines")
+    p.add_argument("--publish", action="store_true", help="publish into battle-manager/enemies")
+    p.add_argument("--no-import", action="store_true", help="skip the Godot import after publishing")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report("rig-batch")
+    on_event = print_json_event if args.events else print_event
+    tasks = rig_tasks(args.sources, args.weights, args.join_meshes, args.timeout, args.publish, args.weld)
+    results = run_tasks(tasks, args.jobs, on_event, report)
+    if results is None:
+        report.write()
+        return 130
+    if args.publish:
+        outputs = [r["output"] for r in results.values() if r["ok"]]
+        changed = [dst for dst, action in publish(outputs, report=report).items() if action != "unchanged"]
+        if changed and not args.no_import:
+            if run_tasks([import_task()], 1, on_event, report) is None:
+                report.write()
+                return 130
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
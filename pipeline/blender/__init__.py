@@ -0,0 +1,6 @@
+"""Stages that run inside Blender.
+
+Every module here imports ``bpy`` and is loaded by ``worker.py``; a stage
+module exposes ``run(job) -> dict``. Launch stages from ordinary Python with
+``pipeline.blender_runner``.
+"""
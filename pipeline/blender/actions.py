@@ -0,0 +1,109 @@
+"""Actions stage: build an action set on a rigged model and export every action in one pass.
+
+Job keys:
+    source       rigged .glb/.gltf/.fbx
+    output       .glb to write
+    actions      ordered specs (see ``pipeline.action_sets``), each with a
+                 ``blend`` path: a cached bake to load if the file exists,
+                 otherwise where to save the new bake
+    keep_existing  keep the source's own actions after the set (default false)
+
+Each action becomes one NLA track, in set order, and there is no active
+action, so the exporter writes exactly these clips whatever its defaults.
+New bakes are saved as one-action .blend libraries for the caller to cache.
+"""
+
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+from pipeline.blender import scene
+
+
+def load_action(path, name):
+    with bpy.data.libraries.load(str(path), link=False) as (source, loaded):
+        loaded.actions = [name] if name in source.actions else source.actions[:1]
+    action = loaded.actions[0]
+    action.name = name
+    return action
+
+
+def bake_keys(name, params):
+    action = bpy.data.actions.new(name)
+    for bone, paths in params["bones"].items():
+        for path, keys in paths.items():
+            keys = np.asarray(keys, dtype=np.float64)
+            scene.write_curves(action, f'pose.bones["{bone}"].{path}', keys[:, 0], keys[:, 1:], group=bone,
+                               interpolation=scene.KEY_BEZIER)
+    return action
+
+
+def bake_clip(name, params):
+    imported = scene.import_asset(params["source"])
+    armature_obj = scene.armature_object(imported)
+    actions = scene.armature_actions(armature_obj) if armature_obj else []
+    if not actions:
+        raise RuntimeError(f"{params['source']} has no armature action for {name!r}")
+    action = actions[0]
+    for obj in imported:
+        bpy.data.objects.remove(obj, do_unlink=True)
+    action.name = name
+    return action
+
+
+BAKERS = {"keys": bake_keys, "clip": bake_clip}
+
+
+def save_action(action, path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    bpy.data.libraries.write(str(path), {action}, fake_user=True)
+
+
+def stash(armature_obj, actions):
+    """Replace the armature's NLA tracks with one track per action, in order."""
+    data = armature_obj.animation_data or armature_obj.animation_data_create()
+    data.action = None
+    for track in list(data.nla_tracks):
+        data.nla_tracks.remove(track)
+    for action in actions:
+        track = data.nla_tracks.new()
+        track.name = action.name
+        track.strips.new(action.name, int(action.frame_range[0]), action)
+        action.use_fake_user = True
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    armature_obj = scene.armature_object(imported)
+    if armature_obj is None:
+        raise RuntimeError(f"No armature found in {job['source']}")
+    existing = scene.armature_actions(armature_obj)
+    if not job.get("keep_existing"):
+        for action in existing:
+            bpy.data.actions.remove(action)
+        existing = []
+
+    actions, baked, reused = [], [], []
+    for spec in job["actions"]:
+        if Path(spec["blend"]).is_file():
+            action = load_action(spec["blend"], spec["name"])
+            reused.append(spec["name"])
+        else:
+            action = BAKERS[spec["generator"]](spec["name"], spec["params"])
+            save_action(action, spec["blend"])
+            baked.append(spec["name"])
+        actions.append(action)
+    stash(armature_obj, actions + existing)
+
+    scene.export_glb(job["output"], imported, animations=True, images_from=job["source"])
+    print(f"✓ Exported {len(actions) + len(existing)} action(s) in one pass ({len(baked)} baked, "
+          f"{len(reused)} reused) -> {job['output']}")
+    return {
+        "output": job["output"],
+        "actions": [a.name for a in actions + existing],
+        "baked": baked,
+        "reused": reused,
+        "frames": {a.name: [float(f) for f in a.frame_range] for a in actions + existing},
+    }
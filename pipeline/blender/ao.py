@@ -0,0 +1,73 @@
+"""AO stage: store baked ambient occlusion in the vertex colors of a model.
+
+Job keys:
+    source         rigged .glb/.gltf/.fbx (the one the arrays stage read)
+    output         .glb to write
+    occlusion_shm  ``pipeline.shm`` manifest of ``occlusion`` (V,) rows
+                   (see ``pipeline.occlusion``), in ``scene.mesh_objects``
+                   order
+    strength       0..1 blend of the occlusion into the colors (default 1)
+
+The colors become ``1 - strength * occlusion``. A mesh that already has an
+active color attribute is multiplied in place; otherwise an ``AO`` point
+attribute is added and made active, so the exporter writes it as COLOR_0.
+"""
+
+import bpy
+import numpy as np
+
+from pipeline import shm
+from pipeline.blender import scene
+
+ATTRIBUTE = "AO"
+
+
+def color_options():
+    """Exporter options that write the active color attribute as COLOR_0."""
+    if bpy.app.version >= (4, 2, 0):
+        return {"export_vertex_color": 'ACTIVE'}
+    return {"export_colors": True}
+
+
+def apply_occlusion(mesh, shade):
+    """Multiply the active color attribute by ``shade`` (one value per vertex)."""
+    colors = mesh.color_attributes
+    attr = colors.active_color
+    if attr is None:
+        attr = colors.new(ATTRIBUTE, 'FLOAT_COLOR', 'POINT')
+        values = np.ones((len(mesh.vertices), 4), dtype=np.float32)
+    else:
+        values = np.empty(len(attr.data) * 4, dtype=np.float32)
+        attr.data.foreach_get("color", values)
+        values = values.reshape(-1, 4)
+    per_element = shade if attr.domain == 'POINT' else shade[scene.corner_vertices(mesh)]
+    values[:, :3] *= per_element[:, None]
+    attr.data.foreach_set("color", values.ravel())
+    colors.active_color = attr
+    return attr.name
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    meshes = scene.mesh_objects(imported)
+    if not meshes:
+        raise RuntimeError(f"No mesh found in {job['source']}")
+    counts = [len(obj.data.vertices) for obj in meshes]
+    with shm.attach(job["occlusion_shm"]) as arrays:
+        occlusion = arrays["occlusion"].copy()
+    if len(occlusion) != sum(counts):
+        raise RuntimeError(f"occlusion covers {len(occlusion)} vertices, the meshes have {sum(counts)}")
+
+    shade = 1.0 - float(job.get("strength", 1.0)) * np.clip(occlusion, 0.0, 1.0)
+    offsets = np.cumsum([0] + counts)
+    attributes = {obj.name: apply_occlusion(obj.data, shade[offsets[i]:offsets[i + 1]])
+                  for i, obj in enumerate(meshes)}
+    scene.export_glb(job["output"], imported, animations=True, images_from=job["source"], **color_options())
+    print(f"✓ Baked occlusion into {len(meshes)} mesh(es), mean shade {shade.mean():.3f} -> {job['output']}")
+    return {
+        "output": job["output"],
+        "attributes": attributes,
+        "vertices": int(sum(counts)),
+        "mean_occlusion": round(float(occlusion.mean()), 4),
+    }
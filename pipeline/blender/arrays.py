@@ -0,0 +1,92 @@
+"""Arrays stage: publish a model's mesh arrays to shared memory for outside analysis.
+
+Job keys:
+    source   input .glb/.gltf/.fbx
+    arrays   names to publish (default: all of them)
+             positions  (V, 3) float64 world positions, all meshes concatenated
+             triangles  (T, 3) int32 vertex indices into ``positions``
+             uvs        (L, 2) float32 active-layer UVs per triangle corner
+             weights    (V, B) float32 vertex-group weights by bone name
+    weld     weld seam vertices first, as the rig stage does with ``weld``
+
+Meshes are taken in ``scene.mesh_objects`` order, the same order the rig stage
+uses, so row i here is row i there. The result holds the ``pipeline.shm``
+manifest; the caller releases it.
+"""
+
+import numpy as np
+
+from pipeline import shm
+from pipeline.blender import scene
+from pipeline.blender import weld as welding
+
+ARRAYS = ("positions", "triangles", "uvs", "weights")
+
+
+def triangles(meshes, offsets):
+    chunks = []
+    for obj, offset in zip(meshes, offsets):
+        mesh = obj.data
+        mesh.calc_loop_triangles()
+        tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("vertices", tris)
+        chunks.append(tris.reshape(-1, 3) + offset)
+    return np.concatenate(chunks)
+
+
+def triangle_uvs(meshes):
+    chunks = []
+    for obj in meshes:
+        mesh = obj.data
+        mesh.calc_loop_triangles()
+        loops = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+        mesh.loop_triangles.foreach_get("loops", loops)
+        uv = np.zeros((len(mesh.loops), 2), dtype=np.float32)
+        if mesh.uv_layers.active is not None:
+            mesh.uv_layers.active.data.foreach_get("uv", uv.ravel())
+        chunks.append(uv[loops])
+    return np.concatenate(chunks)
+
+
+def group_weights(meshes, offsets):
+    """Dense (V, B) weights over the union of vertex-group names (sorted).
+
+    Reading groups is per-vertex Python; it is only done when asked for.
+    """
+    names = sorted({vg.name for obj in meshes for vg in obj.vertex_groups})
+    column = {name: i for i, name in enumerate(names)}
+    out = np.zeros((int(offsets[-1]), len(names)), dtype=np.float32)
+    for obj, offset in zip(meshes, offsets):
+        remap = {vg.index: column[vg.name] for vg in obj.vertex_groups}
+        for v in obj.data.vertices:
+            for g in v.groups:
+                out[offset + v.index, remap[g.group]] = g.weight
+    return out, names
+
+
+def run(job):
+    scene.reset()
+    meshes = scene.mesh_objects(scene.import_asset(job["source"]))
+    if not meshes:
+        raise RuntimeError(f"No mesh found in {job['source']}")
+    if job.get("weld"):
+        welding.weld_all(meshes)
+    wanted = job.get("arrays") or ARRAYS
+    points, offsets = scene.world_positions(meshes)
+    arrays, extra = {}, {}
+    if "positions" in wanted:
+        arrays["positions"] = points
+    if "triangles" in wanted:
+        arrays["triangles"] = triangles(meshes, offsets)
+    if "uvs" in wanted:
+        arrays["uvs"] = triangle_uvs(meshes)
+    if "weights" in wanted:
+        arrays["weights"], extra["bone_names"] = group_weights(meshes, offsets)
+    manifest = shm.share(arrays)
+    print(f"✓ Shared {', '.join(arrays)} of {len(meshes)} mesh(es), {len(points)} vertices")
+    return {
+        "manifest": manifest,
+        "meshes": [obj.name for obj in meshes],
+        "offsets": [int(o) for o in offsets],
+        **extra,
+    }
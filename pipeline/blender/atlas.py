@@ -0,0 +1,182 @@
+"""Atlas stage: pack the base-color textures of several enemies into one atlas.
+
+Job keys:
+    sources      list of {"source": .glb, "name": basename} to pack together
+    output_dir   where the atlas image and the re-exported GLBs go
+    atlas        atlas basename
+    material     name of the shared material (the Godot import maps it to a
+                 shared .tres)
+    texel_scale  resize factor applied to every texture before packing (default 1)
+    padding      edge-extended border around each texture, in pixels (default 8)
+    max_size     largest atlas side (default 8192)
+
+Writes ``<atlas>.jpg`` (or ``.webp``/``.png``, following the sources: see
+``pipeline.atlas.atlas_format``) and ``<name>_atlas.glb`` per enemy. Every textured
+material of every enemy is replaced by the one shared material, and UVs
+are remapped into the atlas. The GLBs carry no images; the shared material
+provides the texture.
+"""
+
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+from pipeline import atlas
+from pipeline.blender import scene
+from pipeline.png import write_png
+
+SUFFIXES = {'PNG': ".png", 'JPEG': ".jpg", 'WEBP': ".webp"}
+
+
+def base_color_image(material):
+    if material is None or not material.use_nodes:
+        return None
+    bsdf = next((n for n in material.node_tree.nodes if n.type == 'BSDF_PRINCIPLED'), None)
+    if bsdf is None or not bsdf.inputs["Base Color"].links:
+        return None
+    node = bsdf.inputs["Base Color"].links[0].from_node
+    return node.image if node.type == 'TEX_IMAGE' else None
+
+
+def source_bytes(image):
+    """The compressed file behind an image: packed by the glTF importer, or on disk."""
+    if image.packed_file is not None:
+        return bytes(image.packed_file.data)
+    return Path(bpy.path.abspath(image.filepath)).read_bytes()
+
+
+def save_atlas(path, canvas, file_format, quality):
+    """Write the (h, w, 4) bottom-up canvas; lossy formats go through Blender's encoder."""
+    if file_format == 'PNG':
+        # Blender rows run bottom-up; PNG rows top-down.
+        write_png(path, (np.clip(canvas[::-1], 0, 1) * 255 + 0.5).astype(np.uint8), level=6)
+        return
+    height, width, _ = canvas.shape
+    image = bpy.data.images.new(Path(path).stem, width=width, height=height, alpha=True)
+    image.pixels.foreach_set(np.clip(canvas, 0, 1).ravel())
+    sc = bpy.context.scene
+    sc.view_settings.view_transform = 'Standard'
+    settings = sc.render.image_settings
+    settings.file_format = file_format
+    settings.color_mode = 'RGB' if file_format == 'JPEG' else 'RGBA'
+    settings.quality = quality
+    image.save_render(str(path), scene=sc)
+    bpy.data.images.remove(image)
+
+
+def image_pixels(image, texel_scale):
+    if texel_scale != 1.0:
+        image.scale(max(1, round(image.size[0] * texel_scale)), max(1, round(image.size[1] * texel_scale)))
+    w, h = image.size
+    pixels = np.empty(w * h * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    return pixels.reshape(h, w, 4)
+
+
+def shared_material(name, image_path):
+    material = bpy.data.materials.new(name)
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    bsdf = next(n for n in nodes if n.type == 'BSDF_PRINCIPLED')
+    tex = nodes.new('ShaderNodeTexImage')
+    tex.image = bpy.data.images.load(str(image_path))
+    material.node_tree.links.new(tex.outputs["Color"], bsdf.inputs["Base Color"])
+    return material
+
+
+def loop_slots(mesh, slot_rows):
+    """Atlas row of every loop (-1 for untextured materials), from its polygon."""
+    count = len(mesh.polygons)
+    material_index = np.empty(count, dtype=np.int32)
+    loop_start = np.empty(count, dtype=np.int32)
+    loop_total = np.empty(count, dtype=np.int32)
+    mesh.polygons.foreach_get("material_index", material_index)
+    mesh.polygons.foreach_get("loop_start", loop_start)
+    mesh.polygons.foreach_get("loop_total", loop_total)
+    order = np.argsort(loop_start, kind="stable")
+    rows = slot_rows[np.minimum(material_index, len(slot_rows) - 1)]
+    return np.repeat(rows[order], loop_total[order])
+
+
+def remap_mesh(mesh, rows_by_image, scale, offset):
+    images = [base_color_image(m) for m in mesh.materials]
+    slot_rows = np.array([rows_by_image[image.name] if image else -1 for image in images], dtype=np.int64)
+    layer = mesh.uv_layers.active
+    if layer is None or not (slot_rows >= 0).any():
+        return 0
+    uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    layer.data.foreach_get("uv", uv)
+    slots = loop_slots(mesh, slot_rows)
+    uv = atlas.remap_uvs(uv.reshape(-1, 2), slots, scale, offset)
+    layer.data.foreach_set("uv", uv.astype(np.float32).ravel())
+    return int(np.count_nonzero(slots >= 0))
+
+
+def run(job):
+    scene.reset()
+    imported = {}
+    for entry in job["sources"]:
+        imported[entry["name"]] = scene.import_asset(entry["source"])
+
+    # Every distinct base-color image, in a stable order.
+    images, materials_before = {}, set()
+    for objects in imported.values():
+        for obj in scene.mesh_objects(objects):
+            for material in obj.data.materials:
+                materials_before.add(material.name if material else None)
+                image = base_color_image(material)
+                if image is not None:
+                    images.setdefault(image.name, image)
+    if not images:
+        raise RuntimeError("No base-color textures found to pack")
+
+    file_format, quality = atlas.atlas_format(
+        [(image.file_format, source_bytes(image)) for _, image in sorted(images.items())])
+    texel_scale = float(job.get("texel_scale", 1.0))
+    padding = int(job.get("padding", 8))
+    pixels = {name: image_pixels(image, texel_scale) for name, image in sorted(images.items())}
+    names = list(pixels)
+    size, rects = atlas.atlas_layout([(p.shape[1], p.shape[0]) for p in pixels.values()],
+                                     padding, int(job.get("max_size", atlas.MAX_ATLAS_SIZE)))
+    canvas = np.zeros((size[1], size[0], 4), dtype=np.float32)
+    for name, rect in zip(names, rects):
+        atlas.blit(canvas, pixels[name], rect, padding)
+
+    out = Path(job["output_dir"])
+    out.mkdir(parents=True, exist_ok=True)
+    atlas_path = out / f"{job['atlas']}{SUFFIXES[file_format]}"
+    save_atlas(atlas_path, canvas, file_format, quality)
+
+    scale, offset = atlas.remap_transforms(rects, size)
+    rows_by_image = {name: i for i, name in enumerate(names)}
+    material = shared_material(job["material"], atlas_path)
+    enemies, materials_after = {}, set()
+    for name, objects in imported.items():
+        meshes = scene.mesh_objects(objects)
+        remapped = 0
+        for mesh in {obj.data for obj in meshes}:
+            remapped += remap_mesh(mesh, rows_by_image, scale, offset)
+            for i, old in enumerate(mesh.materials):
+                if base_color_image(old) is not None:
+                    mesh.materials[i] = material
+            materials_after.update(m.name if m else None for m in mesh.materials)
+        output = out / f"{name}_atlas.glb"
+        scene.export_glb(output, objects, export_image_format='NONE')
+        enemies[name] = {"output": str(output), "remapped_loops": remapped}
+
+    regions = {name: dict(zip("xywh", map(int, rect))) for name, rect in zip(names, rects)}
+    print(f"✓ Packed {len(names)} texture(s) from {len(enemies)} enemies into a {size[0]}x{size[1]} "
+          f"{file_format} atlas" + (f" at quality {quality}" if quality else ""))
+    return {
+        "atlas": str(atlas_path),
+        "size": list(size),
+        "format": file_format,
+        "quality": quality,
+        "material": job["material"],
+        "regions": regions,
+        "enemies": enemies,
+        "materials_before": len(materials_before),
+        "materials_after": len(materials_after),
+        "textures_before": len(names),
+    }
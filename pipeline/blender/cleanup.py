@@ -0,0 +1,151 @@
+"""Cleanup stage: remove the geometry that makes bone-heat weighting fail.
+
+Job keys:
+    source      input .glb/.gltf/.fbx
+    output      cleaned .glb to write
+    thresholds  overrides of ``pipeline.topology.THRESHOLDS``
+    drop_islands  also delete micro-islands (default False: they are only
+                reported, since eyes or teeth can be legitimate small pieces)
+
+Each mesh is inspected with ``pipeline.topology.inspect`` on its triangle
+arrays; the offenders are then fixed in a few bmesh calls:
+
+* polygons whose triangles are all degenerate or zero-area are collapsed
+  into their neighbours: their corners are merged by distance and the
+  short edges dissolved, so the surface stays closed. Only slivers that
+  neither call removes (long, collinear corners) are deleted;
+* non-manifold edges are split, so every face keeps its own copy;
+* loose vertices, the loose edges on them and, with ``drop_islands``,
+  micro-island vertices are deleted, together with their faces.
+
+The meshes are inspected again afterwards; both reports are returned.
+"""
+
+import math
+
+import bmesh
+import numpy as np
+
+from pipeline import topology
+from pipeline.blender import scene
+
+
+def triangle_arrays(mesh):
+    """(triangles (T, 3), polygon index per triangle)."""
+    mesh.calc_loop_triangles()
+    tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", tris)
+    polygons = np.empty(len(mesh.loop_triangles), dtype=np.int32)
+    mesh.loop_triangles.foreach_get("polygon_index", polygons)
+    return tris.reshape(-1, 3), polygons
+
+
+def edge_indices(mesh, pairs):
+    """Mesh edge indices of (E, 2) vertex pairs."""
+    if not len(pairs):
+        return np.empty(0, dtype=np.int64)
+    edges = np.empty(len(mesh.edges) * 2, dtype=np.int64)
+    mesh.edges.foreach_get("vertices", edges)
+    edges = np.sort(edges.reshape(-1, 2), axis=1)
+    base = len(mesh.vertices)
+    return np.flatnonzero(np.isin(edges[:, 0] * base + edges[:, 1], pairs[:, 0] * base + pairs[:, 1]))
+
+
+def inspect_mesh(mesh, thresholds):
+    tris, polygons = triangle_arrays(mesh)
+    report, problems = topology.inspect(scene.mesh_positions(mesh), tris, thresholds)
+    return report, problems, tris, polygons
+
+
+def clean_mesh(obj, thresholds, drop_islands=False):
+    """Fix ``obj``'s mesh in place; returns (before, fixed, after)."""
+    mesh = obj.data
+    before, problems, tris, polygons = inspect_mesh(mesh, thresholds)
+    limits = {**topology.THRESHOLDS, **(thresholds or {})}
+    points = scene.mesh_positions(mesh)
+    extent = float(np.ptp(points, axis=0).max()) if len(points) else 1.0
+    # The zero-area test in topology.inspect, turned into a length.
+    merge_dist = math.sqrt(limits["min_area"]) * extent
+
+    # A polygon is collapsed only when all of its triangles are bad: a quad
+    # with one sliver triangle is still a valid quad.
+    bad = np.bincount(polygons[problems["degenerate"]], minlength=len(mesh.polygons))
+    total = np.bincount(polygons, minlength=len(mesh.polygons))
+    dead_faces = np.flatnonzero((bad == total) & (total > 0))
+    dead_verts = problems["loose"]
+    if drop_islands:
+        dead_verts = np.union1d(dead_verts, problems["micro_island"])
+    split = edge_indices(mesh, problems["non_manifold"])
+
+    fixed = {"faces_dissolved": 0, "faces_deleted": 0, "vertices_merged": 0,
+             "vertices_deleted": int(len(dead_verts)), "edges_split": int(len(split))}
+    if len(dead_faces) or len(dead_verts) or len(split):
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.verts.ensure_lookup_table()
+        bm.edges.ensure_lookup_table()
+        bm.faces.ensure_lookup_table()
+        faces = [bm.faces[i] for i in dead_faces.tolist()]
+        corners = list({v for f in faces for v in f.verts})
+        verts = [bm.verts[i] for i in dead_verts.tolist()]
+        if len(split):
+            bmesh.ops.split_edges(bm, edges=[bm.edges[i] for i in split.tolist()])
+        if faces:
+            count = len(bm.verts)
+            bmesh.ops.remove_doubles(bm, verts=corners, dist=merge_dist)
+            fixed["vertices_merged"] = count - len(bm.verts)
+            edges = list({e for f in faces if f.is_valid for e in f.edges})
+            if edges:
+                bmesh.ops.dissolve_degenerate(bm, dist=merge_dist, edges=edges)
+            leftover = [f for f in faces if f.is_valid and f.calc_area() <= limits["min_area"] * extent ** 2]
+            if leftover:
+                bmesh.ops.delete(bm, geom=leftover, context='FACES_ONLY')
+            fixed["faces_deleted"] = len(leftover)
+            fixed["faces_dissolved"] = len(faces) - len(leftover)
+            # Corners only the deleted slivers used are loose now.
+            stranded = [v for v in corners if v.is_valid and not v.link_faces]
+            fixed["vertices_deleted"] += len(stranded)
+            verts += stranded
+        verts = list({v for v in verts if v.is_valid})
+        if verts:
+            bmesh.ops.delete(bm, geom=verts, context='VERTS')
+        # Deleting faces can strand edges whose vertices other faces still use.
+        loose_edges = [e for e in bm.edges if not e.link_faces]
+        if loose_edges:
+            bmesh.ops.delete(bm, geom=loose_edges, context='EDGES')
+        bm.to_mesh(mesh)
+        bm.free()
+        mesh.update()
+    after = inspect_mesh(mesh, thresholds)[0]
+    return before, fixed, after
+
+
+def totals(reports):
+    keys = next(iter(reports.values()), {}).keys()
+    return {k: sum(r[k] for r in reports.values()) for k in keys}
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    meshes = scene.mesh_objects(imported)
+    if not meshes:
+        raise RuntimeError(f"No mesh found in {job['source']}")
+    thresholds = job.get("thresholds")
+    drop_islands = bool(job.get("drop_islands", False))
+    before, fixed, after = {}, {}, {}
+    for obj in meshes:
+        before[obj.name], fixed[obj.name], after[obj.name] = clean_mesh(obj, thresholds, drop_islands)
+    scene.export_glb(job["output"], imported, images_from=job["source"])
+    summary = {"before": totals(before), "fixed": totals(fixed), "after": totals(after)}
+    print(f"✓ Cleaned {len(meshes)} mesh(es): {summary['fixed']['faces_dissolved']} degenerate faces "
+          f"dissolved, {summary['fixed']['faces_deleted']} faces and "
+          f"{summary['fixed']['vertices_deleted']} vertices deleted, "
+          f"{summary['fixed']['edges_split']} non-manifold edges split")
+    return {
+        "output": job["output"],
+        "meshes": {name: {"before": before[name], "fixed": fixed[name], "after": after[name]}
+                   for name in before},
+        **summary,
+        "clean": topology.is_clean(summary["after"], islands=drop_islands),
+    }
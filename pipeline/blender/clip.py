@@ -0,0 +1,38 @@
+"""Clip stage: turn a Mixamo-style FBX into a skeleton-plus-actions GLB.
+
+Job keys:
+    source   input .fbx (or .glb) carrying an armature and its animation
+    output   .glb to write; meshes are left out
+    name     action name in the output (default: the source file stem)
+"""
+
+import bpy
+
+from pipeline.blender import scene
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    armatures = [obj for obj in imported if obj.type == 'ARMATURE']
+    if not armatures:
+        raise RuntimeError(f"No armature found in {job['source']}")
+    armature_obj = armatures[0]
+    action = armature_obj.animation_data.action if armature_obj.animation_data else None
+    if action is None:
+        raise RuntimeError(f"{armature_obj.name} in {job['source']} has no action")
+    action.name = job["name"]
+    # Drop every other action the importer created so only this clip exports.
+    for other in list(bpy.data.actions):
+        if other is not action:
+            bpy.data.actions.remove(other)
+
+    start, end = (int(f) for f in action.frame_range)
+    scene.export_glb(job["output"], [armature_obj], animations=True)
+    print(f"✓ Clip '{action.name}' ({end - start} frames) -> {job['output']}")
+    return {
+        "output": job["output"],
+        "clip": action.name,
+        "frames": end - start,
+        "bones": len(armature_obj.data.bones),
+    }
@@ -0,0 +1,200 @@
+"""Deform-check stage: sample every clip of a rigged model and flag broken skinning.
+
+Job keys:
+    source       rigged (and usually animated) .glb
+    output_dir   where the JSON report and diagnostic renders go
+    name         basename of the outputs
+    actions      action names to sample (default: every action in the file)
+    fps          samples per second (default 10)
+    thresholds   overrides for ``pipeline.deform.THRESHOLDS``
+    studio       cached portrait studio .blend, used for diagnostic renders
+    max_renders  cap on diagnostic renders (default 6; 0 disables them)
+
+Each sample is one frame change and one evaluated mesh per object read with
+``foreach_get``; weights are recovered from a few probe poses rather than by
+walking vertex groups. All statistics are computed by ``pipeline.deform``.
+"""
+
+import json
+from pathlib import Path
+
+import bpy
+import numpy as np
+from mathutils import Matrix
+
+from pipeline import deform
+from pipeline.blender import portrait, scene
+
+RENDER_SIZE = 128
+
+
+def skinned_meshes(armature_obj, meshes):
+    return [obj for obj in meshes
+            if any(m.type == 'ARMATURE' and m.object == armature_obj for m in obj.modifiers)]
+
+
+def evaluated_world(meshes):
+    """Deformed world positions of ``meshes`` concatenated, for the current frame."""
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    chunks = []
+    for obj in meshes:
+        positions, _ = scene.evaluated_arrays(obj, depsgraph)
+        m = scene.matrix_array(obj.matrix_world)
+        chunks.append(positions.astype(np.float64) @ m[:3, :3].T + m[:3, 3])
+    return np.concatenate(chunks)
+
+
+def triangles(meshes):
+    chunks, offset = [], 0
+    for obj in meshes:
+        mesh = obj.data
+        mesh.calc_loop_triangles()
+        tris = np.empty(len(mesh.loop_triangles) * 3, dtype=np.int64)
+        mesh.loop_triangles.foreach_get("vertices", tris)
+        chunks.append(tris.reshape(-1, 3) + offset)
+        offset += len(mesh.vertices)
+    return np.concatenate(chunks)
+
+
+def bone_segments(armature_obj, posed):
+    """World-space (heads, tails) of every bone, posed or at rest."""
+    count = len(armature_obj.data.bones)
+    heads = np.empty(count * 3, dtype=np.float32)
+    tails = np.empty(count * 3, dtype=np.float32)
+    if posed:
+        armature_obj.pose.bones.foreach_get("head", heads)
+        armature_obj.pose.bones.foreach_get("tail", tails)
+    else:
+        armature_obj.data.bones.foreach_get("head_local", heads)
+        armature_obj.data.bones.foreach_get("tail_local", tails)
+    m = scene.matrix_array(armature_obj.matrix_world)
+    return tuple(a.reshape(-1, 3).astype(np.float64) @ m[:3, :3].T + m[:3, 3] for a in (heads, tails))
+
+
+def disconnect_bones(armature_obj):
+    """Connected bones ignore pose translation; the probes need it."""
+    if not any(bone.use_connect for bone in armature_obj.data.bones):
+        return
+    scene.select_only([armature_obj])
+    bpy.ops.object.mode_set(mode='EDIT')
+    for bone in armature_obj.data.edit_bones:
+        bone.use_connect = False
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+
+def probe_weights(armature_obj, meshes, rest):
+    """(V, B) effective bone weights from translation probes.
+
+    Up to three bones are probed per evaluation, each translated by a unit
+    vector along its own armature axis, and each translation cancelled for
+    its children; the displacement of a vertex along that axis is then the
+    bone's (normalised) weight. ceil(B / 3) evaluations in total.
+    """
+    bones = armature_obj.pose.bones
+    rest_mats = [bone.bone.matrix_local.copy() for bone in bones]
+    index = {bone.name: i for i, bone in enumerate(bones)}
+    parents = [index[bone.parent.name] if bone.parent else None for bone in bones]
+    to_armature = np.linalg.inv(scene.matrix_array(armature_obj.matrix_world))[:3, :3]
+    weights = np.zeros((len(rest), len(bones)))
+    for start in range(0, len(bones), 3):
+        probed = range(start, min(start + 3, len(bones)))
+        offsets = [Matrix.Identity(4) for _ in bones]
+        for axis, b in enumerate(probed):
+            offsets[b] = Matrix.Translation(Matrix.Identity(3)[axis])
+        for b, bone in enumerate(bones):
+            # Pose matrix T_b @ rest_b, given the parent's T_parent @ rest_parent.
+            parent = offsets[parents[b]] if parents[b] is not None else Matrix.Identity(4)
+            bone.matrix_basis = rest_mats[b].inverted() @ parent.inverted() @ offsets[b] @ rest_mats[b]
+        bpy.context.view_layer.update()
+        displaced = (evaluated_world(meshes) - rest) @ to_armature.T
+        for axis, b in enumerate(probed):
+            weights[:, b] = displaced[:, axis]
+    for bone in bones:
+        bone.matrix_basis = Matrix.Identity(4)
+    return np.clip(weights, 0.0, 1.0)
+
+
+def failing_samples(failures, limit):
+    seen = []
+    for failure in failures:
+        where = (failure.get("action"), failure.get("frame"))
+        if where[0] is not None and where not in seen:
+            seen.append(where)
+    return seen[:limit]
+
+
+def render_diagnostics(job, samples, out):
+    """Tiny studio renders of the failing poses, one per (action, frame)."""
+    portrait.load_studio(job["studio"], 8)
+    imported = scene.import_asset(job["source"])
+    meshes = scene.mesh_objects(imported)
+    framing = portrait.RENDERS["full"][1]
+    paths = []
+    for action, frame in samples:
+        portrait.pose(imported, action, round(frame))
+        portrait.frame_camera(*portrait.posed_bounds(meshes), framing)
+        path = out / f"{job['name']}_{action}_{round(frame):04d}.png"
+        portrait.render(path, RENDER_SIZE)
+        paths.append(str(path))
+    return paths
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    armature_obj = scene.armature_object(imported)
+    if armature_obj is None:
+        raise RuntimeError(f"No armature found in {job['source']}")
+    meshes = skinned_meshes(armature_obj, scene.mesh_objects(imported))
+    if not meshes:
+        raise RuntimeError(f"No mesh in {job['source']} is skinned to {armature_obj.name}")
+    if armature_obj.animation_data is None:
+        armature_obj.animation_data_create()
+    armature_obj.animation_data.action = None
+    disconnect_bones(armature_obj)
+
+    armature_obj.data.pose_position = 'REST'
+    bpy.context.view_layer.update()
+    rest = evaluated_world(meshes)
+    armature_obj.data.pose_position = 'POSE'
+    weights = probe_weights(armature_obj, meshes, rest)
+    rest_heads, rest_tails = bone_segments(armature_obj, posed=False)
+
+    wanted = job.get("actions") or sorted(a.name for a in bpy.data.actions)
+    fps = float(job.get("fps", 10))
+    samples, heads, tails = [], [], []
+    for name in wanted:
+        action = bpy.data.actions[name]
+        armature_obj.animation_data.action = action
+        for frame in scene.sample_frames(action, fps):
+            scene.set_frame(frame)
+            samples.append((name, round(frame, 3), evaluated_world(meshes)))
+            h, t = bone_segments(armature_obj, posed=True)
+            heads.append(h)
+            tails.append(t)
+
+    result = deform.analyze(
+        rest, samples, triangles(meshes), weights,
+        [bone.name for bone in armature_obj.data.bones], rest_heads, rest_tails,
+        heads or None, tails or None, job.get("thresholds"),
+    )
+    result.update(name=job["name"], source=job["source"], actions=wanted, fps=fps)
+
+    out = Path(job["output_dir"])
+    out.mkdir(parents=True, exist_ok=True)
+    limit = int(job.get("max_renders", 6))
+    result["renders"] = []
+    if result["failures"] and limit and job.get("studio"):
+        result["renders"] = render_diagnostics(job, failing_samples(result["failures"], limit), out)
+
+    report_path = out / f"{job['name']}_deform.json"
+    report_path.write_text(json.dumps(result, indent=2))
+    mark = "✗" if result["failures"] else "✓"
+    print(f"{mark} {job['name']}: {len(samples)} sample(s), {len(result['failures'])} failure(s)")
+    return {
+        "name": job["name"],
+        "report": str(report_path),
+        "samples": len(samples),
+        "failures": result["failures"],
+        "renders": result["renders"],
+    }
@@ -0,0 +1,161 @@
+"""Portrait stage: render shop/roster sprites of a rigged model in a fixed studio.
+
+Job keys:
+    source      rigged .glb
+    output_dir  where the renders go
+    name        basename of the outputs
+    action      action to pose (optional; default rest pose)
+    frame       frame of ``action`` to pose (default 0)
+    studio      path of the cached studio .blend (created on first use)
+    samples     Cycles samples (default 32)
+
+Writes ``<name>_<variant>.npy`` (H, W, 4) uint8 arrays for the atlas packer,
+plus a PNG of each variant for quick inspection.
+"""
+
+import os
+from pathlib import Path
+
+import bpy
+import numpy as np
+from mathutils import Vector
+
+from pipeline.blender import scene
+
+# variant: (pixel size, framing as a (bottom, top) fraction of the height)
+RENDERS = {
+    "portrait": (512, (0.45, 1.02)),
+    "icon": (128, (0.68, 1.02)),
+    "full": (256, (-0.02, 1.02)),
+}
+# Three-quarter view from the front-right, slightly above; glTF fronts face -Y.
+VIEW_DIRECTION = Vector((0.55, -1.0, 0.2)).normalized()
+CAMERA = "StudioCamera"
+
+
+def build_studio(samples):
+    scene.reset()
+    sc = bpy.context.scene
+    sc.render.engine = 'CYCLES'
+    sc.cycles.device = 'CPU'
+    sc.cycles.samples = samples
+    sc.cycles.use_denoising = False
+    sc.render.film_transparent = True
+    sc.render.image_settings.file_format = 'PNG'
+    sc.render.image_settings.color_mode = 'RGBA'
+    sc.view_settings.view_transform = 'Standard'
+
+    world = bpy.data.worlds.new("Studio")
+    world.use_nodes = True
+    world.node_tree.nodes["Background"].inputs["Strength"].default_value = 0.35
+    sc.world = world
+
+    cam_data = bpy.data.cameras.new(CAMERA)
+    cam_data.type = 'ORTHO'
+    cam = bpy.data.objects.new(CAMERA, cam_data)
+    sc.collection.objects.link(cam)
+    sc.camera = cam
+
+    # Key, fill and rim area lights, fixed relative to the view.
+    for name, direction, energy, size in (
+        ("Key", (1.0, -1.0, 1.2), 600, 2.0),
+        ("Fill", (-1.2, -0.8, 0.4), 200, 3.0),
+        ("Rim", (0.0, 1.0, 1.0), 400, 1.5),
+    ):
+        light_data = bpy.data.lights.new(name, 'AREA')
+        light_data.energy = energy
+        light_data.size = size
+        light = bpy.data.objects.new(name, light_data)
+        light.location = Vector(direction).normalized() * 6
+        light.rotation_euler = (-light.location).to_track_quat('-Z', 'Y').to_euler()
+        sc.collection.objects.link(light)
+
+
+def load_studio(path, samples):
+    """Open the cached studio .blend, creating it on first use."""
+    path = Path(path)
+    if not path.is_file():
+        build_studio(samples)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Several workers may build it at once; each renames a complete file in.
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.blend")
+        bpy.ops.wm.save_as_mainfile(filepath=str(tmp), copy=True)
+        os.replace(tmp, path)
+    else:
+        bpy.ops.wm.open_mainfile(filepath=str(path))
+
+
+def pose(objects, action_name, frame):
+    armature_obj = scene.armature_object(objects)
+    if armature_obj is not None and action_name:
+        if armature_obj.animation_data is None:
+            armature_obj.animation_data_create()
+        armature_obj.animation_data.action = bpy.data.actions[action_name]
+    bpy.context.scene.frame_set(int(frame))
+
+
+def posed_bounds(meshes):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    chunks = []
+    for obj in meshes:
+        positions, _ = scene.evaluated_arrays(obj, depsgraph)
+        m = scene.matrix_array(obj.matrix_world)
+        chunks.append(positions @ m[:3, :3].T + m[:3, 3])
+    points = np.concatenate(chunks)
+    return points.min(axis=0), points.max(axis=0)
+
+
+def frame_camera(lo, hi, framing):
+    cam = bpy.context.scene.camera
+    height = hi[2] - lo[2]
+    bottom, top = lo[2] + framing[0] * height, lo[2] + framing[1] * height
+    target = Vector(((lo[0] + hi[0]) / 2, (lo[1] + hi[1]) / 2, (bottom + top) / 2))
+    cam.data.ortho_scale = max(top - bottom, hi[0] - lo[0]) * 1.05
+    cam.location = target + VIEW_DIRECTION * (height * 4 + 1)
+    cam.rotation_euler = (-VIEW_DIRECTION).to_track_quat('-Z', 'Y').to_euler()
+    cam.data.clip_end = height * 10 + 10
+
+
+def render(path, size):
+    sc = bpy.context.scene
+    sc.render.resolution_x = sc.render.resolution_y = size
+    sc.render.resolution_percentage = 100
+    sc.render.filepath = str(path)
+    bpy.ops.render.render(write_still=True)
+    image = bpy.data.images.load(str(path))
+    pixels = np.empty(size * size * 4, dtype=np.float32)
+    image.pixels.foreach_get(pixels)
+    bpy.data.images.remove(image)
+    # Bottom-up float pixels to top-down uint8 rows.
+    return (np.clip(pixels.reshape(size, size, 4)[::-1], 0, 1) * 255 + 0.5).astype(np.uint8)
+
+
+def silhouette(rgba):
+    out = np.zeros_like(rgba)
+    out[..., 3] = rgba[..., 3]
+    return out
+
+
+def run(job):
+    load_studio(job["studio"], int(job.get("samples", 32)))
+    imported = scene.import_asset(job["source"])
+    meshes = scene.mesh_objects(imported)
+    if not meshes:
+        raise RuntimeError(f"No mesh found in {job['source']}")
+    pose(imported, job.get("action"), job.get("frame", 0))
+    lo, hi = posed_bounds(meshes)
+
+    out = Path(job["output_dir"])
+    out.mkdir(parents=True, exist_ok=True)
+    name = job["name"]
+    arrays = {}
+    for variant, (size, framing) in RENDERS.items():
+        frame_camera(lo, hi, framing)
+        rgba = render(out / f"{name}_{variant}.png", size)
+        if variant == "full":
+            variant, rgba = "silhouette", silhouette(rgba)
+        path = out / f"{name}_{variant}.npy"
+        np.save(path, rgba)
+        arrays[variant] = str(path)
+    print(f"✓ Rendered {', '.join(arrays)} for {name}")
+    return {"name": name, "sprites": arrays}
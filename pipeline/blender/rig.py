@@ -0,0 +1,154 @@
+"""Rig stage: import a generated model, build the humanoid armature, skin every mesh.
+
+Job keys:
+    source       input .glb/.gltf/.fbx
+    output       rigged .glb to write
+    armature     armature object name (default "Armature")
+    weights      "auto" (bone heat), "vectorized" (NumPy bone-distance solve)
+                 or "root" (every vertex on Root)
+    join_meshes  merge all imported meshes into one skinned mesh before
+                 weighting: one object and one skin instead of one per part
+    weld         weld duplicated seam vertices first (see the weld stage)
+    weights_shm  with "vectorized": ``pipeline.shm`` manifest of precomputed
+                 ``indices``/``weights`` rows (see ``pipeline.analysis``),
+                 used instead of solving inside Blender
+    images       "passthrough" (default) copies a glTF source's compressed
+                 images into the output unchanged, "external" writes them
+                 once next to the output and references them, "reencode"
+                 lets the exporter decode and encode them again
+"""
+
+from pathlib import Path
+
+import bpy
+
+from pipeline import shm, skeleton, weights
+from pipeline.blender import scene
+from pipeline.blender import weld as welding
+from pipeline.blender.worker import progress
+
+WEIGHT_MODES = ("auto", "vectorized", "root")
+IMAGE_MODES = ("passthrough", "external", "reencode")
+
+
+def build_armature(name, names, parents, heads, tails):
+    bpy.ops.object.armature_add(enter_editmode=True, location=(0, 0, 0))
+    armature_obj = bpy.context.active_object
+    armature_obj.name = name
+    edit_bones = armature_obj.data.edit_bones
+    edit_bones.remove(edit_bones[0])
+    created = {}
+    for bone_name, parent, head, tail in zip(names, parents, heads, tails):
+        bone = edit_bones.new(bone_name)
+        bone.head = tuple(head)
+        bone.tail = tuple(tail)
+        if parent:
+            bone.parent = created[parent]
+        created[bone_name] = bone
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return armature_obj
+
+
+def parent_to_armature(meshes, armature_obj, parent_type):
+    """Parent all meshes in one operator call so they share one skeleton."""
+    scene.select_only(meshes + [armature_obj], active=armature_obj)
+    bpy.ops.object.parent_set(type=parent_type)
+    for mesh_obj in meshes:
+        mod = next((m for m in mesh_obj.modifiers if m.type == 'ARMATURE'), None)
+        if mod is None:
+            mod = mesh_obj.modifiers.new(name="Armature", type='ARMATURE')
+        mod.object = armature_obj
+        mod.use_vertex_groups = True
+
+
+def write_weights(meshes, offsets, bone_names, indices, vertex_weights):
+    """Split the joint solve back into per-object vertex groups."""
+    for i, mesh_obj in enumerate(meshes):
+        lo, hi = offsets[i], offsets[i + 1]
+        groups = {name: mesh_obj.vertex_groups.get(name) or mesh_obj.vertex_groups.new(name=name)
+                  for name in bone_names}
+        for bone, weight, rows in weights.quantize_groups(indices[lo:hi], vertex_weights[lo:hi]):
+            groups[bone_names[bone]].add(rows.tolist(), float(weight), 'REPLACE')
+
+
+def precomputed_weights(manifest, vertex_count):
+    with shm.attach(manifest) as solved:
+        indices, vertex_weights = solved["indices"].copy(), solved["weights"].copy()
+    if len(indices) != vertex_count:
+        raise RuntimeError(f"precomputed weights cover {len(indices)} vertices, the meshes have {vertex_count}")
+    return indices, vertex_weights
+
+
+def weight_root(meshes):
+    for mesh_obj in meshes:
+        vg = mesh_obj.vertex_groups.get("Root") or mesh_obj.vertex_groups.new(name="Root")
+        vg.add(range(len(mesh_obj.data.vertices)), 1.0, 'REPLACE')
+
+
+def unweighted_counts(meshes):
+    counts = {}
+    for mesh_obj in meshes:
+        counts[mesh_obj.name] = sum(1 for v in mesh_obj.data.vertices if not v.groups)
+    return counts
+
+
+def run(job):
+    mode = job.get("weights", "auto")
+    if mode not in WEIGHT_MODES:
+        raise ValueError(f"unknown weights mode {mode!r}, expected one of {WEIGHT_MODES}")
+    images = job.get("images", "passthrough")
+    if images not in IMAGE_MODES:
+        raise ValueError(f"unknown images mode {images!r}, expected one of {IMAGE_MODES}")
+
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    meshes = scene.mesh_objects(imported)
+    if not meshes:
+        raise RuntimeError(f"No mesh found in {job['source']}")
+    print(f"Found {len(meshes)} mesh(es): {', '.join(m.name for m in meshes)}")
+    progress("imported", meshes=len(meshes))
+    welded = {}
+    if job.get("weld"):
+        welded = welding.totals(welding.weld_all(meshes))
+        progress("welded", **welded)
+
+    # One pass over all meshes together: bounds, grounding and bone layout
+    # come from the concatenated vertex array, not from the first mesh.
+    points, offsets = scene.world_positions(meshes)
+    points = scene.ground(meshes, points)
+    if job.get("join_meshes") and len(meshes) > 1:
+        meshes = [scene.join_meshes(meshes)]
+        points, offsets = scene.world_positions(meshes)
+    names, parents, heads, tails = skeleton.humanoid_bones(points.min(axis=0), points.max(axis=0))
+    armature_obj = build_armature(job.get("armature", "Armature"), names, parents, heads, tails)
+    progress("armature", bones=len(names), vertices=int(len(points)))
+
+    if mode == "auto":
+        parent_to_armature(meshes, armature_obj, 'ARMATURE_AUTO')
+    else:
+        parent_to_armature(meshes, armature_obj, 'ARMATURE_NAME')
+        if mode == "vectorized":
+            if job.get("weights_shm"):
+                indices, vertex_weights = precomputed_weights(job["weights_shm"], len(points))
+            else:
+                indices, vertex_weights = weights.bone_segment_weights(points, heads, tails)
+            write_weights(meshes, offsets, names, indices, vertex_weights)
+        else:
+            weight_root(meshes)
+
+    unweighted = unweighted_counts(meshes)
+    progress("weighted", weights=mode, unweighted=sum(unweighted.values()))
+    image_files = scene.export_glb(job["output"], [armature_obj] + meshes, animations=False,
+                                   images_from=None if images == "reencode" else job["source"],
+                                   image_dir=Path(job["output"]).parent if images == "external" else None)
+    print(f"✓ Rigged {len(meshes)} mesh(es), {len(points)} vertices, {len(names)} bones -> {job['output']}")
+    return {
+        "output": job["output"],
+        "meshes": [m.name for m in meshes],
+        "vertices": int(len(points)),
+        "bones": len(names),
+        "weights": mode,
+        "unweighted_vertices": unweighted,
+        "weld": welded,
+        "images": image_files,
+    }
@@ -0,0 +1,129 @@
+"""Root-motion stage: animate every clip in place and move its travel to a root-motion track.
+
+Job keys:
+    source    animated .glb/.gltf/.fbx
+    output    .glb to write
+    metadata  .json to write with each clip's root motion
+    bone      bone whose travel is extracted (default: the first bone
+              without a parent, ``Root`` on our rigs, ``mixamorig:Hips`` on
+              Mixamo clips)
+    fps       samples per second (default: the scene frame rate)
+    track     key the travel on the armature object as well (default true),
+              which exports as a node track Godot can use as
+              ``root_motion_track``
+
+All clips are sampled once, the extraction runs on the stacked frames of
+every clip (``pipeline.root_motion.extract``), and the results are written
+back as linear keys. Metadata is in Godot space (Y up, metres, degrees
+about +Y).
+"""
+
+import json
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+from pipeline import root_motion
+from pipeline.blender import scene
+
+
+def motion_bone(armature_obj, name=None):
+    bones = armature_obj.data.bones
+    if name:
+        if name not in bones:
+            raise RuntimeError(f"{armature_obj.name} has no bone {name!r}")
+        bone = bones[name]
+    else:
+        bone = next((b for b in bones if b.parent is None), None)
+        if bone is None:
+            raise RuntimeError(f"{armature_obj.name} has no bones")
+    if bone.parent is not None:
+        raise RuntimeError(f"root motion is taken from a top-level bone; {bone.name} has parent {bone.parent.name}")
+    if armature_obj.pose.bones[bone.name].rotation_mode != 'QUATERNION':
+        raise RuntimeError(f"{bone.name} uses {armature_obj.pose.bones[bone.name].rotation_mode} rotation; "
+                           "root motion needs quaternion rotation")
+    return bone
+
+
+def write_track(armature_obj, actions, frames, translation, yaw, up):
+    """Key the armature object with each clip's travel, in the clip's own action."""
+    matrix = scene.matrix_array(armature_obj.matrix_world)[:3, :3]
+    armature_obj.rotation_mode = 'QUATERNION'
+    base_location = np.array(armature_obj.location)
+    base_rotation = np.array(armature_obj.rotation_quaternion)
+    world_up = matrix @ up
+    for action, f, t, y in zip(actions, frames, translation, yaw):
+        turn = root_motion.quat_multiply(root_motion.axis_angle_quat(world_up, y), base_rotation)
+        scene.write_curves(action, "location", f, base_location + t @ matrix.T, group="Object Transforms")
+        scene.write_curves(action, "rotation_quaternion", f, turn, group="Object Transforms")
+
+
+def clip_metadata(action, frames, translation, yaw, matrix, fps):
+    times = (np.asarray(frames) - frames[0]) / fps
+    world = scene.blender_to_gltf(translation @ matrix.T)
+    meta = root_motion.summarize(times, world, yaw)
+    meta["samples"] = {
+        "times": np.round(times, 5).tolist(),
+        "translation": np.round(world, 5).tolist(),
+        "yaw_degrees": np.round(np.degrees(yaw), 4).tolist(),
+    }
+    return {"clip": action.name, "frames": len(frames), **meta}
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    armature_obj = scene.armature_object(imported)
+    if armature_obj is None:
+        raise RuntimeError(f"No armature found in {job['source']}")
+    actions = scene.armature_actions(armature_obj)
+    if not actions:
+        raise RuntimeError(f"{armature_obj.name} in {job['source']} has no action")
+    bone = motion_bone(armature_obj, job.get("bone"))
+    render = bpy.context.scene.render
+    scene_fps = render.fps / render.fps_base
+    fps = float(job.get("fps") or scene_fps)
+
+    location_path = f'pose.bones["{bone.name}"].location'
+    rotation_path = f'pose.bones["{bone.name}"].rotation_quaternion'
+    frames = [np.asarray(scene.sample_frames(action, fps)) for action in actions]
+    locations = np.concatenate([scene.sample_curves(a, location_path, f, (0.0, 0.0, 0.0))
+                                for a, f in zip(actions, frames)])
+    rotations = np.concatenate([scene.sample_curves(a, rotation_path, f, (1.0, 0.0, 0.0, 0.0))
+                                for a, f in zip(actions, frames)])
+    clips = np.repeat(np.arange(len(actions)), [len(f) for f in frames])
+
+    matrix = scene.matrix_array(armature_obj.matrix_world)[:3, :3]
+    up = np.linalg.solve(matrix, [0.0, 0.0, 1.0])
+    rest = scene.matrix_array(bone.matrix_local)
+    result = root_motion.extract(locations, rotations, clips, rest[:3, 3], rest[:3, :3], up)
+
+    splits = np.cumsum([len(f) for f in frames])[:-1]
+    per_clip = {key: np.split(value, splits) for key, value in result.items()}
+    for i, action in enumerate(actions):
+        scene.write_curves(action, location_path, frames[i], per_clip["locations"][i], group=bone.name)
+        scene.write_curves(action, rotation_path, frames[i], per_clip["rotations"][i], group=bone.name)
+    if job.get("track", True):
+        write_track(armature_obj, actions, frames, per_clip["translation"], per_clip["yaw"], up)
+
+    metadata = {
+        "bone": bone.name,
+        "track": bool(job.get("track", True)),
+        "clips": {action.name: clip_metadata(action, frames[i], per_clip["translation"][i], per_clip["yaw"][i],
+                                             matrix, scene_fps)
+                  for i, action in enumerate(actions)},
+    }
+    Path(job["metadata"]).parent.mkdir(parents=True, exist_ok=True)
+    Path(job["metadata"]).write_text(json.dumps(metadata, indent=2) + "\n")
+    scene.export_glb(job["output"], imported, animations=True, images_from=job["source"])
+    moving = [name for name, clip in metadata["clips"].items() if clip["distance"] > 1e-4]
+    print(f"✓ Extracted root motion of {bone.name} from {len(actions)} clip(s), {len(moving)} moving "
+          f"-> {job['output']}")
+    return {
+        "output": job["output"],
+        "metadata": job["metadata"],
+        "bone": bone.name,
+        "clips": {name: {k: clip[k] for k in ("distance", "yaw_degrees", "returns_to_start")}
+                  for name, clip in metadata["clips"].items()},
+    }
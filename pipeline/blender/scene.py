@@ -0,0 +1,235 @@
+"""Scene helpers: clean import, mesh gathering and bulk array readback."""
+
+import math
+from pathlib import Path
+
+import bpy
+import numpy as np
+
+from pipeline import glb_images
+
+# Keyframe.interpolation values as integers, for foreach_set.
+KEY_LINEAR = 1
+KEY_BEZIER = 2
+IMPORTERS = {
+    ".glb": lambda path: bpy.ops.import_scene.gltf(filepath=path),
+    ".gltf": lambda path: bpy.ops.import_scene.gltf(filepath=path),
+    ".fbx": lambda path: bpy.ops.import_scene.fbx(filepath=path),
+}
+
+
+def reset():
+    bpy.ops.wm.read_homefile(use_empty=True)
+
+
+def import_asset(path):
+    """Import ``path`` into the current scene and return the new objects."""
+    before = set(bpy.context.scene.objects)
+    IMPORTERS[Path(path).suffix.lower()](str(path))
+    return [obj for obj in bpy.context.scene.objects if obj not in before]
+
+
+def mesh_objects(objects=None):
+    """Every mesh object, in a stable (name) order — not just the first one."""
+    objects = bpy.context.scene.objects if objects is None else objects
+    return sorted((obj for obj in objects if obj.type == 'MESH'), key=lambda obj: obj.name)
+
+
+def matrix_array(matrix):
+    return np.array(matrix, dtype=np.float64).reshape(4, 4)
+
+
+def mesh_positions(mesh):
+    co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", co)
+    return co.reshape(-1, 3)
+
+
+def local_positions(obj):
+    return mesh_positions(obj.data)
+
+
+def vertex_normals(mesh):
+    normals = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    if hasattr(mesh, "vertex_normals"):  # Blender 4.1+
+        mesh.vertex_normals.foreach_get("vector", normals)
+    else:
+        mesh.vertices.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def corner_normals(mesh):
+    """(loops, 3) split normals, custom normals included."""
+    normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+    if hasattr(mesh, "corner_normals"):  # Blender 4.1+
+        mesh.corner_normals.foreach_get("vector", normals)
+    else:
+        mesh.calc_normals_split()
+        mesh.loops.foreach_get("normal", normals)
+    return normals.reshape(-1, 3)
+
+
+def corner_vertices(mesh):
+    index = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", index)
+    return index
+
+
+def corner_uvs(mesh):
+    """(loops, 2) UVs of the active layer, or None."""
+    if mesh.uv_layers.active is None:
+        return None
+    uv = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+    mesh.uv_layers.active.data.foreach_get("uv", uv)
+    return uv.reshape(-1, 2)
+
+
+def evaluated_arrays(obj, depsgraph):
+    """Deformed local positions and normals of ``obj`` for the current frame."""
+    evaluated = obj.evaluated_get(depsgraph)
+    mesh = evaluated.to_mesh()
+    try:
+        return mesh_positions(mesh), vertex_normals(mesh)
+    finally:
+        evaluated.to_mesh_clear()
+
+
+def sample_frames(action, fps):
+    """Evenly spaced (possibly fractional) frames covering ``action`` at ``fps`` samples/s."""
+    render = bpy.context.scene.render
+    scene_fps = render.fps / render.fps_base
+    start, end = action.frame_range
+    count = max(1, int(round((end - start) / scene_fps * fps)) + 1)
+    return [start + i * (end - start) / max(1, count - 1) for i in range(count)]
+
+
+def set_frame(frame):
+    whole = int(math.floor(frame))
+    bpy.context.scene.frame_set(whole, subframe=frame - whole)
+
+
+def blender_to_gltf(vectors):
+    """Blender Z-up to glTF/Godot Y-up: (x, y, z) -> (x, z, -y)."""
+    return np.stack([vectors[..., 0], vectors[..., 2], -vectors[..., 1]], axis=-1)
+
+
+def world_positions(objects):
+    """Concatenated world-space vertex positions of ``objects``.
+
+    Returns (points, offsets): ``points[offsets[i]:offsets[i + 1]]`` belong to
+    ``objects[i]``.
+    """
+    chunks = []
+    for obj in objects:
+        m = matrix_array(obj.matrix_world)
+        chunks.append(local_positions(obj).astype(np.float64) @ m[:3, :3].T + m[:3, 3])
+    offsets = np.cumsum([0] + [len(c) for c in chunks])
+    points = np.concatenate(chunks) if chunks else np.empty((0, 3))
+    return points, offsets
+
+
+def ground(objects, points):
+    """Move the top-level objects so the lowest vertex sits at Z=0."""
+    min_z = float(points[:, 2].min())
+    for obj in {_root(obj) for obj in objects}:
+        obj.location.z -= min_z
+    bpy.context.view_layer.update()
+    points = points.copy()
+    points[:, 2] -= min_z
+    return points
+
+
+def _root(obj):
+    while obj.parent is not None:
+        obj = obj.parent
+    return obj
+
+
+def select_only(objects, active=None):
+    bpy.ops.object.select_all(action='DESELECT')
+    for obj in objects:
+        obj.select_set(True)
+    bpy.context.view_layer.objects.active = active or (objects[0] if objects else None)
+
+
+def join_meshes(meshes):
+    """Join ``meshes`` into the largest one and return it.
+
+    Materials stay separate surfaces; vertex groups and the armature modifier
+    of the target carry over, so skinned parts stay skinned.
+    """
+    target = max(meshes, key=lambda obj: len(obj.data.vertices))
+    if len(meshes) > 1:
+        select_only(meshes, active=target)
+        bpy.ops.object.join()
+    return target
+
+
+def armature_object(objects=None):
+    objects = bpy.context.scene.objects if objects is None else objects
+    return next((obj for obj in objects if obj.type == 'ARMATURE'), None)
+
+
+def armature_actions(armature_obj):
+    """Actions on the armature: the active one plus those on NLA tracks, by name."""
+    data = armature_obj.animation_data
+    if data is None:
+        return []
+    found = {strip.action for track in data.nla_tracks for strip in track.strips if strip.action}
+    if data.action:
+        found.add(data.action)
+    return sorted(found, key=lambda action: action.name)
+
+
+def sample_curves(action, data_path, frames, defaults):
+    """(frames, len(defaults)) values of one property's F-curves; missing channels keep their default."""
+    out = np.tile(np.asarray(defaults, dtype=np.float64), (len(frames), 1))
+    for index in range(len(defaults)):
+        curve = action.fcurves.find(data_path, index=index)
+        if curve is not None:
+            out[:, index] = [curve.evaluate(frame) for frame in frames]
+    return out
+
+
+def write_curves(action, data_path, frames, values, group="", interpolation=KEY_LINEAR):
+    """Replace the keys of one property's F-curves with keys at ``frames`` (linear by default)."""
+    frames = np.asarray(frames, dtype=np.float64)
+    for index, column in enumerate(np.asarray(values, dtype=np.float64).T):
+        curve = action.fcurves.find(data_path, index=index)
+        if curve is None:
+            curve = action.fcurves.new(data_path, index=index, action_group=group)
+        points = curve.keyframe_points
+        points.clear()
+        points.add(len(frames))
+        points.foreach_set("co", np.column_stack([frames, column]).ravel())
+        points.foreach_set("interpolation", [interpolation] * len(frames))
+        curve.update()
+
+
+def export_glb(path, objects, animations=True, skins=True, images_from=None, image_dir=None, **options):
+    """Export ``objects`` to a GLB; returns the external image files written.
+
+    With a glTF ``images_from`` (the imported source), textures are not
+    re-encoded: the source's compressed images are carried over verbatim,
+    embedded or, with ``image_dir``, as shared external files (see
+    ``pipeline.glb_images``).
+    """
+    passthrough = images_from is not None and Path(images_from).suffix.lower() in (".glb", ".gltf")
+    if passthrough:
+        options.setdefault("export_image_format", 'NONE')
+    select_only(objects)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    bpy.ops.export_scene.gltf(
+        filepath=str(path),
+        check_existing=False,
+        export_format='GLB',
+        use_selection=True,
+        export_animations=animations,
+        export_skins=skins,
+        export_apply=False,
+        export_yup=True,
+        **options,
+    )
+    if passthrough:
+        return glb_images.transplant_images(path, images_from, image_dir)
+    return []
@@ -0,0 +1,49 @@
+"""Split stage: separate an animated model into a model GLB and a clip-pack GLB.
+
+Job keys:
+    source  rigged, animated .glb/.gltf/.fbx
+    model   .glb to write with meshes, armature and skin, no animation
+    clips   .glb to write with the armature and every action, no meshes
+
+Editing a clip then changes only the clip pack: the model file stays
+byte-identical, so it is not re-published, re-imported or re-downloaded.
+The model is exported in rest pose with no active action.
+"""
+
+import bpy
+
+from pipeline.blender import scene
+
+
+def rest_pose(armature_obj):
+    if armature_obj.animation_data:
+        armature_obj.animation_data.action = None
+    for bone in armature_obj.pose.bones:
+        bone.location = (0.0, 0.0, 0.0)
+        bone.rotation_quaternion = (1.0, 0.0, 0.0, 0.0)
+        bone.rotation_euler = (0.0, 0.0, 0.0)
+        bone.scale = (1.0, 1.0, 1.0)
+    bpy.context.view_layer.update()
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    armature_obj = scene.armature_object(imported)
+    if armature_obj is None:
+        raise RuntimeError(f"No armature found in {job['source']}")
+    meshes = scene.mesh_objects(imported)
+    actions = scene.armature_actions(armature_obj)
+    if not actions:
+        raise RuntimeError(f"{armature_obj.name} in {job['source']} has no action")
+
+    scene.export_glb(job["clips"], [armature_obj], animations=True)
+    rest_pose(armature_obj)
+    scene.export_glb(job["model"], [armature_obj] + meshes, animations=False, images_from=job["source"])
+    print(f"✓ Split {len(meshes)} mesh(es) from {len(actions)} clip(s) -> {job['model']}, {job['clips']}")
+    return {
+        "model": job["model"],
+        "clips": job["clips"],
+        "actions": [action.name for action in actions],
+        "meshes": [obj.name for obj in meshes],
+    }
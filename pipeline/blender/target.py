@@ -0,0 +1,102 @@
+"""Target stage: export one delivery variant of a rigged model.
+
+Job keys:
+    source   rigged .glb (the shared, already weighted scene)
+    output   .glb to write
+    profile  export profile (see ``pipeline.fanout.TARGETS``):
+             decimate      LOD ratio for every mesh (1 keeps the mesh)
+             texture_size  longest image side; larger images are scaled
+                           down and re-encoded, None passes them through
+             clips         action names to keep (None: all)
+             skins, animations   exporter switches
+             export        extra ``export_scene.gltf`` options
+
+Only the cheap work happens here: import of the rigged file, the
+variant's reductions and one export.
+"""
+
+import bpy
+
+from pipeline.blender import scene
+
+
+def decimate(meshes, ratio):
+    """Apply a collapse decimation to every mesh; vertex groups are interpolated."""
+    for obj in meshes:
+        mod = obj.modifiers.new("LOD", 'DECIMATE')
+        mod.ratio = ratio
+        scene.select_only([obj])
+        # Decimate the rest shape, before the armature deforms it.
+        bpy.ops.object.modifier_move_to_index(modifier=mod.name, index=0)
+        bpy.ops.object.modifier_apply(modifier=mod.name)
+
+
+def material_images(meshes):
+    images = {}
+    for obj in meshes:
+        for material in obj.data.materials:
+            if material is None or not material.use_nodes:
+                continue
+            for node in material.node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image is not None:
+                    images[node.image.name] = node.image
+    return list(images.values())
+
+
+def shrink_images(images, size):
+    """Scale images whose longest side exceeds ``size``; returns the names scaled."""
+    scaled = []
+    for image in images:
+        width, height = image.size
+        if max(width, height) > size:
+            factor = size / max(width, height)
+            image.scale(max(1, round(width * factor)), max(1, round(height * factor)))
+            scaled.append(image.name)
+    return scaled
+
+
+def keep_clips(armature_obj, names):
+    keep = set(names)
+    data = armature_obj.animation_data
+    if data is not None:
+        if data.action and data.action.name not in keep:
+            data.action = None
+        for track in list(data.nla_tracks):
+            if not any(strip.action and strip.action.name in keep for strip in track.strips):
+                data.nla_tracks.remove(track)
+    for action in list(bpy.data.actions):
+        if action.name not in keep:
+            bpy.data.actions.remove(action)
+
+
+def run(job):
+    profile = job["profile"]
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    meshes = scene.mesh_objects(imported)
+    armature_obj = scene.armature_object(imported)
+    vertices_before = sum(len(obj.data.vertices) for obj in meshes)
+
+    ratio = float(profile.get("decimate", 1.0))
+    if ratio < 1.0:
+        decimate(meshes, ratio)
+    scaled = []
+    if profile.get("texture_size"):
+        scaled = shrink_images(material_images(meshes), int(profile["texture_size"]))
+    if profile.get("clips") is not None and armature_obj is not None:
+        keep_clips(armature_obj, profile["clips"])
+    clips = scene.armature_actions(armature_obj) if armature_obj is not None else []
+    animations = profile.get("animations", True) and bool(clips)
+
+    scene.export_glb(job["output"], imported, animations=animations, skins=profile.get("skins", True),
+                     images_from=None if scaled else job["source"], **profile.get("export", {}))
+    vertices = sum(len(obj.data.vertices) for obj in meshes)
+    print(f"✓ Target {job['output']}: {vertices_before} -> {vertices} vertices, "
+          f"{len(scaled)} image(s) scaled, {len(clips) if animations else 0} clip(s)")
+    return {
+        "output": job["output"],
+        "vertices_before": vertices_before,
+        "vertices": vertices,
+        "images_scaled": scaled,
+        "clips": [a.name for a in clips] if animations else [],
+    }
@@ -0,0 +1,181 @@
+"""VAT stage: bake skinned animation into vertex animation textures.
+
+Job keys:
+    source      rigged + animated .glb (e.g. the output of create_ogrork_animations.py)
+    output_dir  directory for the textures, mesh and metadata
+    name        basename of the outputs
+    actions     action names to bake (default: every action in the file)
+    fps         samples per second (default 15)
+    max_width   texture width cap (default 4096)
+
+Outputs ``<name>_vat_pos.exr`` / ``<name>_vat_nrm.exr`` (half-float RGBA,
+one texel per vertex per sample), ``<name>_vat.glb`` (the rest mesh with a
+second UV layer addressing its texel column/row) and ``<name>_vat.json``.
+Row ``clip_row + frame * rows_per_frame + UV2.y * rows_per_frame`` holds a
+frame of a clip; see ``godot_fighter/assets/shaders/vat.gdshader``.
+"""
+
+import json
+import math
+from pathlib import Path
+
+import bpy
+import numpy as np
+from mathutils import Matrix
+
+from pipeline.blender import scene
+
+MAX_TEXTURE_SIZE = 16384
+# Lossless and without mipmaps: VAT texels are data, not colour.
+TEXTURE_IMPORT = """[remap]
+
+importer="texture"
+type="CompressedTexture2D"
+
+[params]
+
+compress/mode=0
+mipmaps/generate=false
+process/fix_alpha_border=false
+detect_3d/compress_to=0
+"""
+
+
+def texture_layout(vertex_count, max_width):
+    width = min(max_width, 1 << max(0, (vertex_count - 1).bit_length()))
+    return width, math.ceil(vertex_count / width)
+
+
+def fixed_rate_frames(action, fps):
+    """(frames exactly 1/``fps`` apart, clip seconds); the end pose is held as the last sample.
+
+    The shader shows every sample for 1/fps, so evenly stretched samples
+    (``scene.sample_frames``) would drift from the clip's real length.
+    """
+    render = bpy.context.scene.render
+    scene_fps = render.fps / render.fps_base
+    start, end = action.frame_range
+    step = scene_fps / fps
+    count = int(math.floor((end - start) / step + 1e-6)) + 1
+    frames = [start + i * step for i in range(count)]
+    if frames[-1] < end - 1e-6:
+        frames.append(end)
+    return frames, (end - start) / scene_fps
+
+
+def bake_action(armature_obj, mesh_obj, action, frames):
+    """(frames, V, 3) positions and normals; one depsgraph evaluation per frame."""
+    armature_obj.animation_data.action = action
+    vertex_count = len(mesh_obj.data.vertices)
+    positions = np.empty((len(frames), vertex_count, 3), dtype=np.float32)
+    normals = np.empty_like(positions)
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    for i, frame in enumerate(frames):
+        scene.set_frame(frame)
+        positions[i], normals[i] = scene.evaluated_arrays(mesh_obj, depsgraph)
+    return positions, normals
+
+
+def pack_rows(samples, width, rows_per_frame):
+    """(frames, V, 3) -> (frames * rows_per_frame, width, 4) texel rows."""
+    frames, vertex_count, _ = samples.shape
+    packed = np.zeros((frames, rows_per_frame * width, 4), dtype=np.float32)
+    packed[:, :vertex_count, :3] = scene.blender_to_gltf(samples)
+    packed[:, :vertex_count, 3] = 1.0
+    return packed.reshape(frames * rows_per_frame, width, 4)
+
+
+def save_exr(path, rows):
+    height, width, _ = rows.shape
+    image = bpy.data.images.new(Path(path).stem, width=width, height=height, alpha=True, float_buffer=True)
+    image.colorspace_settings.name = 'Non-Color'
+    # Blender images start at the bottom row; flip so row 0 is the top of the file.
+    image.pixels.foreach_set(np.ascontiguousarray(rows[::-1]).ravel())
+    image.filepath_raw = str(path)
+    image.file_format = 'OPEN_EXR'
+    image.use_half_precision = True
+    image.save()
+    bpy.data.images.remove(image)
+    Path(str(path) + ".import").write_text(TEXTURE_IMPORT)
+
+
+def add_vat_uvs(mesh_obj, width, rows_per_frame):
+    """Second UV layer: texel column and row-within-frame of each loop's vertex."""
+    mesh = mesh_obj.data
+    vertex_index = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", vertex_index)
+    uv = np.empty((len(mesh.loops), 2), dtype=np.float32)
+    uv[:, 0] = (vertex_index % width + 0.5) / width
+    # glTF flips V on export; pre-flip so Godot reads the row directly.
+    uv[:, 1] = 1.0 - (vertex_index // width + 0.5) / rows_per_frame
+    layer = mesh.uv_layers.new(name="VAT")
+    layer.data.foreach_set("uv", uv.ravel())
+
+
+def export_rest_mesh(mesh_obj, path, width, rows_per_frame):
+    mesh_obj.animation_data_clear()
+    for mod in [m for m in mesh_obj.modifiers if m.type == 'ARMATURE']:
+        mesh_obj.modifiers.remove(mod)
+    # Baked positions are mesh-local, so the exported node must be identity
+    # for MultiMesh instances (which ignore node transforms) to line up.
+    mesh_obj.parent = None
+    mesh_obj.matrix_world = Matrix.Identity(4)
+    mesh_obj.vertex_groups.clear()
+    add_vat_uvs(mesh_obj, width, rows_per_frame)
+    scene.export_glb(path, [mesh_obj], animations=False, skins=False)
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    armature_obj = scene.armature_object(imported)
+    meshes = scene.mesh_objects(imported)
+    if armature_obj is None or not meshes:
+        raise RuntimeError(f"{job['source']} needs an armature and at least one mesh")
+    mesh_obj = scene.join_meshes(meshes)
+    if armature_obj.animation_data is None:
+        armature_obj.animation_data_create()
+
+    wanted = job.get("actions") or sorted(a.name for a in bpy.data.actions)
+    actions = [bpy.data.actions[name] for name in wanted]
+    fps = float(job.get("fps", 15))
+
+    vertex_count = len(mesh_obj.data.vertices)
+    width, rows_per_frame = texture_layout(vertex_count, int(job.get("max_width", 4096)))
+    positions, normals, clips = [], [], {}
+    row = 0
+    for action in actions:
+        frames, seconds = fixed_rate_frames(action, fps)
+        pos, nrm = bake_action(armature_obj, mesh_obj, action, frames)
+        positions.append(pos)
+        normals.append(nrm)
+        clips[action.name] = {"row": row, "frames": len(frames), "seconds": seconds}
+        row += len(frames) * rows_per_frame
+    if row > MAX_TEXTURE_SIZE:
+        raise RuntimeError(f"VAT needs {row} rows (> {MAX_TEXTURE_SIZE}); bake fewer clips, "
+                           f"a lower fps or a decimated mesh ({vertex_count} vertices)")
+
+    out = Path(job["output_dir"])
+    out.mkdir(parents=True, exist_ok=True)
+    name = job["name"]
+    positions = np.concatenate(positions)
+    save_exr(out / f"{name}_vat_pos.exr", pack_rows(positions, width, rows_per_frame))
+    save_exr(out / f"{name}_vat_nrm.exr", pack_rows(np.concatenate(normals), width, rows_per_frame))
+    bpy.context.scene.frame_set(0)
+    export_rest_mesh(mesh_obj, out / f"{name}_vat.glb", width, rows_per_frame)
+
+    flat = scene.blender_to_gltf(positions.reshape(-1, 3))
+    meta = {
+        "name": name,
+        "vertex_count": vertex_count,
+        "width": width,
+        "height": row,
+        "rows_per_frame": rows_per_frame,
+        "fps": fps,
+        "clips": clips,
+        "bounds": {"min": flat.min(axis=0).tolist(), "max": flat.max(axis=0).tolist()},
+    }
+    (out / f"{name}_vat.json").write_text(json.dumps(meta, indent=2))
+    files = [f"{name}_vat_pos.exr", f"{name}_vat_nrm.exr", f"{name}_vat.glb", f"{name}_vat.json"]
+    print(f"✓ Baked {len(clips)} clip(s) into {width}x{row} VAT for {vertex_count} vertices")
+    return {"files": [str(out / f) for f in files], **meta}
@@ -0,0 +1,97 @@
+"""Weld stage: merge duplicated seam vertices of a generated model.
+
+Job keys:
+    source        input .glb/.gltf/.fbx
+    output        welded .glb to write
+    tolerance     weld distance as a fraction of the model's largest extent
+                  (default 1e-6)
+    normal_angle  corners of a welded vertex whose normals are within this
+                  many degrees are smoothed together (default 5); larger
+                  differences stay hard edges
+
+The merge map comes from one hashing pass in ``pipeline.weld``; the merge
+itself is ``bmesh.ops.weld_verts``, which keeps UVs, colours and materials
+per corner. Corner normals ride along as a temporary corner attribute and
+are restored as custom split normals.
+"""
+
+import math
+
+import bmesh
+import numpy as np
+
+from pipeline import weld
+from pipeline.blender import scene
+
+NORMAL_ATTRIBUTE = "_weld_normal"
+
+
+def export_vertices(mesh):
+    return weld.split_count(scene.corner_vertices(mesh), scene.corner_normals(mesh), scene.corner_uvs(mesh))
+
+
+def set_corner_normals(mesh, normals):
+    if hasattr(mesh, "use_auto_smooth"):  # before Blender 4.1
+        mesh.use_auto_smooth = True
+    smooth = np.ones(len(mesh.polygons), dtype=bool)
+    mesh.polygons.foreach_set("use_smooth", smooth)
+    mesh.normals_split_custom_set(normals.tolist())
+
+
+def weld_mesh(obj, distance, normal_angle):
+    """Weld ``obj``'s mesh in place; returns before/after vertex counts."""
+    mesh = obj.data
+    stats = {"vertices_before": len(mesh.vertices), "export_vertices_before": export_vertices(mesh)}
+    target, count = weld.weld_map(scene.mesh_positions(mesh), distance)
+    if count < len(mesh.vertices):
+        attr = mesh.attributes.new(NORMAL_ATTRIBUTE, 'FLOAT_VECTOR', 'CORNER')
+        attr.data.foreach_set("vector", scene.corner_normals(mesh).ravel())
+        bm = bmesh.new()
+        bm.from_mesh(mesh)
+        bm.verts.ensure_lookup_table()
+        verts = bm.verts
+        moved = np.flatnonzero(target != np.arange(len(target)))
+        bmesh.ops.weld_verts(bm, targetmap={verts[i]: verts[target[i]] for i in moved.tolist()})
+        bm.to_mesh(mesh)
+        bm.free()
+
+        attr = mesh.attributes[NORMAL_ATTRIBUTE]
+        normals = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        attr.data.foreach_get("vector", normals)
+        mesh.attributes.remove(attr)
+        normals = weld.merge_normals(scene.corner_vertices(mesh), normals.reshape(-1, 3),
+                                     len(mesh.vertices), math.radians(normal_angle))
+        set_corner_normals(mesh, normals)
+        mesh.update()
+    stats.update(vertices_after=len(mesh.vertices), export_vertices_after=export_vertices(mesh))
+    return stats
+
+
+def weld_all(meshes, tolerance=1e-6, normal_angle=5.0):
+    points, _ = scene.world_positions(meshes)
+    extent = float(np.ptp(points, axis=0).max()) if len(points) else 1.0
+    stats = {}
+    for obj in meshes:
+        # Positions are mesh-local; scale the distance into each mesh's space.
+        scale = max(obj.matrix_world.to_scale())
+        stats[obj.name] = weld_mesh(obj, tolerance * extent / max(scale, 1e-12), normal_angle)
+    return stats
+
+
+def totals(stats):
+    keys = ("vertices_before", "vertices_after", "export_vertices_before", "export_vertices_after")
+    return {k: sum(s[k] for s in stats.values()) for k in keys}
+
+
+def run(job):
+    scene.reset()
+    imported = scene.import_asset(job["source"])
+    meshes = scene.mesh_objects(imported)
+    if not meshes:
+        raise RuntimeError(f"No mesh found in {job['source']}")
+    stats = weld_all(meshes, float(job.get("tolerance", 1e-6)), float(job.get("normal_angle", 5.0)))
+    scene.export_glb(job["output"], imported, images_from=job["source"])
+    total = totals(stats)
+    print(f"✓ Welded {total['vertices_before']} -> {total['vertices_after']} vertices "
+          f"({total['export_vertices_before']} -> {total['export_vertices_after']} after export splits)")
+    return {"output": job["output"], "meshes": stats, **total}
@@ -0,0 +1,78 @@
+"""Blender entry point for pipeline stages.
+
+    blender --background --factory-startup --python pipeline/blender/worker.py \\
+        -- STAGE JOB.json RESULT.json
+
+``STAGE`` names a module in ``pipeline.blender``; its ``run(job)`` result is
+written to RESULT.json as ``{"ok": true, ...}`` or ``{"ok": false, "error": ...}``.
+
+With ``-- --serve`` the worker stays warm instead: it reads one
+``{"id", "stage", "job"}`` request per stdin line and answers each with a
+stdout line starting with ``RESULT_MARKER``. Anything else on stdout is log.
+
+Stages may call ``progress(step, **fields)`` to report structured progress:
+a stdout line starting with ``PROGRESS_MARKER``, in either mode.
+"""
+
+import importlib
+import json
+import sys
+import time
+import traceback
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+RESULT_MARKER = "@@pipeline-result "
+PROGRESS_MARKER = "@@pipeline-progress "
+
+
+def progress(step, **fields):
+    sys.stdout.write(PROGRESS_MARKER + json.dumps({"step": step, **fields}, default=str) + "\n")
+    sys.stdout.flush()
+
+
+def run_job(stage, job):
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(f"pipeline.blender.{stage}")
+        result = {"ok": True, **(module.run(job) or {})}
+    except Exception:
+        result = {"ok": False, "error": traceback.format_exc()}
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def script_args(argv):
+    return argv[argv.index("--") + 1:] if "--" in argv else []
+
+
+def serve():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request = json.loads(line)
+        result = run_job(request["stage"], request["job"])
+        result["id"] = request.get("id")
+        sys.stdout.write(RESULT_MARKER + json.dumps(result, default=str) + "\n")
+        sys.stdout.flush()
+    return 0
+
+
+def main(argv):
+    args = script_args(argv)
+    if args == ["--serve"]:
+        return serve()
+    stage, job_path, result_path = args
+    with open(job_path) as f:
+        job = json.load(f)
+    result = run_job(stage, job)
+    with open(result_path, "w") as f:
+        json.dump(result, f, indent=2)
+    return 0 if result["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,144 @@
+import itertools
+import json
+import queue
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from .blender.worker import RESULT_MARKER
+from .config import find_blender
+from .errors import PipelineError
+
+WORKER = Path(__file__).resolve().parent / "blender" / "worker.py"
+
+
+class BlenderNotFound(PipelineError):
+    pass
+
+
+def require_blender():
+    exe = find_blender()
+    if not exe:
+        raise BlenderNotFound("Blender not found in PATH (set BLENDER or install Blender 3.6+)")
+    return exe
+
+
+def blender_command(*args):
+    return [require_blender(), "--background", "--factory-startup", "--python", str(WORKER), "--", *map(str, args)]
+
+
+def run_stage(stage, job, timeout=None):
+    """Run ``pipeline.blender.<stage>.run(job)`` in a fresh Blender and return its result."""
+    with tempfile.TemporaryDirectory(prefix=f"blender-{stage}-") as tmp:
+        job_path = Path(tmp) / "job.json"
+        result_path = Path(tmp) / "result.json"
+        job_path.write_text(json.dumps(job, default=str))
+        proc = subprocess.run(
+            blender_command(stage, job_path, result_path),
+            capture_output=True, text=True, timeout=timeout,
+        )
+        if not result_path.is_file():
+            raise PipelineError(f"Blender stage {stage!r} exited with {proc.returncode}:\n{proc.stderr[-2000:]}")
+        result = json.loads(result_path.read_text())
+    result["log"] = proc.stdout
+    return result
+
+
+class BlenderWorker:
+    """A warm Blender process serving stage requests over stdin/stdout."""
+
+    _ids = itertools.count()
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            blender_command("--serve"),
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            text=True, bufsize=1,
+        )
+
+    @property
+    def alive(self):
+        return self.proc.poll() is None
+
+    def submit(self, stage, job):
+        request = {"id": next(self._ids), "stage": stage, "job": job}
+        self.proc.stdin.write(json.dumps(request, default=str) + "\n")
+        self.proc.stdin.flush()
+        log = []
+        for line in self.proc.stdout:
+            if line.startswith(RESULT_MARKER):
+                result = json.loads(line[len(RESULT_MARKER):])
+                result["log"] = "".join(log)
+                return result
+            log.append(line)
+        raise PipelineError(f"Blender worker exited during {stage!r}:\n{''.join(log)[-2000:]}")
+
+    def close(self, timeout=10):
+        if self.alive:
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+
+class WorkerPool:
+    """Up to ``size`` warm Blender workers, started on demand and reused across batches."""
+
+    def __init__(self, size):
+        self.size = size
+        self._idle = queue.Queue()
+        self._started = 0
+        self._lock = threading.Lock()
+        self._workers = []
+
+    def _acquire(self):
+        with self._lock:
+            if self._idle.empty() and self._started < self.size:
+                self._started += 1
+                worker = BlenderWorker()
+                self._workers.append(worker)
+                return worker
+        return self._idle.get()
+
+    def _release(self, worker):
+        if worker.alive:
+            self._idle.put(worker)
+        else:
+            with self._lock:
+                self._started -= 1
+                self._workers.remove(worker)
+
+    def run(self, stage, job):
+        worker = self._acquire()
+        try:
+            return worker.submit(stage, job)
+        finally:
+            self._release(worker)
+
+    def map_unordered(self, requests):
+        """Run (stage, job) pairs and yield ((stage, job), result) as each finishes."""
+        requests = list(requests)
+        if not requests:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.size, len(requests))) as executor:
+            futures = {executor.submit(self.run, stage, job): (stage, job) for stage, job in requests}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except PipelineError as exc:
+                    result = {"ok": False, "error": str(exc)}
+                yield futures[future], result
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+        self._workers.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,284 @@
+"""GLB byte budgets: attribute every byte of a model and check it against its tier.
+
+    python3 -m pipeline budget godot_fighter/battle-manager/enemies/*.glb
+    python3 -m pipeline budget enemies/ --budgets budgets.json --top 10
+
+Every byte of the file lands in one row of (category, item, detail):
+
+* ``mesh``       mesh name, attribute (``POSITION``, ``NORMAL``, ``indices``...)
+* ``skin``       mesh name with ``JOINTS_n``/``WEIGHTS_n``, or skin name with
+                 ``inverseBindMatrices``
+* ``morph``      mesh name, morph target attribute
+* ``animation``  animation name, ``<node>.<path>`` channel or ``times``
+* ``image``      image name, MIME type
+* ``json``, ``container`` (GLB headers) and ``padding`` (alignment and
+  unreferenced buffer bytes)
+
+Only the GLB header, the JSON chunk and the buffer sizes are read (the BIN
+chunk is skipped, external buffers are ``stat``-ed); no accessor is decoded,
+so a file takes milliseconds. A roster is scanned in a thread pool.
+
+Budgets are per enemy tier: a ``total`` and optional per-category limits in
+bytes. ``--budgets`` takes a JSON file ``{"tiers": {...}, "assets": {name:
+tier}}``; tiers in it replace the defaults by name, and assets not listed use
+``--tier``. Any asset over budget fails the command.
+"""
+
+import json
+import os
+import struct
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from .config import ENEMIES_DIR
+from .errors import PipelineError
+from .gltf import CHUNK_BIN, CHUNK_JSON, COMPONENT_TYPES, GLB_MAGIC, TYPE_SIZES, GltfError
+from .report import Report
+from .rig import enemy_name
+
+STAGE = "budget"
+MB = 1 << 20
+# Download budgets for the web export, by enemy tier.
+TIER_BUDGETS = {
+    "minion": {"total": 1.5 * MB, "image": 1 * MB},
+    "standard": {"total": 3 * MB, "image": 2 * MB},
+    "elite": {"total": 5 * MB, "image": 3 * MB},
+    "boss": {"total": 10 * MB, "image": 6 * MB},
+}
+DEFAULT_TIER = "standard"
+SKIN_ATTRIBUTES = ("JOINTS_", "WEIGHTS_")
+
+
+def accessor_owners(doc):
+    """{accessor index: (category, item, detail)}; the first user of a shared accessor owns it."""
+    owners = {}
+
+    def claim(index, *owner):
+        if index is not None:
+            owners.setdefault(index, owner)
+
+    for m, mesh in enumerate(doc.get("meshes", [])):
+        name = mesh.get("name", f"mesh_{m}")
+        for prim in mesh.get("primitives", []):
+            for attr, index in prim.get("attributes", {}).items():
+                category = "skin" if attr.startswith(SKIN_ATTRIBUTES) else "mesh"
+                claim(index, category, name, attr)
+            claim(prim.get("indices"), "mesh", name, "indices")
+            for target in prim.get("targets", []):
+                for attr, index in target.items():
+                    claim(index, "morph", name, attr)
+    for s, skin in enumerate(doc.get("skins", [])):
+        claim(skin.get("inverseBindMatrices"), "skin", skin.get("name", f"skin_{s}"), "inverseBindMatrices")
+    nodes = [node.get("name", f"node_{i}") for i, node in enumerate(doc.get("nodes", []))]
+    for a, anim in enumerate(doc.get("animations", [])):
+        name = anim.get("name", f"animation_{a}")
+        samplers = anim.get("samplers", [])
+        for channel in anim.get("channels", []):
+            sampler = samplers[channel["sampler"]]
+            target = channel["target"]
+            node = nodes[target["node"]] if "node" in target else "?"
+            claim(sampler["output"], "animation", name, f"{node}.{target['path']}")
+        for sampler in samplers:
+            claim(sampler["input"], "animation", name, "times")
+    return owners
+
+
+def accessor_bytes(acc):
+    """{buffer view: bytes} an accessor occupies, sparse storage included."""
+    element = np.dtype(COMPONENT_TYPES[acc["componentType"]]).itemsize * TYPE_SIZES[acc["type"]]
+    used = {}
+    if "bufferView" in acc:
+        used[acc["bufferView"]] = acc["count"] * element
+    sparse = acc.get("sparse")
+    if sparse:
+        idx, vals = sparse["indices"], sparse["values"]
+        size = np.dtype(COMPONENT_TYPES[idx["componentType"]]).itemsize
+        used[idx["bufferView"]] = used.get(idx["bufferView"], 0) + sparse["count"] * size
+        used[vals["bufferView"]] = used.get(vals["bufferView"], 0) + sparse["count"] * element
+    return used
+
+
+def data_uri_length(uri):
+    """Decoded size of a base64 data URI, without decoding it."""
+    payload = uri.split(",", 1)[1]
+    return len(payload) * 3 // 4 - payload[-2:].count("=")
+
+
+def read_layout(path):
+    """(json dict, [size of each buffer], JSON bytes) of a .glb/.gltf; buffer contents are never read."""
+    path = Path(path)
+    binary = None
+    if path.suffix.lower() == ".glb":
+        doc = None
+        with open(path, "rb") as f:
+            header = f.read(12)
+            if len(header) < 12 or header[:4] != GLB_MAGIC:
+                raise GltfError(f"{path.name}: not a GLB file")
+            length = struct.unpack_from("<I", header, 8)[0]
+            offset = 12
+            while offset + 8 <= length:
+                f.seek(offset)
+                chunk_length, chunk_type = struct.unpack("<II", f.read(8))
+                if chunk_type == CHUNK_JSON and doc is None:
+                    json_bytes = chunk_length
+                    doc = json.loads(f.read(chunk_length))
+                elif chunk_type == CHUNK_BIN and binary is None:
+                    binary = chunk_length
+                offset += 8 + chunk_length
+        if doc is None:
+            raise GltfError(f"{path.name}: GLB has no JSON chunk")
+    else:
+        json_bytes = path.stat().st_size
+        doc = json.loads(path.read_bytes())
+    sizes = []
+    for buffer in doc.get("buffers", []):
+        uri = buffer.get("uri")
+        if uri is None:
+            if binary is None:
+                raise GltfError(f"{path.name}: buffer without uri and no BIN chunk")
+            sizes.append(binary)
+        elif uri.startswith("data:"):
+            sizes.append(data_uri_length(uri))
+        else:
+            sizes.append((path.parent / uri).stat().st_size)
+    return doc, sizes, json_bytes
+
+
+def attribute(path):
+    """Rows {(category, item, detail): bytes} covering the whole file."""
+    path = Path(path)
+    doc, buffer_sizes, json_bytes = read_layout(path)
+    rows = defaultdict(int)
+    views = doc.get("bufferViews", [])
+    claimed = [0] * len(views)
+
+    owners = accessor_owners(doc)
+    for a, acc in enumerate(doc.get("accessors", [])):
+        owner = owners.get(a, ("padding", "unused accessors", ""))
+        for view, size in accessor_bytes(acc).items():
+            take = min(size, views[view]["byteLength"] - claimed[view])
+            rows[owner] += take
+            claimed[view] += take
+    for i, image in enumerate(doc.get("images", [])):
+        name = image.get("name") or image.get("uri") or f"image_{i}"
+        mime = image.get("mimeType", Path(image.get("uri", "")).suffix.lstrip("."))
+        if "bufferView" in image:
+            view = image["bufferView"]
+            rows[("image", name, mime)] += views[view]["byteLength"] - claimed[view]
+            claimed[view] = views[view]["byteLength"]
+        elif image.get("uri") and not image["uri"].startswith("data:"):
+            rows[("image", name, mime)] += (path.parent / image["uri"]).stat().st_size
+    for view, used in zip(views, claimed):
+        if used < view["byteLength"]:
+            rows[("padding", "buffer views", "")] += view["byteLength"] - used
+    viewed = defaultdict(int)
+    for view in views:
+        viewed[view["buffer"]] += view["byteLength"]
+    buffer_bytes = sum(buffer_sizes)
+    rows[("padding", "buffers", "")] += buffer_bytes - sum(viewed.values())
+
+    if path.suffix.lower() == ".glb":
+        rows[("container", "GLB headers", "")] = path.stat().st_size - json_bytes - buffer_bytes
+    rows[("json", path.name, "")] = json_bytes
+    return {key: value for key, value in rows.items() if value}
+
+
+def by_category(rows):
+    totals = defaultdict(int)
+    for (category, _, _), size in rows.items():
+        totals[category] += size
+    return dict(sorted(totals.items(), key=lambda kv: -kv[1]))
+
+
+def load_budgets(path=None):
+    tiers, assets = dict(TIER_BUDGETS), {}
+    if path:
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError) as exc:
+            raise PipelineError(f"cannot read budgets {path}: {exc}") from exc
+        tiers.update(data.get("tiers", {}))
+        assets = data.get("assets", {})
+    return tiers, assets
+
+
+def over_budget(categories, budget):
+    """Messages for every limit in ``budget`` that ``categories`` exceeds."""
+    total = sum(categories.values())
+    over = []
+    for key, limit in budget.items():
+        used = total if key == "total" else categories.get(key, 0)
+        if used > limit:
+            over.append(f"{key} {used / MB:.2f} MB > {limit / MB:.2f} MB")
+    return over
+
+
+def discover(paths):
+    found = []
+    for path in map(Path, paths):
+        found += [path] if path.is_file() else sorted(path.rglob("*.glb"))
+    return found
+
+
+def scan(paths, workers=None):
+    """{path: (rows, seconds)} for every file, read in a thread pool."""
+    def timed(path):
+        start = time.perf_counter()
+        return attribute(path), time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) * 2)) as pool:
+        return dict(zip(paths, pool.map(timed, paths)))
+
+
+def print_breakdown(path, rows, top):
+    categories = by_category(rows)
+    total = sum(categories.values())
+    print(f"{path.name}: {total / MB:.2f} MB")
+    for category, size in categories.items():
+        print(f"  {category:<10} {size / MB:>8.3f} MB  {100 * size / total:5.1f}%")
+    for (category, item, detail), size in sorted(rows.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"    {size / MB:>8.3f} MB  {category}: {item} {detail}".rstrip())
+
+
+def register(subparsers):
+    p = subparsers.add_parser("budget", help="attribute GLB bytes and enforce per-tier download budgets")
+    p.add_argument("paths", nargs="*", type=Path, help=f".glb files or directories (default: {ENEMIES_DIR})")
+    p.add_argument("--budgets", type=Path, help="JSON file with tier limits and asset tiers")
+    p.add_argument("--tier", default=DEFAULT_TIER, help="tier of assets the budgets file does not list")
+    p.add_argument("--top", type=int, default=5, help="largest items to list per asset")
+    p.add_argument("-j", "--jobs", type=int, help="files read in parallel")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    tiers, assets = load_budgets(args.budgets)
+    paths = discover(args.paths or [ENEMIES_DIR])
+    if not paths:
+        raise PipelineError("no .glb files found")
+    roster = defaultdict(int)
+    for path, (rows, seconds) in scan(paths, args.jobs).items():
+        name = enemy_name(path).replace("_rigged", "")
+        tier = assets.get(name, args.tier)
+        if tier not in tiers:
+            raise PipelineError(f"{name}: unknown tier {tier!r}, expected one of {sorted(tiers)}")
+        categories = by_category(rows)
+        over = over_budget(categories, tiers[tier])
+        print_breakdown(path, rows, args.top)
+        for message in over:
+            print(f"  ✗ over the {tier} budget: {message}")
+        for category, size in categories.items():
+            roster[category] += size
+        report.add(STAGE, path.name, seconds, "failed" if over else "ok", tier=tier,
+                   bytes=sum(categories.values()), categories=categories, over=over)
+    total = sum(roster.values())
+    print(f"Roster: {len(paths)} file(s), {total / MB:.2f} MB")
+    for category, size in sorted(roster.items(), key=lambda kv: -kv[1]):
+        print(f"  {category:<10} {size / MB:>8.3f} MB  {100 * size / total:5.1f}%")
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from .config import CACHE_DIR
+
+CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path, algorithm="sha256"):
+    h = hashlib.new(algorithm)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def make_key(*parts):
+    """Stable cache key from JSON-serialisable parts (digests, params, versions)."""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """Content-addressed store of stage outputs.
+
+    Each entry is a directory ``<stage>/<key[:2]>/<key>`` holding the output
+    files plus a ``manifest.json``. Entries are written to a temporary
+    directory and renamed into place, so a half-written entry is never seen.
+    """
+
+    MANIFEST = "manifest.json"
+
+    def __init__(self, stage, root=None):
+        self.stage = stage
+        self.root = Path(root or CACHE_DIR) / stage
+
+    def entry_dir(self, key):
+        return self.root / key[:2] / key
+
+    def get(self, key):
+        """Return the entry directory for ``key`` or None on a miss."""
+        entry = self.entry_dir(key)
+        if (entry / self.MANIFEST).is_file():
+            return entry
+        return None
+
+    def manifest(self, key):
+        entry = self.get(key)
+        if entry is None:
+            return None
+        with open(entry / self.MANIFEST) as f:
+            return json.load(f)
+
+    def put(self, key, files, meta=None):
+        """Store ``files`` ({name: source path}) under ``key`` and return the entry dir."""
+        entry = self.entry_dir(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=entry.parent))
+        try:
+            for name, src in files.items():
+                dst = tmp / name
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(src, dst)
+            with open(tmp / self.MANIFEST, "w") as f:
+                json.dump({"key": key, "files": sorted(files), "meta": meta or {}}, f, indent=2)
+            try:
+                os.replace(tmp, entry)
+            except OSError:
+                # Another worker stored the same key first; its entry is equivalent.
+                shutil.rmtree(tmp, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        return entry
+
+    def restore(self, key, dest_dir):
+        """Copy the files of entry ``key`` into ``dest_dir``; returns the restored paths."""
+        manifest = self.manifest(key)
+        if manifest is None:
+            return None
+        entry = self.entry_dir(key)
+        restored = []
+        for name in manifest["files"]:
+            dst = Path(dest_dir) / name
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(entry / name, dst)
+            restored.append(dst)
+        return restored
@@ -0,0 +1,93 @@
+"""Pre-rig mesh cleanup (see pipeline.topology and the cleanup Blender stage).
+
+    python3 -m pipeline cleanup generated/*.glb
+    python3 -m pipeline rig model.glb --cleanup
+
+The cleaned model keeps its file name, so the enemy name derived from it is
+unchanged, and lands in the staging area next to ``<stem>_cleanup.json``.
+Results are cached on the source hash, the thresholds and the code that
+produced them; a re-run on an unchanged model only copies files.
+"""
+
+import json
+from pathlib import Path
+
+from . import topology
+from .blender_runner import run_stage
+from .cache import StageCache, file_digest, make_key
+from .publish import STAGING_DIR
+from .report import Report
+
+STAGE = "cleanup"
+STAGE_SCRIPT = Path(__file__).parent / "blender" / "cleanup.py"
+
+
+def cache_key(source, thresholds, drop_islands):
+    return make_key(STAGE, file_digest(source), {**topology.THRESHOLDS, **(thresholds or {})}, drop_islands,
+                    file_digest(STAGE_SCRIPT), file_digest(topology.__file__))
+
+
+def cleanup(source, thresholds=None, drop_islands=False, use_cache=True, report=None):
+    """Clean ``source``; returns the stage result (``ok``, ``output``, before/fixed/after counts)."""
+    report = report or Report(STAGE)
+    source = Path(source).resolve()
+    out_dir = STAGING_DIR / STAGE / source.stem
+    output = out_dir / f"{source.stem}.glb"
+    report_file = out_dir / f"{source.stem}_cleanup.json"
+    cache = StageCache(STAGE)
+    key = cache_key(source, thresholds, drop_islands)
+
+    with report.timed(STAGE, source.name) as entry:
+        if use_cache and cache.restore(key, out_dir):
+            result = {"ok": True, **json.loads(report_file.read_text())}
+            entry["status"] = "cache-hit"
+        else:
+            result = run_stage(STAGE, {"source": str(source), "output": str(output), "thresholds": thresholds,
+                                       "drop_islands": drop_islands})
+            if not result["ok"]:
+                entry["status"] = "failed"
+                print(result["error"])
+                return result
+            stored = {k: v for k, v in result.items() if k != "ok"}
+            report_file.write_text(json.dumps(stored, indent=2) + "\n")
+            cache.put(key, {output.name: output, report_file.name: report_file}, meta={"source": source.name})
+        fixed = result["fixed"]
+        entry.update(faces_dissolved=fixed["faces_dissolved"], faces_deleted=fixed["faces_deleted"],
+                     vertices_deleted=fixed["vertices_deleted"], edges_split=fixed["edges_split"],
+                     clean=result["clean"])
+    return result
+
+
+def print_cleanliness(name, result):
+    before, after = result["before"], result["after"]
+    print(f"{name}:")
+    for k in before:
+        if before[k] or after[k]:
+            print(f"  {k:<24} {before[k]:>8} -> {after[k]}")
+
+
+def register(subparsers):
+    p = subparsers.add_parser("cleanup", help="fix degenerate faces, loose and non-manifold geometry before rigging")
+    p.add_argument("sources", nargs="+", type=Path, help="generated .glb/.gltf/.fbx files")
+    p.add_argument("--min-area", type=float, help="zero-area threshold, relative to the squared model size")
+    p.add_argument("--island-vertices", type=float,
+                   help="micro-island size limit, as a fraction of the mesh's vertices")
+    p.add_argument("--island-extent", type=float, help="micro-island extent limit, relative to the mesh size")
+    p.add_argument("--drop-islands", action="store_true",
+                   help="delete micro-islands too (by default they are reported and kept)")
+    p.add_argument("--no-cache", action="store_true", help="ignore cached results")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    thresholds = {k: getattr(args, k) for k in topology.THRESHOLDS if getattr(args, k) is not None} or None
+    ok = True
+    for source in args.sources:
+        result = cleanup(source, thresholds, args.drop_islands, not args.no_cache, report)
+        if result["ok"]:
+            print_cleanliness(source.name, result)
+        ok = ok and result["ok"]
+    report.print_summary()
+    report.write()
+    return 0 if ok else 1
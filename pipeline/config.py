@@ -0,0 +1,45 @@
+import os
+import shutil
+from pathlib import Path
+
+# Repository layout
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ASSETS_DIR = REPO_ROOT / "assets"
+GODOT_PROJECT = REPO_ROOT / "godot_fighter"
+ENEMIES_DIR = GODOT_PROJECT / "battle-manager" / "enemies"
+CLIPS_DIR = GODOT_PROJECT / "animations" / "clips"
+GODOT_IMPORTED_DIR = GODOT_PROJECT / ".godot" / "imported"
+# Where export_web.sh writes the web build; per-enemy bundles go next to it.
+WEB_EXPORT_DIR = REPO_ROOT / "public" / "godot"
+
+# Stage outputs and cached artifacts live outside the Godot project so the
+# editor never scans them.
+CACHE_DIR = Path(os.environ.get("PIPELINE_CACHE_DIR", REPO_ROOT / ".pipeline_cache"))
+REPORTS_DIR = CACHE_DIR / "reports"
+
+
+def find_executable(env_var, *names):
+    """Return the first executable found via ``env_var`` or on PATH, else None."""
+    override = os.environ.get(env_var)
+    if override:
+        return override
+    for name in names:
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def find_godot():
+    # Same preference order as godot_fighter/export_web.sh
+    return find_executable("GODOT", "godot4", "godot")
+
+
+def find_blender():
+    return find_executable("BLENDER", "blender")
+
+
+def res_path(path):
+    """Map a file inside the Godot project to its ``res://`` path."""
+    rel = Path(path).resolve().relative_to(GODOT_PROJECT.resolve())
+    return "res://" + rel.as_posix()
@@ -0,0 +1,183 @@
+"""Deformation statistics for skinned meshes, on plain NumPy arrays.
+
+``analyze`` takes the rest pose, the deformed positions of every sampled
+frame, the triangles, per-vertex bone weights and bone segments, and returns
+per-sample / per-bone statistics plus a list of failures:
+
+* ``exploded``         vertices displaced by more than ``explode`` x height
+* ``outliers``         vertices far outside their bone's displacement spread
+* ``stretch``          edges stretched or squashed past the limits
+* ``volume``           mesh (or per-bone region) volume change past the limit
+* ``unweighted``       connected islands with no bone influence at all
+* ``inverted_limb``    leg bones pointing up in the rest pose
+* ``bone_flip``        bones turned more than ``flip_degrees`` from rest
+"""
+
+import re
+
+import numpy as np
+
+from .topology import connected_components, unique_edges
+
+THRESHOLDS = {
+    "explode": 0.5,
+    "outlier_mad": 8.0,
+    "outlier_min": 0.05,
+    "stretch_max": 2.0,
+    "stretch_min": 0.33,
+    "volume": 0.25,
+    "bone_volume": 0.5,
+    "flip_degrees": 150.0,
+    "foot_rise": 0.05,
+}
+LEG_RE = re.compile(r"(UpLeg|Leg|Hip|Knee|Thigh|Shin|Calf)$")
+FOOT_RE = re.compile(r"(Foot|Ankle)$")
+
+
+def signed_volumes(points, triangles):
+    """Signed volume contribution of every triangle (sum = enclosed volume)."""
+    a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+    return np.einsum("ij,ij->i", a, np.cross(b, c)) / 6.0
+
+
+def rest_bone_checks(names, heads, tails, height, limits):
+    failures = []
+    rise = (tails[:, 2] - heads[:, 2]) / height
+    for i, name in enumerate(names):
+        if LEG_RE.search(name) and rise[i] > 0:
+            failures.append({"kind": "inverted_limb", "bone": name, "value": float(rise[i])})
+        elif FOOT_RE.search(name) and rise[i] > limits["foot_rise"]:
+            failures.append({"kind": "inverted_limb", "bone": name, "value": float(rise[i])})
+    return failures
+
+
+def unweighted_islands(weights, edges):
+    total = weights.sum(axis=1)
+    labels = connected_components(len(weights), edges)
+    weighted = np.zeros(labels.max() + 1, dtype=bool)
+    np.logical_or.at(weighted, labels, total > 1e-6)
+    sizes = np.bincount(labels)
+    bad = np.flatnonzero(~weighted & (sizes > 0))
+    return [{"kind": "unweighted", "island": int(i), "count": int(sizes[i])} for i in bad]
+
+
+def bone_means(values, dominant, bone_count):
+    counts = np.bincount(dominant, minlength=bone_count)
+    sums = np.bincount(dominant, weights=values, minlength=bone_count)
+    return np.divide(sums, counts, out=np.zeros(bone_count), where=counts > 0)
+
+
+def region_volumes(points, triangles, tri_bone, dominant, bone_count):
+    """Per-bone cone volume of each bone's (open) surface region, taken about
+    the region's own centroid so that moving a limb rigidly leaves it unchanged."""
+    centroid = np.stack([bone_means(points[:, k], dominant, bone_count) for k in range(3)], axis=1)
+    c = centroid[tri_bone]
+    a, b, d = (points[triangles[:, k]] - c for k in range(3))
+    vol = np.einsum("ij,ij->i", a, np.cross(b, d)) / 6.0
+    return np.bincount(tri_bone, weights=vol, minlength=bone_count)
+
+
+def analyze(rest, samples, triangles, weights, bone_names, rest_heads, rest_tails,
+            sample_heads=None, sample_tails=None, thresholds=None):
+    """Statistics and failures for one character.
+
+    rest          (V, 3) rest positions
+    samples       list of (action, frame, (V, 3) deformed positions)
+    triangles     (T, 3) vertex indices
+    weights       (V, B) normalised bone weights
+    rest_heads/rest_tails   (B, 3) bone segments at rest
+    sample_heads/sample_tails  per-sample (B, 3) posed segments (optional)
+    """
+    limits = {**THRESHOLDS, **(thresholds or {})}
+    rest = np.asarray(rest, dtype=np.float64)
+    bone_count = len(bone_names)
+    height = max(float(np.ptp(rest[:, 2])), 1e-6)
+    edges = unique_edges(triangles)
+    rest_len = np.linalg.norm(rest[edges[:, 0]] - rest[edges[:, 1]], axis=1)
+    valid_edges = rest_len > 1e-9
+    rest_tri_vol = signed_volumes(rest, triangles)
+    rest_volume = rest_tri_vol.sum()
+    dominant = weights.argmax(axis=1)
+    tri_bone = dominant[triangles[:, 0]]
+    rest_bone_vol = region_volumes(rest, triangles, tri_bone, dominant, bone_count)
+    rest_dir = rest_tails - rest_heads
+    rest_dir = rest_dir / np.maximum(np.linalg.norm(rest_dir, axis=1, keepdims=True), 1e-9)
+
+    order = np.argsort(dominant, kind="stable")
+    starts = np.searchsorted(dominant[order], np.arange(bone_count + 1))
+
+    failures = rest_bone_checks(bone_names, rest_heads, rest_tails, height, limits)
+    failures += unweighted_islands(weights, edges)
+
+    per_sample = []
+    bone_max_disp = np.zeros(bone_count)
+    for s, (action, frame, deformed) in enumerate(samples):
+        where = {"action": action, "frame": frame}
+        p = np.asarray(deformed, dtype=np.float64)
+        disp = np.linalg.norm(p - rest, axis=1) / height
+        disp = np.where(np.isfinite(disp), disp, np.inf)
+
+        exploded = np.flatnonzero(disp > limits["explode"])
+        if len(exploded):
+            failures.append({"kind": "exploded", **where, "count": int(len(exploded)),
+                             "value": float(disp[exploded].max())})
+
+        # Robust per-bone spread: median and MAD of the bone's own vertices.
+        outliers = 0
+        for b in range(bone_count):
+            members = order[starts[b]:starts[b + 1]]
+            if len(members) < 8:
+                continue
+            d = disp[members]
+            med = np.median(d)
+            mad = np.median(np.abs(d - med)) + 1e-9
+            outliers += int(np.count_nonzero((d - med > limits["outlier_mad"] * mad)
+                                             & (d - med > limits["outlier_min"])))
+        if outliers:
+            failures.append({"kind": "outliers", **where, "count": outliers})
+
+        length = np.linalg.norm(p[edges[:, 0]] - p[edges[:, 1]], axis=1)
+        ratio = length[valid_edges] / rest_len[valid_edges]
+        stretched = np.count_nonzero((ratio > limits["stretch_max"]) | (ratio < limits["stretch_min"]))
+        if stretched:
+            failures.append({"kind": "stretch", **where, "count": int(stretched),
+                             "value": float(ratio.max())})
+
+        tri_vol = signed_volumes(p, triangles)
+        volume_ratio = tri_vol.sum() / rest_volume if abs(rest_volume) > 1e-12 else 1.0
+        if abs(volume_ratio - 1) > limits["volume"]:
+            failures.append({"kind": "volume", **where, "value": float(volume_ratio)})
+        bone_vol = region_volumes(p, triangles, tri_bone, dominant, bone_count)
+        significant = np.abs(rest_bone_vol) > 1e-3 * max(abs(rest_volume), 1e-12)
+        bone_ratio = np.divide(bone_vol, rest_bone_vol, out=np.ones(bone_count), where=significant)
+        for b in np.flatnonzero(significant & (np.abs(bone_ratio - 1) > limits["bone_volume"])):
+            failures.append({"kind": "volume", **where, "bone": bone_names[b], "value": float(bone_ratio[b])})
+
+        if sample_heads is not None:
+            d = sample_tails[s] - sample_heads[s]
+            d = d / np.maximum(np.linalg.norm(d, axis=1, keepdims=True), 1e-9)
+            angle = np.degrees(np.arccos(np.clip(np.einsum("ij,ij->i", d, rest_dir), -1, 1)))
+            for b in np.flatnonzero(angle > limits["flip_degrees"]):
+                failures.append({"kind": "bone_flip", **where, "bone": bone_names[b], "value": float(angle[b])})
+
+        finite = np.where(np.isfinite(disp), disp, 0.0)
+        bone_disp = bone_means(finite, dominant, bone_count)
+        bone_max_disp = np.maximum(bone_max_disp, bone_disp)
+        per_sample.append({
+            **where,
+            "max_displacement": float(disp.max()),
+            "mean_displacement": float(finite.mean()),
+            "max_stretch": float(ratio.max()) if len(ratio) else 1.0,
+            "min_stretch": float(ratio.min()) if len(ratio) else 1.0,
+            "volume_ratio": float(volume_ratio),
+        })
+
+    return {
+        "vertices": int(len(rest)),
+        "triangles": int(len(triangles)),
+        "height": height,
+        "samples": per_sample,
+        "bones": {name: {"vertices": int(n), "max_mean_displacement": float(d)}
+                  for name, n, d in zip(bone_names, np.bincount(dominant, minlength=bone_count), bone_max_disp)},
+        "failures": failures,
+    }
@@ -0,0 +1,78 @@
+"""Validate skinning by sampling every clip of rigged models (see pipeline.deform)."""
+
+import os
+from pathlib import Path
+
+from .blender_runner import WorkerPool
+from .portraits import studio_path
+from .publish import STAGING_DIR
+from .report import Report
+from .rig import enemy_name
+
+STAGE = "deform_check"
+DIAGNOSTIC_SAMPLES = 8
+
+
+def make_job(source, actions=None, fps=10, max_renders=6):
+    source = Path(source).resolve()
+    name = enemy_name(source).replace("_rigged", "")
+    return {
+        "source": str(source),
+        "output_dir": str(STAGING_DIR / STAGE / name),
+        "name": name,
+        "actions": actions,
+        "fps": fps,
+        "studio": str(studio_path(DIAGNOSTIC_SAMPLES)),
+        "max_renders": max_renders,
+    }
+
+
+def describe(failure):
+    where = f" {failure['action']}@{failure['frame']}" if "action" in failure else ""
+    bone = f" {failure['bone']}" if "bone" in failure else ""
+    detail = ", ".join(f"{k}={failure[k]:.3g}" if isinstance(failure[k], float) else f"{k}={failure[k]}"
+                       for k in ("count", "value") if k in failure)
+    return f"{failure['kind']}{bone}{where} ({detail})"
+
+
+def check(sources, actions=None, fps=10, max_renders=6, workers=None, report=None):
+    report = report or Report(STAGE)
+    jobs = [(STAGE, make_job(source, actions, fps, max_renders)) for source in sources]
+    workers = workers or max(1, min(len(jobs), (os.cpu_count() or 2) // 2))
+    results = []
+    with WorkerPool(workers) as pool:
+        for (_, job), result in pool.map_unordered(jobs):
+            name = Path(job["source"]).name
+            if not result["ok"]:
+                report.add(STAGE, name, result.get("seconds", 0.0), "failed")
+                print(f"✗ {name}\n{result['error']}")
+                continue
+            failures = result["failures"]
+            report.add(STAGE, name, result["seconds"], "failed" if failures else "ok",
+                       samples=result["samples"], failures=len(failures), report_path=result["report"])
+            for failure in failures[:20]:
+                print(f"  ✗ {name}: {describe(failure)}")
+            if len(failures) > 20:
+                print(f"  … {len(failures) - 20} more in {result['report']}")
+            for path in result["renders"]:
+                print(f"  diagnostic render: {path}")
+            results.append(result)
+    return results
+
+
+def register(subparsers):
+    p = subparsers.add_parser("check-deform", help="sample every clip and flag broken skinning")
+    p.add_argument("sources", nargs="+", type=Path, help="rigged .glb files")
+    p.add_argument("--actions", nargs="+", help="actions to sample (default: all)")
+    p.add_argument("--fps", type=float, default=10, help="samples per second")
+    p.add_argument("--max-renders", type=int, default=6, help="diagnostic renders per model (0 disables)")
+    p.add_argument("-j", "--workers", type=int, help="parallel Blender workers")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    check(args.sources, args.actions, args.fps, args.max_renders, args.workers, report)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
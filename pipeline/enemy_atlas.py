@@ -0,0 +1,107 @@
+"""Pack the base-color textures of an enemy set into one shared atlas and material.
+
+One material, one texture and one bind serve every enemy of the set, instead
+of a ``Material_0`` and a multi-megabyte JPEG per enemy type.
+"""
+
+from pathlib import Path
+
+from .blender_runner import run_stage
+from .config import ENEMIES_DIR, res_path
+from .publish import STAGING_DIR, publish_with_sidecars
+from .report import Report
+from .rig import enemy_name
+
+STAGE = "atlas"
+ATLAS_DIR = ENEMIES_DIR / "atlas"
+
+MATERIAL_TEMPLATE = """[gd_resource type="StandardMaterial3D" load_steps=2 format=3]
+
+[ext_resource type="Texture2D" path="{texture}" id="1_atlas"]
+
+[resource]
+resource_name = "{name}"
+albedo_texture = ExtResource("1_atlas")
+roughness = 1.0
+"""
+# Seed import settings: map the shared material onto the shared .tres.
+SCENE_IMPORT_TEMPLATE = """[remap]
+
+importer="scene"
+importer_version=1
+type="PackedScene"
+
+[params]
+
+_subresources={{
+"materials": {{
+"{material}": {{
+"use_external/enabled": true,
+"use_external/fallback_path": "{path}",
+"use_external/path": "{path}"
+}}
+}}
+}}
+"""
+
+
+def material_name(set_name):
+    return f"{set_name}_Atlas"
+
+
+def write_godot_files(result, out_dir, dest_dir, set_name):
+    """Shared ``.tres`` material plus seed ``.import`` files for each GLB; returns the .tres."""
+    tres = Path(out_dir) / f"{set_name}_atlas.tres"
+    texture = res_path(Path(dest_dir) / Path(result["atlas"]).name)
+    tres.write_text(MATERIAL_TEMPLATE.format(texture=texture, name=result["material"]))
+    for enemy in result["enemies"].values():
+        Path(enemy["output"] + ".import").write_text(SCENE_IMPORT_TEMPLATE.format(
+            material=result["material"], path=res_path(Path(dest_dir) / tres.name)))
+    return tres
+
+
+def build(sources, set_name, texel_scale=1.0, padding=8, dest_dir=None, report=None):
+    report = report or Report(STAGE)
+    dest_dir = Path(dest_dir or ATLAS_DIR / set_name)
+    out_dir = STAGING_DIR / STAGE / set_name
+    job = {
+        "sources": [{"source": str(Path(s).resolve()), "name": enemy_name(s).replace("_rigged", "")}
+                    for s in sources],
+        "output_dir": str(out_dir),
+        "atlas": f"{set_name}_atlas",
+        "material": material_name(set_name),
+        "texel_scale": texel_scale,
+        "padding": padding,
+    }
+    with report.timed(STAGE, set_name) as entry:
+        result = run_stage(STAGE, job)
+        if not result["ok"]:
+            entry["status"] = "failed"
+            print(result["error"])
+            return result
+        tres = write_godot_files(result, out_dir, dest_dir, set_name)
+        result["files"] = [result["atlas"], str(tres)] + [e["output"] for e in result["enemies"].values()]
+        entry.update(enemies=len(result["enemies"]), size="x".join(map(str, result["size"])),
+                     materials_before=result["materials_before"], materials_after=result["materials_after"],
+                     textures_before=result["textures_before"], textures_after=1)
+    return result
+
+
+def register(subparsers):
+    p = subparsers.add_parser("atlas", help="pack an enemy set's textures into one shared atlas and material")
+    p.add_argument("sources", nargs="+", type=Path, help="rigged .glb files of the set")
+    p.add_argument("--set", dest="set_name", required=True, help="set name, e.g. forest")
+    p.add_argument("--texel-scale", type=float, default=1.0, help="resize each texture before packing")
+    p.add_argument("--padding", type=int, default=8, help="pixels between textures")
+    p.add_argument("--publish", action="store_true", help=f"publish into {ATLAS_DIR}/<set>")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    result = build(args.sources, args.set_name, args.texel_scale, args.padding, report=report)
+    if result["ok"] and args.publish:
+        publish_with_sidecars(result["files"], ATLAS_DIR / args.set_name, report=report)
+    report.print_summary()
+    report.write()
+    return 0 if result["ok"] else 1
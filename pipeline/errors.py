@@ -0,0 +1,2 @@
+class PipelineError(RuntimeError):
+    """An expected failure that the CLI reports without a traceback."""
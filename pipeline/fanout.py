@@ -0,0 +1,156 @@
+"""Rig each enemy once, then export every delivery target from the rigged file in parallel.
+
+    python3 -m pipeline fan-out assets/Ogrork_Goblimp_texture.glb --set ogrork --cleanup --publish
+    python3 -m pipeline fan-out staging/actions/*_rigged.glb --rigged --targets web mobile
+
+The expensive chain runs once per enemy: ``rig`` (after ``cleanup`` with
+``--cleanup``), then ``actions`` with the ``--set`` action set, which
+produces one rigged GLB with its clips. ``--rigged`` takes such files as
+they are, and rejects files without animations when a target keeps clips.
+Each target profile is then a job of its own for the ``target`` stage: an
+import of that file, the profile's reductions and an export, spread over
+warm Blender workers. Adding a target costs one export per enemy.
+
+Godot's glTF importer reads neither Draco nor ``KHR_mesh_quantization``,
+so the built-in profiles reduce triangles and textures only and leave
+vertex quantization to Godot's import-time compression. Profiles for
+other consumers can pass the exporter's ``export_draco_*`` options in
+``export``.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from . import actions
+from .blender_runner import WorkerPool
+from .config import ENEMIES_DIR
+from .errors import PipelineError
+from .gltf import Gltf
+from .publish import STAGING_DIR, publish
+from .report import Report
+from .rig import WEIGHT_MODES, enemy_name, rig
+
+STAGE = "target"
+
+# dest: subdirectory of the enemies directory the variant is published to.
+# None of them is the enemies directory itself, which holds the rig and
+# actions stages' own <Name>_rigged.glb.
+TARGETS = {
+    "desktop": {"decimate": 1.0, "texture_size": None, "clips": None, "dest": "desktop"},
+    "web": {"decimate": 1.0, "texture_size": 1024, "clips": None, "dest": "web"},
+    "mobile": {"decimate": 0.5, "texture_size": 512, "clips": None, "dest": "mobile"},
+    "portrait": {"decimate": 0.25, "texture_size": 512, "clips": None, "skins": False, "animations": False,
+                 "dest": "portrait"},
+}
+
+
+def load_targets(path=None):
+    """Built-in profiles, updated from a JSON file of {target: profile}."""
+    targets = {name: dict(profile) for name, profile in TARGETS.items()}
+    if path:
+        try:
+            data = json.loads(Path(path).read_text())
+        except (OSError, ValueError) as exc:
+            raise PipelineError(f"cannot read targets {path}: {exc}") from exc
+        for name, profile in data.items():
+            targets[name] = {**targets.get(name, {"dest": name}), **profile}
+    return targets
+
+
+def make_job(rigged, target, profile):
+    rigged = Path(rigged).resolve()
+    return {
+        "source": str(rigged),
+        "output": str(STAGING_DIR / "fanout" / rigged.stem / target / rigged.name),
+        "target": target,
+        "profile": profile,
+    }
+
+
+def rig_once(source, action_set, report, weights="auto", cleanup=False, weld=False):
+    """Run the full chain on ``source`` once: rig, then bake and export ``action_set``.
+
+    Returns the path of the rigged GLB with its clips, or None on failure.
+    """
+    name = enemy_name(source)
+    rigged = STAGING_DIR / "fanout" / "rig" / f"{name}_rigged.glb"
+    result = rig(source, rigged, weights, weld=weld, cleanup=cleanup, report=report)
+    if not result["ok"]:
+        return None
+    output = STAGING_DIR / "fanout" / f"{name}_rigged.glb"
+    result = actions.build(result["output"], action_set, output, report=report)
+    return output if result["ok"] else None
+
+
+def check_clips(rigged_files, targets):
+    """Reject rigged inputs without animations when a target exports clips."""
+    if all(profile.get("animations") is False for profile in targets.values()):
+        return
+    bare = [path.name for path in rigged_files if not Gltf(path).items("animations")]
+    if bare:
+        raise PipelineError(f"{', '.join(bare)}: no animations; run the actions stage on them first, "
+                            f"or fan out from the generated models with --set")
+
+
+def fan_out(rigged_files, targets, workers=None, report=None):
+    """Export every target of every rigged file; returns {(rigged, target): result}."""
+    report = report or Report(STAGE)
+    jobs = [(STAGE, make_job(path, name, profile)) for path in rigged_files for name, profile in targets.items()]
+    workers = workers or max(1, min(len(jobs), (os.cpu_count() or 2) // 2))
+    results = {}
+    with WorkerPool(workers) as pool:
+        for (_, job), result in pool.map_unordered(jobs):
+            asset = f"{Path(job['source']).name}:{job['target']}"
+            if not result["ok"]:
+                report.add(STAGE, asset, result.get("seconds", 0.0), "failed")
+                print(f"✗ {asset}\n{result['error']}")
+            else:
+                report.add(STAGE, asset, result["seconds"], vertices=result["vertices"],
+                           clips=len(result["clips"]), bytes=Path(result["output"]).stat().st_size)
+            results[(job["source"], job["target"])] = {**result, "target": job["target"]}
+    return results
+
+
+def register(subparsers):
+    p = subparsers.add_parser("fan-out", help="rig once, then export every delivery target in parallel")
+    p.add_argument("sources", nargs="+", type=Path, help="generated models (or rigged ones with --rigged)")
+    p.add_argument("--rigged", action="store_true",
+                   help="sources are rigged and carry their clips already; skip rig and actions")
+    p.add_argument("--set", dest="action_set", help="action set baked onto each rig (required without --rigged)")
+    p.add_argument("--weights", choices=WEIGHT_MODES, default="auto")
+    p.add_argument("--weld", action="store_true", help="weld duplicated seam vertices before weighting")
+    p.add_argument("--cleanup", action="store_true", help="clean the mesh before rigging (cached)")
+    p.add_argument("--targets", nargs="+", metavar="TARGET",
+                   help=f"targets to export (default: all; built in: {', '.join(TARGETS)})")
+    p.add_argument("--profiles", type=Path, help="JSON of {target: profile} adding or overriding targets")
+    p.add_argument("-j", "--workers", type=int, help="warm Blender workers")
+    p.add_argument("--publish", action="store_true",
+                   help=f"publish each target into its subdirectory of {ENEMIES_DIR.name}/")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    targets = load_targets(args.profiles)
+    unknown = sorted(set(args.targets or ()) - set(targets))
+    if unknown:
+        raise PipelineError(f"unknown target(s) {', '.join(unknown)}; known: {', '.join(targets)}")
+    targets = {name: targets[name] for name in args.targets or targets}
+
+    report = Report("fan_out")
+    if args.rigged:
+        rigged_files = [Path(s).resolve() for s in args.sources]
+        check_clips(rigged_files, targets)
+    else:
+        if not args.action_set:
+            raise PipelineError("--set is required to build the clips, unless the sources are --rigged")
+        rigged_files = [path for path in (rig_once(s, args.action_set, report, args.weights, args.cleanup,
+                                                   args.weld) for s in args.sources) if path]
+    results = fan_out(rigged_files, targets, args.workers, report)
+    if args.publish:
+        for name, profile in targets.items():
+            done = [r["output"] for r in results.values() if r["ok"] and r["target"] == name]
+            publish(done, ENEMIES_DIR / (profile.get("dest") or name), report=report)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
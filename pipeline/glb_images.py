@@ -0,0 +1,148 @@
+"""Carry the original compressed images of a source glTF into an exported GLB.
+
+Blender's exporter decodes every texture and encodes it again (JPEG to
+JPEG is lossy, and slow on 4K maps). Stages can instead export with
+``export_image_format='NONE'`` and call ``transplant_images``: the source's
+textures are re-attached to the output materials with their image bytes
+copied verbatim, either into the output's BIN chunk or as a reference to a
+shared external file. No pixel is decoded, and the same source always gives
+the same image bytes.
+
+Output materials are matched to source materials by name, then in order.
+"""
+
+import json
+import os
+import struct
+from pathlib import Path
+
+from .gltf import CHUNK_BIN, CHUNK_JSON, GLB_MAGIC, Gltf, GltfError, parse_glb
+
+# Material keys that hold a textureInfo.
+TEXTURE_SLOTS = (
+    ("pbrMetallicRoughness", "baseColorTexture"),
+    ("pbrMetallicRoughness", "metallicRoughnessTexture"),
+    (None, "normalTexture"),
+    (None, "occlusionTexture"),
+    (None, "emissiveTexture"),
+)
+EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp"}
+
+
+def _pad(data, fill):
+    return data + fill * (-len(data) % 4)
+
+
+def write_glb(path, doc, binary):
+    """Write a GLB from a JSON dict and BIN bytes (None for no BIN chunk)."""
+    text = _pad(json.dumps(doc, separators=(",", ":")).encode("utf-8"), b" ")
+    chunks = [struct.pack("<II", len(text), CHUNK_JSON), text]
+    if binary is not None:
+        binary = _pad(bytes(binary), b"\0")
+        chunks += [struct.pack("<II", len(binary), CHUNK_BIN), binary]
+    body = b"".join(chunks)
+    Path(path).write_bytes(GLB_MAGIC + struct.pack("<II", 2, 12 + len(body)) + body)
+
+
+def _copy(value):
+    return json.loads(json.dumps(value))
+
+
+def image_bytes(gltf, index):
+    """(compressed bytes, MIME type) of image ``index`` of a parsed file."""
+    image = gltf.items("images")[index]
+    if "bufferView" in image:
+        data, _ = gltf.buffer_view(image["bufferView"])
+        return bytes(data), image.get("mimeType", "image/png")
+    uri = image.get("uri", "")
+    if uri.startswith("data:"):
+        raise GltfError(f"{gltf.path.name}: data-URI images are not supported")
+    mime = {v: k for k, v in EXTENSIONS.items()}.get(Path(uri).suffix.lower(), "image/png")
+    return (gltf.path.parent / uri).read_bytes(), mime
+
+
+def match_materials(out_materials, src_materials):
+    """{output material index: source material index}, by name and then in order."""
+    src_by_name = {m.get("name"): i for i, m in enumerate(src_materials) if m.get("name")}
+    pairs = {i: src_by_name[m.get("name")] for i, m in enumerate(out_materials) if m.get("name") in src_by_name}
+    rest_out = [i for i in range(len(out_materials)) if i not in pairs]
+    rest_src = [i for i in range(len(src_materials)) if i not in pairs.values()]
+    pairs.update(zip(rest_out, rest_src))
+    return pairs
+
+
+def transplant_images(output, source, external_dir=None):
+    """Re-attach ``source``'s textures to the materials of the GLB ``output`` in place.
+
+    With ``external_dir`` the images are written there once (named after the
+    source and image index) and referenced by relative URI; otherwise they
+    are appended to the output's BIN chunk. Returns the external files written.
+    """
+    output = Path(output)
+    src = Gltf(source)
+    doc, binary = parse_glb(memoryview(output.read_bytes()))
+    binary = bytearray(binary or b"")
+    if not doc.get("buffers"):
+        doc["buffers"] = [{"byteLength": 0}]
+    for key in ("images", "textures", "samplers"):
+        doc.setdefault(key, [])
+
+    images, samplers, textures, written = {}, {}, {}, []
+
+    def add_image(index):
+        if index not in images:
+            data, mime = image_bytes(src, index)
+            name = src.items("images")[index].get("name") or f"image_{index}"
+            if external_dir is not None:
+                target = Path(external_dir) / f"{Path(source).stem}_{index}{EXTENSIONS.get(mime, '.bin')}"
+                if not target.is_file() or target.read_bytes() != data:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    target.write_bytes(data)
+                written.append(str(target))
+                uri = Path(os.path.relpath(target.resolve(), output.parent.resolve())).as_posix()
+                doc["images"].append({"name": name, "uri": uri})
+            else:
+                binary.extend(b"\0" * (-len(binary) % 4))
+                offset = len(binary)
+                binary.extend(data)
+                doc.setdefault("bufferViews", []).append({"buffer": 0, "byteOffset": offset, "byteLength": len(data)})
+                doc["images"].append({"name": name, "mimeType": mime, "bufferView": len(doc["bufferViews"]) - 1})
+            images[index] = len(doc["images"]) - 1
+        return images[index]
+
+    def add_texture(index):
+        if index not in textures:
+            texture = _copy(src.items("textures")[index])
+            if "source" in texture:
+                texture["source"] = add_image(texture["source"])
+            if "sampler" in texture:
+                s = texture["sampler"]
+                if s not in samplers:
+                    doc["samplers"].append(_copy(src.items("samplers")[s]))
+                    samplers[s] = len(doc["samplers"]) - 1
+                texture["sampler"] = samplers[s]
+            # Image extensions (WebP, Basis) point at images of their own.
+            for ext in texture.get("extensions", {}).values():
+                if "source" in ext:
+                    ext["source"] = add_image(ext["source"])
+            doc["textures"].append(texture)
+            textures[index] = len(doc["textures"]) - 1
+        return textures[index]
+
+    out_materials = doc.get("materials", [])
+    for out_i, src_i in match_materials(out_materials, src.items("materials")).items():
+        src_mat, out_mat = src.items("materials")[src_i], out_materials[out_i]
+        for parent, slot in TEXTURE_SLOTS:
+            info = (src_mat.get(parent, {}) if parent else src_mat).get(slot)
+            if info is None:
+                continue
+            info = {**_copy(info), "index": add_texture(info["index"])}
+            (out_mat.setdefault(parent, {}) if parent else out_mat)[slot] = info
+
+    for key in ("images", "textures", "samplers"):
+        if not doc[key]:
+            del doc[key]
+    if binary:
+        doc["buffers"][0]["byteLength"] = len(binary)
+    write_glb(output, doc, binary if binary else None)
+    return written
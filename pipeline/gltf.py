@@ -0,0 +1,124 @@
+"""Standalone glTF 2.0 / GLB reader: JSON plus NumPy views of accessors.
+
+No Blender and no Godot; enough of the format for analysis tools that only
+need to look at nodes, skins, animations and buffer sizes.
+"""
+
+import base64
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .errors import PipelineError
+
+GLB_MAGIC = b"glTF"
+CHUNK_JSON = 0x4E4F534A
+CHUNK_BIN = 0x004E4942
+COMPONENT_TYPES = {
+    5120: np.int8,
+    5121: np.uint8,
+    5122: np.int16,
+    5123: np.uint16,
+    5125: np.uint32,
+    5126: np.float32,
+}
+TYPE_SIZES = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT2": 4, "MAT3": 9, "MAT4": 16}
+
+
+class GltfError(PipelineError):
+    pass
+
+
+def parse_glb(data):
+    """Split GLB bytes into (json dict, BIN chunk bytes or None)."""
+    if len(data) < 12 or data[:4] != GLB_MAGIC:
+        raise GltfError("not a GLB file")
+    _, version, length = struct.unpack_from("<4sII", data)
+    if version != 2:
+        raise GltfError(f"unsupported GLB version {version}")
+    doc, binary, offset = None, None, 12
+    while offset + 8 <= min(length, len(data)):
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == CHUNK_JSON:
+            doc = json.loads(bytes(chunk))
+        elif chunk_type == CHUNK_BIN and binary is None:
+            binary = chunk
+        offset += 8 + chunk_length
+    if doc is None:
+        raise GltfError("GLB has no JSON chunk")
+    return doc, binary
+
+
+class Gltf:
+    """A parsed .glb/.gltf file. ``accessor(i)`` returns an (count, components) array."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        data = memoryview(self.path.read_bytes())
+        if self.path.suffix.lower() == ".glb":
+            self.json, binary = parse_glb(data)
+        else:
+            self.json, binary = json.loads(bytes(data)), None
+        self.buffers = [self._load_buffer(b, binary) for b in self.json.get("buffers", [])]
+
+    def _load_buffer(self, buffer, binary):
+        uri = buffer.get("uri")
+        if uri is None:
+            if binary is None:
+                raise GltfError(f"{self.path.name}: buffer without uri and no BIN chunk")
+            return binary
+        if uri.startswith("data:"):
+            return memoryview(base64.b64decode(uri.split(",", 1)[1]))
+        return memoryview((self.path.parent / uri).read_bytes())
+
+    def items(self, key):
+        return self.json.get(key, [])
+
+    def buffer_view(self, index):
+        view = self.json["bufferViews"][index]
+        start = view.get("byteOffset", 0)
+        return self.buffers[view["buffer"]][start:start + view["byteLength"]], view.get("byteStride")
+
+    def accessor(self, index):
+        acc = self.json["accessors"][index]
+        dtype = np.dtype(COMPONENT_TYPES[acc["componentType"]])
+        width = TYPE_SIZES[acc["type"]]
+        count = acc["count"]
+        if "bufferView" in acc:
+            data, stride = self.buffer_view(acc["bufferView"])
+            stride = stride or dtype.itemsize * width
+            raw = np.ndarray((count, width), dtype=dtype, buffer=data,
+                             offset=acc.get("byteOffset", 0), strides=(stride, dtype.itemsize))
+            out = np.array(raw)
+        else:
+            out = np.zeros((count, width), dtype=dtype)
+        sparse = acc.get("sparse")
+        if sparse:
+            idx = sparse["indices"]
+            data, _ = self.buffer_view(idx["bufferView"])
+            rows = np.frombuffer(data, dtype=COMPONENT_TYPES[idx["componentType"]], count=sparse["count"],
+                                 offset=idx.get("byteOffset", 0))
+            vals = sparse["values"]
+            data, _ = self.buffer_view(vals["bufferView"])
+            out[rows] = np.frombuffer(data, dtype=dtype, count=sparse["count"] * width,
+                                      offset=vals.get("byteOffset", 0)).reshape(-1, width)
+        if acc.get("normalized") and dtype.kind in "iu":
+            # glTF: signed values clamp at -1, unsigned scale by the max value.
+            out = np.maximum(out / np.iinfo(dtype).max, -1.0).astype(np.float32)
+        return out
+
+    def node_names(self):
+        return [node.get("name", f"node_{i}") for i, node in enumerate(self.items("nodes"))]
+
+    def joint_nodes(self):
+        return sorted({j for skin in self.items("skins") for j in skin["joints"]})
+
+    def parents(self):
+        parents = [None] * len(self.items("nodes"))
+        for i, node in enumerate(self.items("nodes")):
+            for child in node.get("children", []):
+                parents[child] = i
+        return parents
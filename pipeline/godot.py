@@ -0,0 +1,100 @@
+import re
+import subprocess
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+
+from .config import GODOT_PROJECT, find_godot
+from .errors import PipelineError
+
+SECTION_RE = re.compile(r"^\[(\w+)\]\s*$")
+STRING_VALUE_RE = r'^{}="(.*)"\s*$'
+
+
+class GodotNotFound(PipelineError):
+    pass
+
+
+def require_godot():
+    exe = find_godot()
+    if not exe:
+        raise GodotNotFound("Godot Engine not found in PATH (set GODOT or install Godot 4.2+)")
+    return exe
+
+
+@lru_cache(maxsize=None)
+def godot_version(exe):
+    out = subprocess.run([exe, "--headless", "--version"], capture_output=True, text=True, check=True)
+    return out.stdout.strip().splitlines()[-1]
+
+
+def run_headless(exe, *args, project=GODOT_PROJECT, timeout=None, capture=True):
+    cmd = [exe, "--headless", "--path", str(project), *args]
+    return subprocess.run(cmd, capture_output=capture, text=True, timeout=timeout)
+
+
+@dataclass
+class ImportFile:
+    """The parts of a Godot ``.import`` sidecar the pipeline cares about."""
+
+    path: Path
+    importer: str = ""
+    source_file: str = ""
+    dest_files: list = field(default_factory=list)
+    params: str = ""
+
+    @property
+    def exists(self):
+        return self.path.is_file()
+
+
+def import_sidecar(source):
+    return Path(str(source) + ".import")
+
+
+def read_import_file(path):
+    """Parse a ``.import`` file without evaluating its values.
+
+    ``[params]`` is kept as normalised raw text: it is only ever hashed, and
+    values such as ``_subresources`` span several lines of JSON.
+    """
+    info = ImportFile(path=Path(path))
+    if not info.exists:
+        return info
+    sections = {}
+    current = None
+    for line in info.path.read_text().splitlines():
+        m = SECTION_RE.match(line)
+        if m:
+            current = sections.setdefault(m.group(1), [])
+            continue
+        if current is not None:
+            current.append(line.rstrip())
+
+    def value(section, key):
+        for line in sections.get(section, []):
+            m = re.match(STRING_VALUE_RE.format(re.escape(key)), line)
+            if m:
+                return m.group(1)
+        return ""
+
+    info.importer = value("remap", "importer")
+    info.source_file = value("deps", "source_file")
+    for line in sections.get("deps", []):
+        if line.startswith("dest_files="):
+            info.dest_files = re.findall(r'"(res://[^"]+)"', line)
+    info.params = "\n".join(line for line in sections.get("params", []) if line)
+    return info
+
+
+def read_import_md5(path):
+    """Return (source_md5, dest_md5) from a ``.godot/imported/*.md5`` file."""
+    values = {}
+    try:
+        text = Path(path).read_text()
+    except FileNotFoundError:
+        return None, None
+    for line in text.splitlines():
+        key, _, val = line.partition("=")
+        values[key.strip()] = val.strip().strip('"')
+    return values.get("source_md5"), values.get("dest_md5")
@@ -0,0 +1,238 @@
+"""Headless Godot import of pipeline outputs.
+
+Godot keys its import artifacts on the md5 of the source file and stores them
+under ``.godot/imported/<name>-<md5(res path)>.*``. This stage does the same
+work ahead of ``export_web.sh``:
+
+* assets whose ``.md5`` record already matches the source are skipped;
+* otherwise the artifacts are restored from the stage cache, keyed by the
+  source hash, the ``[params]`` of the ``.import`` sidecar, the importer and
+  the Godot version;
+* the remaining assets are imported by headless Godot, sharded across
+  throwaway copies of the project so several imports run at once, and the
+  results are copied back and cached.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from .cache import StageCache, file_digest, make_key
+from .config import ENEMIES_DIR, GODOT_IMPORTED_DIR, GODOT_PROJECT, res_path
+from .godot import godot_version, import_sidecar, read_import_file, read_import_md5, require_godot, run_headless
+from .report import Report
+
+STAGE = "godot_import"
+# Source types handled by this stage; scripts, scenes and resources need no import.
+IMPORTABLE_SUFFIXES = {".glb", ".gltf", ".fbx", ".png", ".jpg", ".jpeg", ".webp", ".wav", ".ogg"}
+SHARD_TIMEOUT = 30 * 60
+
+
+@dataclass
+class ImportAsset:
+    source: Path
+    res: str
+    source_md5: str
+    key: str
+    shardable: bool
+
+    @property
+    def sidecar(self):
+        return import_sidecar(self.source)
+
+    @property
+    def md5_file(self):
+        return GODOT_IMPORTED_DIR / f"{self.source.name}-{hashlib.md5(self.res.encode()).hexdigest()}.md5"
+
+    def artifact_names(self):
+        info = read_import_file(self.sidecar)
+        names = [Path(dest[len("res://"):]).name for dest in info.dest_files]
+        return names + [self.md5_file.name]
+
+    def is_up_to_date(self):
+        recorded, _ = read_import_md5(self.md5_file)
+        if recorded != self.source_md5 or not self.sidecar.is_file():
+            return False
+        return all((GODOT_IMPORTED_DIR / name).is_file() for name in self.artifact_names())
+
+
+def discover(paths):
+    """Importable source files under ``paths`` (files or directories)."""
+    found = []
+    for path in map(Path, paths):
+        candidates = [path] if path.is_file() else sorted(p for p in path.rglob("*") if p.is_file())
+        for p in candidates:
+            if ".godot" in p.parts or p.suffix.lower() not in IMPORTABLE_SUFFIXES:
+                continue
+            found.append(p.resolve())
+    return found
+
+
+def describe(source, version):
+    info = read_import_file(import_sidecar(source))
+    res = res_path(source)
+    # Artifact names embed md5(res path), so the location is part of the key.
+    key = make_key(STAGE, res, file_digest(source), info.importer, info.params, version)
+    # Assets whose import params point at other project resources (import
+    # scripts, external materials, bone maps) need the real project around them.
+    shardable = "res://" not in info.params
+    return ImportAsset(
+        source=source,
+        res=res,
+        source_md5=file_digest(source, "md5"),
+        key=key,
+        shardable=shardable,
+    )
+
+
+def plan_shards(assets, jobs):
+    """Split assets into at most ``jobs`` shards of similar total size.
+
+    Assets in the same directory stay together: a GLB import extracts its
+    images next to it and imports them in the same pass.
+    """
+    groups = {}
+    for asset in assets:
+        groups.setdefault(asset.source.parent, []).append(asset)
+    bins = [[0, []] for _ in range(max(1, min(jobs, len(groups))))]
+    for group in sorted(groups.values(), key=lambda g: -sum(a.source.stat().st_size for a in g)):
+        target = min(bins, key=lambda b: b[0])
+        target[0] += sum(a.source.stat().st_size for a in group)
+        target[1].extend(group)
+    return [assets for _, assets in bins if assets]
+
+
+def _link_or_copy(src, dst):
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _import_in_project(godot, project):
+    result = run_headless(godot, "--import", project=project, timeout=SHARD_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"godot --import failed in {project}:\n{result.stderr[-2000:]}")
+
+
+def import_shard(godot, assets):
+    """Import ``assets`` in a scratch copy of the project and copy the results back."""
+    with tempfile.TemporaryDirectory(prefix="godot-import-") as tmp:
+        shard = Path(tmp)
+        shutil.copy2(GODOT_PROJECT / "project.godot", shard / "project.godot")
+        dirs = set()
+        for asset in assets:
+            rel = asset.source.relative_to(GODOT_PROJECT)
+            _link_or_copy(asset.source, shard / rel)
+            if asset.sidecar.is_file():
+                shutil.copy2(asset.sidecar, shard / (str(rel) + ".import"))
+            dirs.add(rel.parent)
+
+        _import_in_project(godot, shard)
+
+        # Sidecars and files the importer generated (extracted images and
+        # their sidecars) go back next to the sources.
+        for rel_dir in dirs:
+            for produced in (shard / rel_dir).iterdir():
+                target = GODOT_PROJECT / rel_dir / produced.name
+                if produced.is_file() and not (target.exists() and target.samefile(produced)):
+                    shutil.copy2(produced, target)
+        GODOT_IMPORTED_DIR.mkdir(parents=True, exist_ok=True)
+        for artifact in (shard / ".godot" / "imported").iterdir():
+            shutil.copy2(artifact, GODOT_IMPORTED_DIR / artifact.name)
+
+
+def store(cache, asset):
+    files = {name: GODOT_IMPORTED_DIR / name for name in asset.artifact_names()}
+    files[asset.sidecar.name] = asset.sidecar
+    if all(p.is_file() for p in files.values()):
+        cache.put(asset.key, files, meta={"source": asset.res})
+
+
+def restore(cache, asset):
+    entry = cache.get(asset.key)
+    if entry is None:
+        return False
+    for name in cache.manifest(asset.key)["files"]:
+        dst = asset.sidecar if name == asset.sidecar.name else GODOT_IMPORTED_DIR / name
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(entry / name, dst)
+    return True
+
+
+def run(paths=None, jobs=None, use_cache=True, report=None):
+    report = report or Report(STAGE)
+    godot = require_godot()
+    version = godot_version(godot)
+    cache = StageCache(STAGE)
+    jobs = jobs or max(1, (os.cpu_count() or 2) // 2)
+
+    pending = []
+    for source in discover(paths or [ENEMIES_DIR]):
+        with report.timed("scan", source.name) as entry:
+            asset = describe(source, version)
+            if asset.is_up_to_date():
+                entry["status"] = "up-to-date"
+            elif use_cache and restore(cache, asset):
+                entry["status"] = "cache-hit"
+            else:
+                entry["status"] = "pending"
+                pending.append(asset)
+
+    if not pending:
+        return report
+
+    sharded = [a for a in pending if a.shardable]
+    pinned = [a for a in pending if not a.shardable]
+    shards = plan_shards(sharded, jobs) if sharded else []
+    print(f"Importing {len(pending)} asset(s) with Godot {version}: "
+          f"{len(shards)} shard(s), {len(pinned)} in-project")
+
+    def work(batch, in_project):
+        start = time.perf_counter()
+        try:
+            if in_project:
+                _import_in_project(godot, GODOT_PROJECT)
+            else:
+                import_shard(godot, batch)
+            status = "imported"
+        except Exception as exc:
+            print(f"✗ Import failed: {exc}")
+            status = "failed"
+        elapsed = time.perf_counter() - start
+        for asset in batch:
+            ok = status == "imported" and asset.is_up_to_date()
+            if ok and use_cache:
+                store(cache, asset)
+            report.add("import", asset.source.name, elapsed / len(batch), status if ok else "failed",
+                       shard_seconds=round(elapsed, 3), shard_size=len(batch))
+
+    if shards:
+        with ThreadPoolExecutor(max_workers=len(shards)) as pool:
+            for f in [pool.submit(work, shard, False) for shard in shards]:
+                f.result()
+    # Runs last: an in-project import also picks up anything still outdated.
+    if pinned:
+        work(pinned, True)
+    return report
+
+
+def register(subparsers):
+    p = subparsers.add_parser("godot-import", help="import changed assets with headless Godot (cached)")
+    p.add_argument("paths", nargs="*", type=Path, help=f"files or directories (default: {ENEMIES_DIR})")
+    p.add_argument("-j", "--jobs", type=int, help="parallel Godot processes")
+    p.add_argument("--no-cache", action="store_true", help="always import, never restore from cache")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = run(args.paths, jobs=args.jobs, use_cache=not args.no_cache)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
@@ -0,0 +1,249 @@
+"""Per-bone hit volumes fitted to the skin weights of a rigged model, without Blender.
+
+    python3 -m pipeline hit-volumes godot_fighter/battle-manager/enemies/Ogrork_Goblimp_rigged.glb
+    python3 -m pipeline hit-volumes --shape box --min-vertices 32
+
+Every skinned vertex goes to the joint with its largest weight and is moved
+into that joint's bind space (inverse bind matrix). All bones are then fitted
+in one grouped pass: per-bone mean and covariance, a batched eigen
+decomposition for the principal axes, and trimmed quantiles of the vertices'
+axial and radial extents. A capsule runs along the principal axis; a box is
+aligned to all three.
+
+The volumes are written as ``<stem>_hit_volumes.tscn`` next to the model: a
+scene inheriting the model with a ``BoneAttachment3D`` per bone, holding an
+``Area3D`` (group ``hit_volumes``, ``bone`` metadata) and its shape. An
+enemy scene instances it in place of the bare model.
+"""
+
+import re
+from pathlib import Path
+
+import numpy as np
+
+from .config import ENEMIES_DIR, res_path
+from .errors import PipelineError
+from .gltf import Gltf
+from .report import Report
+
+STAGE = "hit_volumes"
+SHAPES = ("capsule", "box")
+GROUP = "hit_volumes"
+SKELETON_NODE = "Skeleton3D"
+MIN_VERTICES = 16
+# Quantiles trimming stray vertices (shared seams, weight bleed) off each volume.
+AXIAL_TRIM = 0.02
+RADIAL_QUANTILE = 0.9
+# Capsule caps reach this fraction of the radius past the trimmed ends, so the
+# rounded caps still hold the end vertices without overlapping the next bone.
+CAP_OVERHANG = 0.5
+# Same sanitising as Godot's glTF importer (and pipeline.anim_library).
+NODE_NAME_RE = re.compile(r"[:/]")
+
+
+def dominant_joints(gltf):
+    """(positions, joint node per vertex, inverse bind matrix per vertex) of all skinned primitives."""
+    skinned = {node["mesh"]: node["skin"] for node in gltf.items("nodes") if "mesh" in node and "skin" in node}
+    positions, joints, binds = [], [], []
+    for mesh_index, skin_index in sorted(skinned.items()):
+        skin = gltf.items("skins")[skin_index]
+        nodes = np.asarray(skin["joints"])
+        if "inverseBindMatrices" in skin:
+            ibm = gltf.accessor(skin["inverseBindMatrices"]).reshape(-1, 4, 4).transpose(0, 2, 1)
+        else:
+            ibm = np.broadcast_to(np.eye(4), (len(nodes), 4, 4))
+        for prim in gltf.items("meshes")[mesh_index]["primitives"]:
+            attrs = prim["attributes"]
+            if "JOINTS_0" not in attrs or "WEIGHTS_0" not in attrs:
+                continue
+            # Only the first influence set; a fifth+ influence never dominates a sane rig.
+            weights = gltf.accessor(attrs["WEIGHTS_0"]).astype(np.float64)
+            slots = gltf.accessor(attrs["JOINTS_0"]).astype(np.int64)
+            top = np.take_along_axis(slots, weights.argmax(axis=1)[:, None], axis=1)[:, 0]
+            keep = weights.max(axis=1) > 0
+            positions.append(gltf.accessor(attrs["POSITION"]).astype(np.float64)[keep])
+            joints.append(nodes[top[keep]])
+            binds.append(ibm[top[keep]])
+    if not positions:
+        raise PipelineError(f"{gltf.path.name} has no skinned mesh")
+    return np.concatenate(positions), np.concatenate(joints), np.concatenate(binds)
+
+
+def group_quantiles(values, groups, counts, q):
+    """The ``q`` quantile of ``values`` within each group (groups numbered 0..len(counts)-1)."""
+    order = np.lexsort((values, groups))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    return values[order][starts + np.floor(q * np.maximum(counts - 1, 0)).astype(np.int64)]
+
+
+def fit_volumes(points, groups, count, shape="capsule", margin=0.0):
+    """Fit one volume per group of bone-space ``points``; groups without points get NaNs.
+
+    Returns {"basis": (G, 3, 3) columns, "center": (G, 3), "size": (G, 3),
+    "radius": (G,), "height": (G,), "coverage": (G,)}. The basis Y column is
+    the principal axis (a capsule's axis, as in Godot). ``size`` is the box's
+    full extent along the basis columns; coverage is the fraction of each
+    group's points inside its volume.
+    """
+    counts = np.bincount(groups, minlength=count)
+    safe = np.maximum(counts, 1)[:, None]
+    mean = np.stack([np.bincount(groups, weights=points[:, k], minlength=count) for k in range(3)], axis=1) / safe
+    centered = points - mean[groups]
+    cov = np.zeros((count, 3, 3))
+    np.add.at(cov, groups, centered[:, :, None] * centered[:, None, :])
+    _, vectors = np.linalg.eigh(cov / safe[:, :, None])
+    # eigh sorts ascending: the largest spread becomes Y, the next X, the least Z.
+    basis = vectors[:, :, [1, 2, 0]]
+    # Point the axis along the bone (+Y in bone space) and keep a right-handed frame.
+    basis[:, :, 1] *= np.where(basis[:, 1, 1] < 0, -1.0, 1.0)[:, None]
+    basis[:, :, 2] = np.cross(basis[:, :, 0], basis[:, :, 1])
+
+    local = np.einsum("nij,ni->nj", basis[groups], centered)
+    lo = np.stack([group_quantiles(local[:, k], groups, counts, AXIAL_TRIM) for k in range(3)], axis=1)
+    hi = np.stack([group_quantiles(local[:, k], groups, counts, 1 - AXIAL_TRIM) for k in range(3)], axis=1)
+    radial = np.hypot(local[:, 0], local[:, 2])
+    radius = group_quantiles(radial, groups, counts, RADIAL_QUANTILE) + margin
+    lo, hi = lo - margin, hi + margin
+    if shape == "capsule":
+        lo[:, [0, 2]], hi[:, [0, 2]] = -radius[:, None], radius[:, None]
+        lo[:, 1] -= CAP_OVERHANG * radius / 2
+        hi[:, 1] += CAP_OVERHANG * radius / 2
+    height = np.maximum(hi[:, 1] - lo[:, 1], 2 * radius)
+    mid = (lo + hi) / 2
+    center = mean + np.einsum("gij,gj->gi", basis, mid)
+
+    offset = local - mid[groups]
+    if shape == "capsule":
+        half = np.maximum(height / 2 - radius, 0)[groups]
+        axial = np.maximum(np.abs(offset[:, 1]) - half, 0)
+        inside = np.hypot(np.hypot(offset[:, 0], offset[:, 2]), axial) <= radius[groups] + 1e-9
+    else:
+        inside = np.all(np.abs(offset) <= ((hi - lo) / 2)[groups] + 1e-9, axis=1)
+    coverage = np.bincount(groups, weights=inside, minlength=count) / safe[:, 0]
+    empty = counts == 0
+    for values in (center, radius, height, coverage):
+        values[empty] = np.nan
+    return {"basis": basis, "center": center, "size": hi - lo, "radius": radius, "height": height,
+            "coverage": coverage, "counts": counts}
+
+
+def bone_volumes(path, shape="capsule", min_vertices=MIN_VERTICES, margin=0.0):
+    """Fitted volumes of ``path``'s bones as (skeleton node path, [volume dicts], vertices)."""
+    gltf = Gltf(path)
+    positions, joints, binds = dominant_joints(gltf)
+    local = np.einsum("nij,nj->ni", binds[:, :3, :3], positions) + binds[:, :3, 3]
+    bones, groups = np.unique(joints, return_inverse=True)
+    fitted = fit_volumes(local, groups, len(bones), shape, margin)
+
+    names = gltf.node_names()
+    parents = gltf.parents()
+    # Godot puts the Skeleton3D where the root joint was, under the joints' common parent.
+    joint_nodes = set(gltf.joint_nodes())
+    roots = {parents[j] for j in joint_nodes if parents[j] not in joint_nodes}
+    armature = roots.pop() if len(roots) == 1 else None
+    skeleton = SKELETON_NODE if armature is None else f"{NODE_NAME_RE.sub('_', names[armature])}/{SKELETON_NODE}"
+    volumes = []
+    for i, node in enumerate(bones):
+        if fitted["counts"][i] < min_vertices:
+            continue
+        volumes.append({
+            "bone": NODE_NAME_RE.sub("_", names[node]),
+            "vertices": int(fitted["counts"][i]),
+            "basis": fitted["basis"][i],
+            "center": fitted["center"][i],
+            "size": fitted["size"][i],
+            "radius": float(fitted["radius"][i]),
+            "height": float(fitted["height"][i]),
+            "coverage": float(fitted["coverage"][i]),
+        })
+    return skeleton, volumes, len(positions)
+
+
+def format_floats(values):
+    return ", ".join(f"{v:.6g}" for v in values)
+
+
+def transform(basis, origin):
+    # Godot writes Transform3D row by row, then the origin.
+    return f"Transform3D({format_floats(np.asarray(basis).ravel())}, {format_floats(origin)})"
+
+
+def volume_scene(model, skeleton, volumes, shape="capsule", layer=1):
+    """``.tscn`` text inheriting ``model`` (a res:// path) with one hit volume per bone."""
+    blocks = [f'[gd_scene load_steps={len(volumes) + 2} format=3]',
+              f'[ext_resource type="PackedScene" path="{model}" id="1_model"]']
+    for i, volume in enumerate(volumes):
+        if shape == "capsule":
+            blocks.append(f'[sub_resource type="CapsuleShape3D" id="Shape_{i}"]\n'
+                          f'radius = {volume["radius"]:.6g}\nheight = {volume["height"]:.6g}')
+        else:
+            blocks.append(f'[sub_resource type="BoxShape3D" id="Shape_{i}"]\n'
+                          f'size = Vector3({format_floats(volume["size"])})')
+    root = Path(model).stem
+    blocks.append(f'[node name="{root}" instance=ExtResource("1_model")]')
+    for i, volume in enumerate(volumes):
+        bone = volume["bone"]
+        attachment = f"{skeleton}/Hit_{bone}"
+        blocks += [
+            f'[node name="Hit_{bone}" type="BoneAttachment3D" parent="{skeleton}"]\nbone_name = "{bone}"',
+            f'[node name="HitVolume" type="Area3D" parent="{attachment}" groups=["{GROUP}"]]\n'
+            f"collision_layer = {layer}\ncollision_mask = 0\nmonitoring = false\n"
+            f'metadata/bone = "{bone}"',
+            f'[node name="CollisionShape3D" type="CollisionShape3D" parent="{attachment}/HitVolume"]\n'
+            f'transform = {transform(volume["basis"], volume["center"])}\nshape = SubResource("Shape_{i}")',
+        ]
+    return "\n\n".join(blocks) + "\n"
+
+
+def build(model, shape="capsule", min_vertices=MIN_VERTICES, margin=0.0, layer=1, report=None):
+    """Write ``<stem>_hit_volumes.tscn`` next to ``model``; returns its path."""
+    report = report or Report(STAGE)
+    model = Path(model).resolve()
+    with report.timed(STAGE, model.name) as entry:
+        try:
+            model_res = res_path(model)
+        except ValueError:
+            raise PipelineError(f"{model} is not inside the Godot project; publish it first") from None
+        skeleton, volumes, vertices = bone_volumes(model, shape, min_vertices, margin)
+        if not volumes:
+            raise PipelineError(f"{model.name}: no bone has {min_vertices} or more dominant vertices")
+        output = model.with_name(f"{model.stem}_{STAGE}.tscn")
+        output.write_text(volume_scene(model_res, skeleton, volumes, shape, layer))
+        covered = sum(v["coverage"] * v["vertices"] for v in volumes) / vertices
+        entry.update(bones=len(volumes), vertices=vertices, coverage=round(covered, 3), output=output.name)
+    print(f"✓ {len(volumes)} {shape} hit volume(s), {covered:.0%} of vertices inside -> {res_path(output)}")
+    return output
+
+
+def discover(paths):
+    found = []
+    for path in map(Path, paths):
+        found += [path] if path.is_file() else sorted(path.glob("*_rigged.glb"))
+    return found
+
+
+def register(subparsers):
+    p = subparsers.add_parser("hit-volumes", help="fit per-bone hit volumes from skin weights into a scene")
+    p.add_argument("models", nargs="*", type=Path,
+                   help=f"rigged .glb/.gltf files or directories (default: {ENEMIES_DIR}/*_rigged.glb)")
+    p.add_argument("--shape", choices=SHAPES, default="capsule", help="volume fitted to each bone")
+    p.add_argument("--min-vertices", type=int, default=MIN_VERTICES,
+                   help="bones dominating fewer vertices get no volume")
+    p.add_argument("--margin", type=float, default=0.0, help="padding added around each volume, in bone units")
+    p.add_argument("--layer", type=int, default=1, help="collision layer bits of the hit areas")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    models = discover(args.models or [ENEMIES_DIR])
+    if not models:
+        raise PipelineError("no rigged models to fit")
+    for model in models:
+        try:
+            build(model, args.shape, args.min_vertices, args.margin, args.layer, report)
+        except PipelineError as exc:
+            print(f"✗ {model.name}: {exc}")
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
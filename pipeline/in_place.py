@@ -0,0 +1,78 @@
+"""Extract root motion and make clips in place (see pipeline.root_motion).
+
+    python3 -m pipeline root-motion assets/*.fbx --publish
+    python3 -m pipeline root-motion assets/Ogrork_Goblimp_rigged.glb --bone Root --no-track
+
+Each source becomes ``<stem>.glb``, whose body animates in place, and
+``<stem>_root_motion.json``, which lists the travel and turn of every clip.
+``battler.gd`` can then drive battle movement from the metadata instead of
+fighting the animation every frame.
+"""
+
+import os
+from pathlib import Path
+
+from .blender_runner import WorkerPool
+from .config import CLIPS_DIR
+from .publish import STAGING_DIR, publish
+from .report import Report
+
+STAGE = "root_motion"
+
+
+def make_job(source, bone=None, fps=None, track=True):
+    source = Path(source).resolve()
+    out_dir = STAGING_DIR / STAGE
+    return {
+        "source": str(source),
+        "output": str(out_dir / f"{source.stem}.glb"),
+        "metadata": str(out_dir / f"{source.stem}_root_motion.json"),
+        "bone": bone,
+        "fps": fps,
+        "track": track,
+    }
+
+
+def extract(sources, bone=None, fps=None, track=True, workers=None, report=None):
+    """Run the root-motion stage over ``sources``; returns the successful results."""
+    report = report or Report(STAGE)
+    jobs = [(STAGE, make_job(source, bone, fps, track)) for source in sources]
+    workers = workers or max(1, min(len(jobs), (os.cpu_count() or 2) // 2))
+    results = []
+    with WorkerPool(workers) as pool:
+        for (_, job), result in pool.map_unordered(jobs):
+            name = Path(job["source"]).name
+            if not result["ok"]:
+                report.add(STAGE, name, result.get("seconds", 0.0), "failed")
+                print(f"✗ {name}\n{result['error']}")
+                continue
+            clips = result["clips"]
+            report.add(STAGE, name, result["seconds"], bone=result["bone"], clips=len(clips),
+                       moving=sum(1 for c in clips.values() if c["distance"] > 1e-4))
+            for clip, meta in sorted(clips.items()):
+                loop = ", returns to start" if meta["returns_to_start"] else ""
+                print(f"  {name} {clip}: {meta['distance']:.3f} m, {meta['yaw_degrees']:.1f}°{loop}")
+            results.append(result)
+    return results
+
+
+def register(subparsers):
+    p = subparsers.add_parser("root-motion", help="move clip travel to a root-motion track and animate in place")
+    p.add_argument("sources", nargs="+", type=Path, help="animated .glb/.gltf/.fbx files")
+    p.add_argument("--bone", help="bone to extract from (default: the first top-level bone)")
+    p.add_argument("--fps", type=float, help="samples per second (default: the scene frame rate)")
+    p.add_argument("--no-track", action="store_true",
+                   help="write only the metadata, not the armature root-motion track")
+    p.add_argument("-j", "--workers", type=int, help="parallel Blender workers")
+    p.add_argument("--publish", action="store_true", help=f"publish clips and metadata into {CLIPS_DIR}")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    results = extract(args.sources, args.bone, args.fps, not args.no_track, args.workers, report)
+    if args.publish and results:
+        publish([p for r in results for p in (r["output"], r["metadata"])], CLIPS_DIR, report=report)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
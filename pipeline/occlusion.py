@@ -0,0 +1,133 @@
+"""Per-vertex ambient occlusion on plain NumPy arrays, baked across a process pool.
+
+The surface is voxelized once (triangles sampled at half the voxel size).
+Every vertex then casts a fixed set of cosine-weighted hemisphere rays
+about its normal and marches them through the occupancy grid; the fraction
+of rays that hit a voxel within ``distance`` is the occlusion. Rays start a
+couple of voxels off the surface, so a vertex never occludes itself.
+
+``bake`` runs on the shared-memory arrays of the ``arrays`` Blender stage:
+the grid and normals are shared once and each pool process marches its own
+vertex range (see ``pipeline.analysis``).
+"""
+
+import numpy as np
+
+from . import shm
+from .analysis import map_chunks
+
+RESOLUTION = 128      # voxels along the model's longest side
+RAYS = 32
+DISTANCE = 0.2        # ray length, as a fraction of the model's longest side
+STEP = 0.75           # march step, in voxels
+START = 2.0           # first sample (and normal offset) from the surface, in voxels
+# Vertices marched at once inside a worker, bounding the (V, rays, steps) samples.
+BLOCK = 2048
+
+
+def vertex_normals(points, triangles):
+    """Area-weighted unit normals; vertices without faces get +Z."""
+    a, b, c = (points[triangles[:, i]] for i in range(3))
+    face = np.cross(b - a, c - a)
+    normals = np.zeros_like(points, dtype=np.float64)
+    for i in range(3):
+        np.add.at(normals, triangles[:, i], face)
+    length = np.linalg.norm(normals, axis=1, keepdims=True)
+    return np.where(length > 1e-20, normals / np.maximum(length, 1e-20), [0.0, 0.0, 1.0])
+
+
+def hemisphere_directions(count):
+    """``count`` cosine-weighted directions about +Z, evenly spread (Fibonacci spiral)."""
+    i = np.arange(count) + 0.5
+    radius = np.sqrt(i / count)
+    angle = i * np.pi * (3.0 - np.sqrt(5.0))
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle), np.sqrt(1.0 - radius ** 2)], axis=1)
+
+
+def tangent_frames(normals):
+    """(tangent, bitangent) completing each normal to an orthonormal frame."""
+    helper = np.where(np.abs(normals[:, :1]) < 0.9, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]])
+    tangent = np.cross(normals, helper)
+    tangent /= np.linalg.norm(tangent, axis=1, keepdims=True)
+    return tangent, np.cross(normals, tangent)
+
+
+def surface_samples(points, triangles, spacing):
+    """Points on every triangle, no further than about ``spacing`` apart."""
+    a, b, c = (points[triangles[:, i]] for i in range(3))
+    longest = np.max([np.linalg.norm(b - a, axis=1), np.linalg.norm(c - b, axis=1),
+                      np.linalg.norm(a - c, axis=1)], axis=0)
+    splits = np.clip(np.ceil(longest / spacing), 1, 256).astype(np.int64)
+    samples = []
+    # Triangles with the same split count share one barycentric lattice.
+    for n in np.unique(splits):
+        i, j = np.meshgrid(np.arange(n + 1), np.arange(n + 1), indexing="ij")
+        keep = i + j <= n
+        u, v = i[keep] / n, j[keep] / n
+        t = splits == n
+        ta, tb, tc = a[t, None], b[t, None], c[t, None]
+        samples.append((ta + u[:, None] * (tb - ta) + v[:, None] * (tc - ta)).reshape(-1, 3))
+    return np.concatenate(samples) if samples else np.empty((0, 3))
+
+
+def voxelize(points, triangles, resolution=RESOLUTION):
+    """(occupied (X, Y, Z) bool grid, origin, voxel size) of the surface."""
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    voxel = max(float((hi - lo).max()), 1e-9) / resolution
+    origin = lo - voxel
+    dims = np.ceil((hi - lo) / voxel).astype(np.int64) + 3
+    cells = np.floor((surface_samples(points, triangles, voxel * 0.5) - origin) / voxel).astype(np.int64)
+    cells = np.clip(cells, 0, dims - 1)
+    occupied = np.zeros(dims, dtype=bool)
+    occupied[cells[:, 0], cells[:, 1], cells[:, 2]] = True
+    return occupied, origin, voxel
+
+
+def occlusion(positions, normals, occupied, origin, voxel, directions, distance):
+    """Fraction of ``directions`` (about each normal) blocked within ``distance``."""
+    tangent, bitangent = tangent_frames(normals)
+    rays = (directions[None, :, 0, None] * tangent[:, None] + directions[None, :, 1, None] * bitangent[:, None]
+            + directions[None, :, 2, None] * normals[:, None])
+    steps = np.arange(START, max(distance / voxel, START) + STEP, STEP) * voxel
+    starts = positions + normals * START * voxel
+    samples = starts[:, None, None] + rays[:, :, None] * steps[None, None, :, None]
+    cells = np.floor((samples - origin) / voxel).astype(np.int64)
+    dims = np.array(occupied.shape)
+    inside = np.all((cells >= 0) & (cells < dims), axis=-1)
+    cells = np.where(inside[..., None], cells, 0)
+    hit = occupied[cells[..., 0], cells[..., 1], cells[..., 2]] & inside
+    return hit.any(axis=2).mean(axis=1)
+
+
+def _occlusion_chunk(manifest, start, stop, origin, voxel, directions, distance):
+    with shm.attach(manifest) as arrays:
+        for lo in range(start, stop, BLOCK):
+            hi = min(lo + BLOCK, stop)
+            arrays["occlusion"][lo:hi] = occlusion(arrays["positions"][lo:hi], arrays["normals"][lo:hi],
+                                                   arrays["occupied"], origin, voxel, directions, distance)
+    return stop - start
+
+
+def bake(manifest, rays=RAYS, distance=DISTANCE, resolution=RESOLUTION, workers=None):
+    """Occlusion of the shared ``positions``/``triangles``.
+
+    Returns a new manifest holding ``occlusion`` (V,) float32 in [0, 1]; the
+    caller releases it.
+    """
+    with shm.attach(manifest) as arrays:
+        points = np.array(arrays["positions"], dtype=np.float64)
+        triangles = np.asarray(arrays["triangles"], dtype=np.int64)
+        occupied, origin, voxel = voxelize(points, triangles, resolution)
+        normals = vertex_normals(points, triangles)
+    length = distance * float(np.ptp(points, axis=0).max())
+    shared = shm.share({"normals": normals, "occupied": occupied})
+    out = shm.allocate({"occlusion": ((len(points),), np.float32)})
+    try:
+        map_chunks(_occlusion_chunk, {"positions": manifest["positions"], **shared, **out}, len(points),
+                   origin, voxel, hemisphere_directions(rays), length, workers=workers)
+    except BaseException:
+        shm.release(out)
+        raise
+    finally:
+        shm.release(shared)
+    return out
@@ -0,0 +1,257 @@
+"""Asyncio supervision of Blender and Godot subprocesses.
+
+A ``Task`` is one unit of work: a Blender stage with a chain of fallback
+jobs, or a plain command such as a headless Godot import. The orchestrator
+runs tasks concurrently, within a limit derived from cores and free memory.
+
+- Each attempt runs in its own process group, so a timeout or a
+  cancellation kills the whole subprocess tree.
+- A crash with no result is retried with the same job. A timeout, a
+  failure, or a result rejected by ``accept`` moves to the next job in the
+  chain.
+- Every step is reported as an ``Event`` to ``on_event``:
+  queued, started, progress, log, retry, timeout, finished, failed or
+  cancelled. Progress events come from ``progress()`` calls in the stages.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from .blender.worker import PROGRESS_MARKER
+from .blender_runner import blender_command
+
+MEMORY_PER_JOB = 2 << 30
+THREADS_PER_JOB = 2
+KILL_GRACE = 5.0
+LOG_TAIL = 200
+
+
+@dataclass
+class Event:
+    task: str
+    kind: str
+    attempt: int = 0
+    data: dict = field(default_factory=dict)
+    time: float = field(default_factory=time.time)
+
+    def to_json(self):
+        return json.dumps(asdict(self), default=str)
+
+
+@dataclass
+class Task:
+    """A Blender ``stage`` tried with each of ``jobs`` in turn, or a command ``argv``."""
+
+    name: str
+    stage: str = None
+    jobs: list = field(default_factory=list)
+    argv: list = None
+    timeout: float = None
+    retries: int = 1
+    # accept(result) -> None, or a reason to move on to the next job.
+    accept: object = None
+
+    @property
+    def attempts(self):
+        return self.jobs if self.stage else [None]
+
+
+def available_memory():
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def default_concurrency(memory_per_job=MEMORY_PER_JOB, threads_per_job=THREADS_PER_JOB):
+    """Jobs that fit both the cores (a few threads each) and the free memory."""
+    by_cores = (os.cpu_count() or 2) // threads_per_job
+    memory = available_memory()
+    by_memory = memory // memory_per_job if memory else by_cores
+    return max(1, min(by_cores, by_memory))
+
+
+def print_event(event):
+    """Human-readable default for ``on_event``; log lines are dropped."""
+    data = event.data
+    if event.kind == "started":
+        detail = f" ({data['strategy']})" if data.get("strategy") else ""
+        print(f"▶ {event.task}: attempt {event.attempt}{detail}")
+    elif event.kind == "progress":
+        fields = " ".join(f"{k}={v}" for k, v in data.items() if k != "step")
+        print(f"  {event.task}: {data['step']} {fields}".rstrip())
+    elif event.kind in ("retry", "timeout"):
+        print(f"⟳ {event.task}: {event.kind} — {data.get('reason', '')}")
+    elif event.kind == "finished":
+        print(f"✓ {event.task} ({data['seconds']:.1f}s, {event.attempt} attempt(s))")
+    elif event.kind in ("failed", "cancelled"):
+        print(f"✗ {event.task}: {event.kind} {data.get('reason', '')}".rstrip())
+
+
+def strategy(job):
+    """Short label of what distinguishes a fallback job, for events."""
+    return ", ".join(f"{k}={job[k]}" for k in ("weights",) if job and k in job)
+
+
+async def kill_group(proc):
+    if proc.returncode is not None:
+        return
+    try:
+        os.killpg(proc.pid, signal.SIGTERM)
+        await asyncio.wait_for(proc.wait(), KILL_GRACE)
+    except (ProcessLookupError, asyncio.TimeoutError):
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await proc.wait()
+
+
+class Orchestrator:
+    def __init__(self, concurrency=None, on_event=print_event, report=None):
+        self.concurrency = concurrency or default_concurrency()
+        self.on_event = on_event or (lambda event: None)
+        self.report = report
+        self._slots = None
+
+    def emit(self, task, kind, attempt=0, **data):
+        self.on_event(Event(task.name, kind, attempt, data))
+
+    async def _stream(self, task, attempt, proc, log):
+        async for raw in proc.stdout:
+            line = raw.decode(errors="replace").rstrip("\n")
+            if line.startswith(PROGRESS_MARKER):
+                self.emit(task, "progress", attempt, **json.loads(line[len(PROGRESS_MARKER):]))
+            else:
+                log.append(line)
+                self.emit(task, "log", attempt, line=line)
+
+    async def _attempt(self, task, attempt, job):
+        """Run one attempt; returns a result dict (``ok`` False on any failure)."""
+        with tempfile.TemporaryDirectory(prefix=f"orchestrate-{task.name}-") as tmp:
+            result_path = Path(tmp) / "result.json"
+            if task.stage:
+                job_path = Path(tmp) / "job.json"
+                job_path.write_text(json.dumps(job, default=str))
+                argv = blender_command(task.stage, job_path, result_path)
+            else:
+                argv = [str(a) for a in task.argv]
+            proc = await asyncio.create_subprocess_exec(
+                *argv, stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+                start_new_session=True,
+            )
+            log = deque(maxlen=LOG_TAIL)
+            try:
+                await asyncio.wait_for(self._stream(task, attempt, proc, log), task.timeout)
+                await proc.wait()
+            except asyncio.TimeoutError:
+                await kill_group(proc)
+                return {"ok": False, "timeout": True, "error": f"timed out after {task.timeout}s",
+                        "log": "\n".join(log)}
+            except asyncio.CancelledError:
+                await kill_group(proc)
+                raise
+            if task.stage:
+                if not result_path.is_file():
+                    return {"ok": False, "crashed": True, "log": "\n".join(log),
+                            "error": f"Blender exited with {proc.returncode} and no result"}
+                result = json.loads(result_path.read_text())
+            else:
+                result = {"ok": proc.returncode == 0, "returncode": proc.returncode}
+                if proc.returncode:
+                    result["error"] = f"exited with {proc.returncode}"
+        result["log"] = "\n".join(log)
+        return result
+
+    async def _run_task(self, task):
+        self.emit(task, "queued")
+        async with self._slots:
+            start = time.perf_counter()
+            attempt = 0
+            result = {"ok": False, "error": "no attempts"}
+            jobs = task.attempts
+            try:
+                for i, job in enumerate(jobs):
+                    for retry in range(task.retries + 1):
+                        attempt += 1
+                        self.emit(task, "started", attempt, strategy=strategy(job))
+                        result = await self._attempt(task, attempt, job)
+                        if result["ok"] and task.accept:
+                            reason = task.accept(result)
+                            if reason:
+                                result = {**result, "ok": False, "rejected": True, "error": reason}
+                        if result["ok"] or not result.get("crashed") or retry == task.retries:
+                            break
+                        self.emit(task, "retry", attempt, reason=result["error"], strategy=strategy(job))
+                    if result["ok"]:
+                        break
+                    if result.get("timeout"):
+                        self.emit(task, "timeout", attempt, reason=result["error"])
+                    if i + 1 < len(jobs):
+                        reason = (result.get("error") or "failed").strip().splitlines()[-1]
+                        self.emit(task, "retry", attempt, reason=f"{reason} → {strategy(jobs[i + 1])}",
+                                  strategy=strategy(jobs[i + 1]))
+            except asyncio.CancelledError:
+                self.emit(task, "cancelled", attempt)
+                self._record(task, start, "cancelled", attempt, result)
+                raise
+            seconds = time.perf_counter() - start
+            if result["ok"]:
+                self.emit(task, "finished", attempt, seconds=seconds)
+            else:
+                self.emit(task, "failed", attempt, seconds=seconds, reason=result.get("error", ""))
+            self._record(task, start, "ok" if result["ok"] else "failed", attempt, result)
+            result["attempts"] = attempt
+            return result
+
+    def _record(self, task, start, status, attempts, result):
+        if self.report is not None:
+            self.report.add(task.stage or "command", task.name, time.perf_counter() - start, status,
+                            attempts=attempts, timeout=bool(result.get("timeout")))
+
+    async def run(self, tasks):
+        """Run ``tasks`` concurrently and return ``{name: result}``."""
+        self._slots = asyncio.Semaphore(self.concurrency)
+        running = [asyncio.create_task(self._run_task(task)) for task in tasks]
+        try:
+            results = await asyncio.gather(*running)
+        except BaseException:
+            for t in running:
+                t.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+        return {task.name: result for task, result in zip(tasks, results)}
+
+
+def run_tasks(tasks, concurrency=None, on_event=print_event, report=None):
+    """Blocking wrapper: SIGINT/SIGTERM cancel every task and kill its processes."""
+    orchestrator = Orchestrator(concurrency, on_event, report)
+
+    async def main():
+        current = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, current.cancel)
+        return await orchestrator.run(tasks)
+
+    try:
+        return asyncio.run(main())
+    except asyncio.CancelledError:
+        print("Cancelled; all subprocesses stopped.", file=sys.stderr)
+        return None
@@ -0,0 +1,35 @@
+"""Minimal RGBA PNG writer (NumPy + zlib), for images produced outside Blender."""
+
+import struct
+import zlib
+
+import numpy as np
+
+
+def _chunk(kind, data):
+    body = kind + data
+    return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+
+def encode_png(rgba, level=9):
+    """Encode an (H, W, 4) uint8 array. Every row uses the Sub filter, which
+    suits renders with flat transparent areas and smooth gradients."""
+    rgba = np.ascontiguousarray(rgba, dtype=np.uint8)
+    height, width, channels = rgba.shape
+    if channels != 4:
+        raise ValueError("expected an RGBA image")
+    sub = rgba.copy()
+    sub[:, 1:] = rgba[:, 1:] - rgba[:, :-1]
+    rows = np.concatenate([np.ones((height, 1), dtype=np.uint8), sub.reshape(height, -1)], axis=1)
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        _chunk(b"IHDR", header),
+        _chunk(b"IDAT", zlib.compress(rows.tobytes(), level)),
+        _chunk(b"IEND", b""),
+    ])
+
+
+def write_png(path, rgba, level=9):
+    with open(path, "wb") as f:
+        f.write(encode_png(rgba, level))
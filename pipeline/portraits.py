@@ -0,0 +1,128 @@
+"""Batch portrait, icon and silhouette sprites for the React shop and roster UI.
+
+Each rigged GLB is rendered on a pool of Blender workers that share one
+cached studio scene (camera rig, lights, render settings). The renders are
+then packed into one sprite atlas per variant plus a JSON index that the web
+app can read directly.
+"""
+
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+from .blender_runner import WorkerPool
+from .cache import file_digest, make_key
+from .config import CACHE_DIR, REPO_ROOT
+from .png import write_png
+from .publish import STAGING_DIR, publish
+from .report import Report
+from .rig import enemy_name
+
+STAGE = "portrait"
+WEB_PORTRAITS_DIR = REPO_ROOT / "public" / "assets" / "portraits"
+STUDIO_SCRIPT = Path(__file__).resolve().parent / "blender" / "portrait.py"
+
+
+def studio_path(samples):
+    # Any change to the studio preset (the stage script) builds a new studio.
+    key = make_key(STAGE, file_digest(STUDIO_SCRIPT), samples)
+    return CACHE_DIR / STAGE / f"studio-{key[:16]}.blend"
+
+
+def sprite_name(source):
+    return enemy_name(source).replace("_rigged", "")
+
+
+def pack_grid(sprites):
+    """Pack equally sized sprites ({name: (H, W, 4) array}) into a near-square grid.
+
+    Returns (atlas, {name: {"x", "y", "w", "h"}}).
+    """
+    names = sorted(sprites)
+    h, w = sprites[names[0]].shape[:2]
+    cols = math.ceil(math.sqrt(len(names)))
+    rows = math.ceil(len(names) / cols)
+    atlas = np.zeros((rows * h, cols * w, 4), dtype=np.uint8)
+    frames = {}
+    for i, name in enumerate(names):
+        y, x = (i // cols) * h, (i % cols) * w
+        atlas[y:y + h, x:x + w] = sprites[name]
+        frames[name] = {"x": x, "y": y, "w": w, "h": h}
+    return atlas, frames
+
+
+def build_atlases(results, out_dir):
+    """Write ``<variant>_atlas.png`` files and ``portraits.json``; returns their paths."""
+    by_variant = {}
+    for result in results:
+        for variant, path in result["sprites"].items():
+            by_variant.setdefault(variant, {})[result["name"]] = np.load(path)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index, files = {}, []
+    for variant, sprites in sorted(by_variant.items()):
+        atlas, frames = pack_grid(sprites)
+        image = out_dir / f"{variant}_atlas.png"
+        write_png(image, atlas)
+        files.append(image)
+        index[variant] = {"image": image.name, "size": [atlas.shape[1], atlas.shape[0]], "frames": frames}
+    index_path = out_dir / "portraits.json"
+    index_path.write_text(json.dumps(index, indent=2, sort_keys=True))
+    return files + [index_path]
+
+
+def render_all(sources, action=None, frame=0, samples=32, workers=None, report=None):
+    report = report or Report(STAGE)
+    studio = studio_path(samples)
+    render_dir = STAGING_DIR / STAGE / "renders"
+    jobs = [
+        (STAGE, {
+            "source": str(Path(source).resolve()),
+            "output_dir": str(render_dir),
+            "name": sprite_name(source),
+            "action": action,
+            "frame": frame,
+            "studio": str(studio),
+            "samples": samples,
+        })
+        for source in sources
+    ]
+    workers = workers or max(1, min(len(jobs), (os.cpu_count() or 2) // 2))
+    results = []
+    with WorkerPool(workers) as pool:
+        for (_, job), result in pool.map_unordered(jobs):
+            name = Path(job["source"]).name
+            if result["ok"]:
+                report.add(STAGE, name, result["seconds"], sprites=len(result["sprites"]))
+                results.append(result)
+            else:
+                report.add(STAGE, name, result.get("seconds", 0.0), "failed")
+                print(f"✗ {name}\n{result['error']}")
+    return results
+
+
+def register(subparsers):
+    p = subparsers.add_parser("portraits", help="render portrait/icon/silhouette sprite atlases")
+    p.add_argument("sources", nargs="+", type=Path, help="rigged .glb files")
+    p.add_argument("--action", help="action to pose, e.g. battle_idle (default: rest pose)")
+    p.add_argument("--frame", type=int, default=0)
+    p.add_argument("--samples", type=int, default=32, help="Cycles CPU samples")
+    p.add_argument("-j", "--workers", type=int, help="parallel Blender workers")
+    p.add_argument("--publish", action="store_true", help=f"publish atlases into {WEB_PORTRAITS_DIR}")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    results = render_all(args.sources, args.action, args.frame, args.samples, args.workers, report)
+    if results:
+        with report.timed("atlas", f"{len(results)} sprite set(s)"):
+            files = build_atlases(results, STAGING_DIR / STAGE)
+        if args.publish:
+            publish(files, WEB_PORTRAITS_DIR, report=report)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
@@ -0,0 +1,127 @@
+"""Atomic, change-aware publishing into the Godot project.
+
+Stages write their outputs to a staging directory; ``publish`` then compares
+content hashes with what is already in the project and swaps in only the
+files that changed, each with a same-directory rename. Unchanged files keep
+their bytes and mtime, so Godot sees nothing to reimport, and ``.import``
+sidecars are never written here.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from .cache import file_digest
+from .config import CACHE_DIR, ENEMIES_DIR
+from .report import Report
+
+STAGE = "publish"
+STAGING_DIR = CACHE_DIR / "staging"
+# Hashes of published files keyed by path, with the size and mtime they had,
+# so an untouched destination is not re-read on every publish.
+INDEX_PATH = CACHE_DIR / "publish" / "index.json"
+
+
+def staging_path(name):
+    STAGING_DIR.mkdir(parents=True, exist_ok=True)
+    return STAGING_DIR / name
+
+
+def load_index():
+    try:
+        return json.loads(INDEX_PATH.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def save_index(index):
+    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = INDEX_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(index, indent=2, sort_keys=True))
+    os.replace(tmp, INDEX_PATH)
+
+
+def current_digest(path, index):
+    """Digest of ``path`` (None if missing), reusing the index while stat matches."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    known = index.get(str(path))
+    if known and known["size"] == st.st_size and known["mtime_ns"] == st.st_mtime_ns:
+        return known["sha256"]
+    return file_digest(path)
+
+
+def atomic_copy(src, dst):
+    """Copy ``src`` over ``dst`` so readers only ever see the old or the new file."""
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=f".{dst.name}.", suffix=".tmp", dir=dst.parent)
+    try:
+        with os.fdopen(fd, "wb") as out, open(src, "rb") as inp:
+            shutil.copyfileobj(inp, out)
+            out.flush()
+            os.fsync(out.fileno())
+        # mkstemp creates 0600 files; keep the staged file's permissions instead.
+        shutil.copymode(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def publish(files, dest_dir=ENEMIES_DIR, report=None):
+    """Publish staged ``files`` into ``dest_dir``; returns {dest path: action}."""
+    report = report or Report(STAGE)
+    dest_dir = Path(dest_dir)
+    index = load_index()
+    actions = {}
+    for src in map(Path, files):
+        dst = dest_dir / src.name
+        with report.timed(STAGE, dst.name) as entry:
+            new = file_digest(src)
+            old = current_digest(dst, index)
+            if new == old:
+                action = "unchanged"
+            else:
+                atomic_copy(src, dst)
+                action = "added" if old is None else "updated"
+            st = dst.stat()
+            index[str(dst)] = {"sha256": new, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            entry["status"] = action
+            actions[dst] = action
+    save_index(index)
+    return actions
+
+
+def publish_with_sidecars(files, dest_dir=ENEMIES_DIR, report=None):
+    """Publish ``files`` plus any staged ``<file>.import`` seeds next to them.
+
+    Seeded sidecars (import settings the pipeline needs) only matter for the
+    first import; Godot rewrites them afterwards, so an existing one is never
+    overwritten.
+    """
+    actions = publish(files, dest_dir, report=report)
+    sidecars = [Path(f"{f}.import") for f in files if Path(f"{f}.import").is_file()]
+    new = [s for s in sidecars if not (Path(dest_dir) / s.name).exists()]
+    if new:
+        actions.update(publish(new, dest_dir, report=report))
+    return actions
+
+
+def register(subparsers):
+    p = subparsers.add_parser("publish", help="copy staged outputs into the Godot project if they changed")
+    p.add_argument("files", nargs="+", type=Path)
+    p.add_argument("--dest", type=Path, default=ENEMIES_DIR, help=f"destination (default: {ENEMIES_DIR})")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    publish(args.files, args.dest, report=report)
+    report.print_summary()
+    report.write()
+    return 0
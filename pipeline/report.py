@@ -0,0 +1,75 @@
+import json
+import os
+import platform
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from .config import REPORTS_DIR
+
+
+class Report:
+    """Timing report shared by every pipeline command.
+
+    One entry per (stage, asset) with wall time, a status string and free-form
+    metrics. Written as JSON to ``.pipeline_cache/reports/<name>-<stamp>.json``
+    and mirrored to ``<name>-latest.json``.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.started = datetime.now(timezone.utc)
+        self.entries = []
+
+    def add(self, stage, asset, seconds, status="ok", **metrics):
+        entry = {
+            "stage": stage,
+            "asset": str(asset),
+            "seconds": round(seconds, 4),
+            "status": status,
+            "metrics": metrics,
+        }
+        self.entries.append(entry)
+        return entry
+
+    @contextmanager
+    def timed(self, stage, asset, **metrics):
+        """Time a block; the yielded dict can be filled with extra metrics or a status."""
+        result = {"status": "ok", **metrics}
+        start = time.perf_counter()
+        try:
+            yield result
+        except BaseException:
+            result["status"] = "failed"
+            raise
+        finally:
+            status = result.pop("status")
+            self.add(stage, asset, time.perf_counter() - start, status, **result)
+
+    @property
+    def failed(self):
+        return [e for e in self.entries if e["status"] == "failed"]
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "started": self.started.isoformat(),
+            "host": {"platform": platform.platform(), "cpus": os.cpu_count()},
+            "total_seconds": round(sum(e["seconds"] for e in self.entries), 4),
+            "entries": self.entries,
+        }
+
+    def write(self):
+        REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+        stamp = self.started.strftime("%Y%m%dT%H%M%SZ")
+        data = json.dumps(self.to_dict(), indent=2)
+        path = REPORTS_DIR / f"{self.name}-{stamp}.json"
+        path.write_text(data)
+        (REPORTS_DIR / f"{self.name}-latest.json").write_text(data)
+        return path
+
+    def print_summary(self):
+        for e in self.entries:
+            mark = "✗" if e["status"] == "failed" else "✓"
+            print(f"{mark} {e['stage']:<16} {e['asset']:<48} {e['seconds']:>8.3f}s  {e['status']}")
+        print(f"Total: {sum(e['seconds'] for e in self.entries):.3f}s")
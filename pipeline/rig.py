@@ -0,0 +1,164 @@
+import re
+from pathlib import Path
+
+import numpy as np
+
+from . import analysis, diffusion, shm, skeleton
+from .cleanup import cleanup as clean_mesh
+from .blender_runner import run_stage
+from .config import ASSETS_DIR
+from .errors import PipelineError
+from .publish import publish, staging_path
+from .report import Report
+
+STAGE = "rig"
+# Weighting strategies, from best to most robust. Bone heat ("auto") can
+# hang or leave vertices unweighted; the last one cannot fail.
+WEIGHT_FALLBACKS = ("auto", "vectorized", "root")
+# "diffusion" is solved outside Blender (it needs SciPy) and handed to the
+# rig stage as precomputed vectorized weights.
+WEIGHT_MODES = WEIGHT_FALLBACKS + ("diffusion",)
+# Meshy-style generations: <Name>_<generation id>_texture.glb
+GENERATED_NAME_RE = re.compile(r"^(?P<name>.+?)(?:_\d+)?_texture$")
+
+
+def enemy_name(source):
+    stem = Path(source).stem
+    m = GENERATED_NAME_RE.match(stem)
+    return m.group("name") if m else stem
+
+
+def default_output(source):
+    return ASSETS_DIR / f"{enemy_name(source)}_rigged.glb"
+
+
+def make_job(source, output=None, weights="auto", join_meshes=False, weld=False, images="passthrough"):
+    source = Path(source).resolve()
+    return {
+        "source": str(source),
+        "output": str(Path(output or default_output(source)).resolve()),
+        "armature": f"{enemy_name(source)}_Armature",
+        "weights": weights,
+        "join_meshes": join_meshes,
+        "weld": weld,
+        "images": images,
+    }
+
+
+def fallback_jobs(job):
+    """``job`` followed by copies using each more robust weighting strategy."""
+    chain = WEIGHT_FALLBACKS[WEIGHT_FALLBACKS.index(job["weights"]):]
+    return [{**job, "weights": mode} for mode in chain]
+
+
+def check_weights(result):
+    unweighted = sum(result["unweighted_vertices"].values())
+    if unweighted:
+        return f"{unweighted} unweighted vertices with weights={result['weights']}"
+    return None
+
+
+def solve_weights_outside(source, workers, report, weld=False, diffuse=False, smooth_passes=0):
+    """Weights solved outside Blender; returns a shm manifest of indices/weights to release.
+
+    Blender only publishes the arrays. The vectorized solve runs in a pool of
+    ``workers`` processes; ``diffuse`` runs the Laplacian solve of
+    ``pipeline.diffusion`` here instead. ``humanoid_bones`` places the bones
+    from the bounds' minimum z, so the ungrounded positions give the same
+    layout as the rig stage's grounded model, offset with it.
+    """
+    wanted = ["positions", "triangles"] if diffuse else ["positions"]
+    with report.timed("arrays", source.name) as entry:
+        shared = run_stage("arrays", {"source": str(source), "arrays": wanted, "weld": weld})
+        if not shared["ok"]:
+            entry["status"] = "failed"
+            raise PipelineError(f"arrays stage failed:\n{shared['error']}")
+    manifest = shared["manifest"]
+    try:
+        with report.timed("diffuse_weights" if diffuse else "solve_weights", source.name) as entry:
+            with shm.attach(manifest) as arrays:
+                positions = arrays["positions"]
+                lo, hi = positions.min(axis=0), positions.max(axis=0)
+                _, _, heads, tails = skeleton.humanoid_bones(lo, hi)
+                if diffuse:
+                    indices, vertex_weights = diffusion.diffused_weights(
+                        positions, arrays["triangles"], heads, tails, smooth_passes)
+            if diffuse:
+                solved = shm.share({"indices": indices.astype(np.int32), "weights": vertex_weights.astype(np.float32)})
+                entry.update(vertices=int(shared["offsets"][-1]), smooth_passes=smooth_passes)
+            else:
+                solved = analysis.solve_weights(manifest, heads, tails, workers)
+                entry.update(vertices=int(shared["offsets"][-1]), workers=workers)
+    finally:
+        shm.release(manifest)
+    return solved
+
+
+def rig(source, output=None, weights="auto", join_meshes=False, analysis_workers=None, weld=False,
+        cleanup=False, smooth_passes=0, images="passthrough", report=None):
+    report = report or Report(STAGE)
+    source = Path(source).resolve()
+    if cleanup:
+        # The cleaned copy keeps the file name, so names and outputs are unchanged.
+        cleaned = clean_mesh(source, report=report)
+        if not cleaned["ok"]:
+            return cleaned
+        source = Path(cleaned["output"])
+    diffuse = weights == "diffusion"
+    if diffuse and join_meshes:
+        raise PipelineError("--weights diffusion solves the meshes jointly already; drop --join-meshes")
+    job = make_job(source, output, "vectorized" if diffuse else weights, join_meshes, weld, images)
+    solved = None
+    if diffuse or (weights == "vectorized" and analysis_workers and not join_meshes):
+        solved = job["weights_shm"] = solve_weights_outside(source, analysis_workers, report, weld, diffuse,
+                                                            smooth_passes)
+    try:
+        with report.timed(STAGE, source.name) as entry:
+            result = run_stage(STAGE, job)
+            if not result["ok"]:
+                entry["status"] = "failed"
+                print(result["error"])
+            else:
+                entry.update(meshes=len(result["meshes"]), vertices=result["vertices"],
+                             unweighted=sum(result["unweighted_vertices"].values()))
+                if result["weld"]:
+                    entry.update(welded_from=result["weld"]["vertices_before"])
+    finally:
+        if solved:
+            shm.release(solved)
+    return result
+
+
+def register(subparsers):
+    p = subparsers.add_parser("rig", help="rig every mesh of a generated model onto one humanoid armature")
+    p.add_argument("source", type=Path, help="generated .glb/.gltf/.fbx")
+    p.add_argument("-o", "--output", type=Path, help="rigged .glb (default: assets/<Name>_rigged.glb)")
+    p.add_argument("--weights", choices=WEIGHT_MODES, default="auto")
+    p.add_argument("--join-meshes", action="store_true", help="merge all meshes into one skinned mesh")
+    p.add_argument("--weld", action="store_true", help="weld duplicated seam vertices before weighting")
+    p.add_argument("--cleanup", action="store_true",
+                   help="remove degenerate, loose and non-manifold geometry first (cached)")
+    p.add_argument("--analysis-workers", type=int,
+                   help="with --weights vectorized: solve in this many processes over shared memory")
+    p.add_argument("--smooth-passes", type=int, default=0,
+                   help="with --weights diffusion: implicit smoothing passes after the heat solve")
+    p.add_argument("--images", choices=("passthrough", "external", "reencode"), default="passthrough",
+                   help="copy the source's compressed textures unchanged (default), reference them as shared "
+                        "files next to the output, or let the exporter re-encode them")
+    p.add_argument("--publish", action="store_true",
+                   help="export to the staging area and publish into battle-manager/enemies if changed")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    output = args.output
+    if args.publish:
+        output = staging_path((output or default_output(args.source)).name)
+    result = rig(args.source, output, args.weights, args.join_meshes, args.analysis_workers, args.weld,
+                 args.cleanup, args.smooth_passes, args.images, report=report)
+    if args.publish and result["ok"]:
+        publish([output, *result["images"]], report=report)
+    report.print_summary()
+    report.write()
+    return 0 if result["ok"] else 1
@@ -0,0 +1,120 @@
+"""Root-motion extraction on plain NumPy arrays (quaternions are (w, x, y, z)).
+
+A clip "moves" when its top bone travels over the ground or turns about the
+up axis. ``extract`` splits that out of the bone's pose channels for every
+frame of every clip at once: the ground-plane translation and the yaw
+become the root motion; what remains (height, sway, lean) stays on the bone,
+so the body animates in place.
+
+Frames of several clips are stacked into one array with a ``clips`` label
+per frame; motion is measured from each clip's first frame.
+"""
+
+import numpy as np
+
+
+def quat_multiply(a, b):
+    aw, ax, ay, az = np.moveaxis(np.asarray(a, dtype=np.float64), -1, 0)
+    bw, bx, by, bz = np.moveaxis(np.asarray(b, dtype=np.float64), -1, 0)
+    return np.stack([
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ], axis=-1)
+
+
+def quat_conjugate(q):
+    return np.asarray(q, dtype=np.float64) * np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def axis_angle_quat(axis, angles):
+    axis = np.asarray(axis, dtype=np.float64) / np.linalg.norm(axis)
+    half = 0.5 * np.asarray(angles, dtype=np.float64)
+    return np.concatenate([np.cos(half)[..., None], np.sin(half)[..., None] * axis], axis=-1)
+
+
+def twist_angle(q, axis):
+    """Rotation of each quaternion about ``axis`` (swing-twist), in radians."""
+    q = np.asarray(q, dtype=np.float64)
+    return 2.0 * np.arctan2(q[..., 1:] @ np.asarray(axis, dtype=np.float64), q[..., 0])
+
+
+def matrix_quat(m):
+    """Quaternion of a 3x3 rotation matrix."""
+    m = np.asarray(m, dtype=np.float64)
+    trace = np.trace(m)
+    if trace > 0:
+        s = 2.0 * np.sqrt(1.0 + trace)
+        q = [0.25 * s, (m[2, 1] - m[1, 2]) / s, (m[0, 2] - m[2, 0]) / s, (m[1, 0] - m[0, 1]) / s]
+    else:
+        i = int(np.argmax(np.diag(m)))
+        j, k = (i + 1) % 3, (i + 2) % 3
+        s = 2.0 * np.sqrt(1.0 + m[i, i] - m[j, j] - m[k, k])
+        q = np.empty(4)
+        q[0] = (m[k, j] - m[j, k]) / s
+        q[1 + i] = 0.25 * s
+        q[1 + j] = (m[j, i] + m[i, j]) / s
+        q[1 + k] = (m[k, i] + m[i, k]) / s
+    q = np.asarray(q, dtype=np.float64)
+    return q / np.linalg.norm(q)
+
+
+def first_frames(clips):
+    """Index of the first frame of each frame's clip."""
+    clips = np.asarray(clips)
+    _, first, inverse = np.unique(clips, return_index=True, return_inverse=True)
+    return first[inverse.ravel()]
+
+
+def extract(locations, rotations, clips, rest_head, rest_matrix, up):
+    """Split a bone's pose channels into in-place channels and root motion.
+
+    ``locations`` (F, 3) and ``rotations`` (F, 4) are the bone's pose
+    (relative to its rest pose, as Blender stores them); ``rest_head`` and
+    the 3x3 ``rest_matrix`` place the rest bone in armature space, and
+    ``up`` is the armature-space up axis. The bone must have no parent.
+
+    Returns a dict of (F, ...) arrays: ``locations`` and ``rotations`` for
+    the in-place bone, ``translation`` (armature-space ground offset from the
+    clip's first frame) and ``yaw`` (radians about ``up``, unwrapped).
+    """
+    up = np.asarray(up, dtype=np.float64)
+    up = up / np.linalg.norm(up)
+    rest = np.asarray(rest_matrix, dtype=np.float64)
+    rest = rest / np.linalg.norm(rest, axis=0)
+    first = first_frames(clips)
+
+    positions = np.asarray(rest_head, dtype=np.float64) + np.asarray(locations, dtype=np.float64) @ rest.T
+    ground = positions - np.outer(positions @ up, up)
+    translation = ground - ground[first]
+
+    rest_quat = matrix_quat(rest)
+    armature_rot = quat_multiply(rest_quat, rotations)
+    yaw = np.unwrap(twist_angle(armature_rot, up))
+    yaw = yaw - yaw[first]
+
+    in_place_rot = quat_multiply(quat_conjugate(axis_angle_quat(up, yaw)), armature_rot)
+    return {
+        "locations": np.asarray(locations, dtype=np.float64) - translation @ rest,
+        "rotations": quat_multiply(quat_conjugate(rest_quat), in_place_rot),
+        "translation": translation,
+        "yaw": yaw,
+    }
+
+
+def summarize(times, translation, yaw, loop_tolerance=0.01):
+    """Metadata of one clip's root motion: totals, speed and whether it returns to its start."""
+    times = np.asarray(times, dtype=np.float64)
+    steps = np.linalg.norm(np.diff(translation, axis=0), axis=1)
+    duration = float(times[-1] - times[0]) if len(times) > 1 else 0.0
+    distance = float(steps.sum())
+    return {
+        "duration": duration,
+        "displacement": translation[-1].tolist(),
+        "distance": distance,
+        "yaw_degrees": float(np.degrees(yaw[-1])),
+        "speed": distance / duration if duration else 0.0,
+        "returns_to_start": bool(np.linalg.norm(translation[-1]) <= loop_tolerance * max(distance, 1e-9)
+                                 and abs(yaw[-1]) < 1e-3),
+    }
@@ -0,0 +1,143 @@
+extends SceneTree
+## Runtime benchmark driven by ``python3 -m pipeline bench-runtime``.
+##
+## godot --headless --fixed-fps 60 --script runtime_bench.gd -- \
+##     --scene res://battle-manager/enemies/ogrork_enemy.tscn --copies 8 --frames 240 --output /tmp/out.json
+##
+## Loads the scene once (bypassing the resource cache), instantiates the
+## copies, then runs one phase of ``frames`` frames per clip with every
+## AnimationPlayer playing it, and a last phase with the AnimationTrees
+## active. Writes one JSON object to ``--output``.
+
+var scene_path := ""
+var copies := 8
+var frames := 240
+var output := ""
+
+var result := {"clips": {}}
+var players := []
+var trees := []
+var phases := []
+var phase := -1
+var frame := 0
+var last_usec := 0
+var process_samples := PackedFloat64Array()
+var frame_samples := PackedFloat64Array()
+
+
+func _initialize():
+	var args := OS.get_cmdline_user_args()
+	for i in range(0, args.size() - 1, 2):
+		match args[i]:
+			"--scene": scene_path = args[i + 1]
+			"--copies": copies = int(args[i + 1])
+			"--frames": frames = int(args[i + 1])
+			"--output": output = args[i + 1]
+
+	var memory_before := OS.get_static_memory_usage()
+	var nodes_before := int(Performance.get_monitor(Performance.OBJECT_NODE_COUNT))
+	var start := Time.get_ticks_usec()
+	var packed := ResourceLoader.load(scene_path, "PackedScene", ResourceLoader.CACHE_MODE_IGNORE) as PackedScene
+	result["load_seconds"] = (Time.get_ticks_usec() - start) / 1e6
+	if packed == null:
+		result["error"] = "cannot load %s as a scene (run godot-import first?)" % scene_path
+		_finish()
+		quit(1)
+		return
+	result["load_memory_bytes"] = OS.get_static_memory_usage() - memory_before
+
+	start = Time.get_ticks_usec()
+	for i in copies:
+		var instance := packed.instantiate()
+		root.add_child(instance)
+		_collect(instance)
+	result["instantiate_seconds"] = (Time.get_ticks_usec() - start) / 1e6
+	result["memory_bytes"] = OS.get_static_memory_usage() - memory_before
+	result["nodes"] = int(Performance.get_monitor(Performance.OBJECT_NODE_COUNT)) - nodes_before
+	result["copies"] = copies
+	result["players"] = players.size()
+	result["trees"] = trees.size()
+
+	phases.append("")  # no animation: the baseline cost of the copies
+	if players:
+		for clip in players[0].get_animation_list():
+			phases.append(clip)
+	if trees:
+		phases.append("AnimationTree")
+
+
+func _collect(node: Node):
+	if node is AnimationPlayer:
+		players.append(node)
+	elif node is AnimationTree:
+		trees.append(node)
+	for child in node.get_children():
+		_collect(child)
+
+
+func _start(name: String):
+	for tree in trees:
+		tree.active = name == "AnimationTree"
+	for player in players:
+		player.stop()
+		if name != "" and player.has_animation(name):
+			# Keep one-shot clips (attack) playing for the whole phase.
+			player.get_animation(name).loop_mode = Animation.LOOP_LINEAR
+			player.play(name)
+
+
+func _percentile(samples: PackedFloat64Array, q: float) -> float:
+	if samples.is_empty():
+		return 0.0
+	var sorted := samples.duplicate()
+	sorted.sort()
+	return sorted[mini(sorted.size() - 1, int(q * sorted.size()))]
+
+
+func _mean(samples: PackedFloat64Array) -> float:
+	var total := 0.0
+	for s in samples:
+		total += s
+	return total / maxi(1, samples.size())
+
+
+func _record():
+	var frame_seconds := 0.0
+	for s in frame_samples:
+		frame_seconds += s
+	result["clips"][phases[phase] if phases[phase] != "" else "(none)"] = {
+		"frames": frame_samples.size(),
+		"seconds": frame_seconds,
+		"process_ms_mean": _mean(process_samples) * 1000.0,
+		"process_ms_p95": _percentile(process_samples, 0.95) * 1000.0,
+		"frame_ms_mean": _mean(frame_samples) * 1000.0,
+		"frame_ms_p95": _percentile(frame_samples, 0.95) * 1000.0,
+	}
+
+
+func _process(_delta):
+	var now := Time.get_ticks_usec()
+	if phase >= 0 and frame > 0:
+		# TIME_PROCESS is the process time of the previous frame of this phase.
+		process_samples.append(Performance.get_monitor(Performance.TIME_PROCESS))
+		frame_samples.append((now - last_usec) / 1e6)
+	last_usec = now
+	if phase < 0 or frame > frames:
+		if phase >= 0:
+			_record()
+		phase += 1
+		if phase >= phases.size():
+			_finish()
+			return true
+		_start(phases[phase])
+		frame = 0
+		process_samples.clear()
+		frame_samples.clear()
+	frame += 1
+	return false
+
+
+func _finish():
+	var file := FileAccess.open(output, FileAccess.WRITE)
+	file.store_string(JSON.stringify(result, "  "))
+	file.close()
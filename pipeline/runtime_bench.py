@@ -0,0 +1,148 @@
+"""Measure what an enemy costs at runtime in headless Godot.
+
+    python3 -m pipeline bench-runtime
+    python3 -m pipeline bench-runtime godot_fighter/battle-manager/enemies/ogrork_enemy.tscn --copies 16
+
+Each scene (default: every ``.tscn`` in the enemies directory) runs in its
+own headless Godot process with ``runtime_bench.gd``: it is loaded once,
+instantiated ``--copies`` times, and every clip is played on all copies
+for ``--frames`` frames, followed by a phase with the AnimationTrees
+active. Frames run at a fixed 60 fps delta as fast as the CPU allows.
+
+Results go into the usual timing report (``runtime_bench-latest.json``):
+
+* ``load``         load time of the scene and its imported resources
+* ``instantiate``  time to instantiate and add all copies; memory and nodes
+* ``animate``      one entry per clip, ``<scene>:<clip>``, with mean and
+                   p95 process and frame times; ``(none)`` is the baseline
+                   without animation
+
+Headless Godot uses the dummy renderer, so GPU skinning is not measured;
+the animation entries cover the animation and skeleton updates on the CPU.
+Entries are compared with the previous report, and ``--max-regression``
+turns a slowdown into a failure.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from . import godot_import
+from .config import ENEMIES_DIR, REPORTS_DIR, res_path
+from .errors import PipelineError
+from .godot import require_godot, run_headless
+from .report import Report
+
+STAGE = "runtime_bench"
+SCRIPT = Path(__file__).with_name("runtime_bench.gd")
+SCENE_SUFFIXES = {".tscn", ".scn", ".glb", ".gltf"}
+SCENE_TIMEOUT = 10 * 60
+# Metric compared against the previous report, per stage.
+COMPARED = {"load": None, "instantiate": None, "animate": "process_ms_mean"}
+
+
+def discover(paths):
+    found = []
+    for path in map(Path, paths):
+        candidates = [path] if path.is_file() else sorted(path.glob("*.tscn"))
+        found += [p.resolve() for p in candidates if p.suffix.lower() in SCENE_SUFFIXES]
+    return found
+
+
+def bench_scene(godot, scene, copies, frames):
+    """Run ``runtime_bench.gd`` on one scene; returns its JSON result."""
+    with tempfile.TemporaryDirectory(prefix="runtime-bench-") as tmp:
+        output = Path(tmp) / "result.json"
+        result = run_headless(godot, "--fixed-fps", "60", "--script", str(SCRIPT), "--",
+                              "--scene", res_path(scene), "--copies", str(copies), "--frames", str(frames),
+                              "--output", str(output), timeout=SCENE_TIMEOUT)
+        if not output.is_file():
+            raise RuntimeError(f"benchmark of {scene.name} wrote no result:\n{result.stderr[-2000:]}")
+        data = json.loads(output.read_text())
+    if "error" in data:
+        raise RuntimeError(data["error"])
+    return data
+
+
+def record(report, scene, data):
+    name = scene.name
+    report.add("load", name, data["load_seconds"], memory_bytes=data["load_memory_bytes"])
+    report.add("instantiate", name, data["instantiate_seconds"], copies=data["copies"],
+               memory_bytes=data["memory_bytes"], nodes=data["nodes"], players=data["players"],
+               trees=data["trees"])
+    for clip, stats in data["clips"].items():
+        report.add("animate", f"{name}:{clip}", stats["seconds"], copies=data["copies"],
+                   **{k: round(v, 4) if isinstance(v, float) else v for k, v in stats.items() if k != "seconds"})
+
+
+def load_previous():
+    try:
+        return json.loads((REPORTS_DIR / f"{STAGE}-latest.json").read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def regressions(previous, report):
+    """[(stage, asset, before, after)] of entries compared with the previous report."""
+    before = {(e["stage"], e["asset"]): e for e in previous.get("entries", []) if e["status"] == "ok"}
+    changes = []
+    for entry in report.entries:
+        old = before.get((entry["stage"], entry["asset"]))
+        if entry["status"] != "ok" or old is None or entry["stage"] not in COMPARED:
+            continue
+        metric = COMPARED[entry["stage"]]
+        values = [e["metrics"].get(metric) if metric else e["seconds"] for e in (old, entry)]
+        if None not in values and values[0] > 0:
+            changes.append((entry["stage"], entry["asset"], *values))
+    return changes
+
+
+def print_changes(changes):
+    for stage, asset, old, new in changes:
+        print(f"  {stage:<12} {asset:<48} {old:>9.3f} -> {new:>9.3f}  {(new / old - 1) * 100:+6.1f}%")
+
+
+def run(scenes=None, copies=8, frames=240, import_first=True, report=None):
+    report = report or Report(STAGE)
+    godot = require_godot()
+    scenes = discover(scenes or [ENEMIES_DIR])
+    if not scenes:
+        raise PipelineError("no scenes to benchmark")
+    if import_first:
+        # Unimported .glb files do not load in an exported-style headless run.
+        godot_import.run(report=report)
+    # One scene at a time: parallel processes would measure each other.
+    for scene in scenes:
+        try:
+            record(report, scene, bench_scene(godot, scene, copies, frames))
+        except Exception as exc:  # noqa: BLE001 - one broken scene must not stop the others
+            report.add("load", scene.name, 0.0, "failed", error=str(exc)[-500:])
+            print(f"✗ {scene.name}\n{exc}")
+    return report
+
+
+def register(subparsers):
+    p = subparsers.add_parser("bench-runtime", help="measure load, animation and memory cost in headless Godot")
+    p.add_argument("scenes", nargs="*", type=Path, help=f"scenes or directories (default: {ENEMIES_DIR})")
+    p.add_argument("--copies", type=int, default=8, help="instances of each scene")
+    p.add_argument("--frames", type=int, default=240, help="frames per clip")
+    p.add_argument("--no-import", action="store_true", help="skip godot-import of the enemies first")
+    p.add_argument("--max-regression", type=float, metavar="PERCENT",
+                   help="fail when an entry is slower than in the previous report by more than this")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    previous = load_previous()
+    report = run(args.scenes, args.copies, args.frames, not args.no_import)
+    report.print_summary()
+    changes = regressions(previous, report) if previous else []
+    if changes:
+        print("Against the previous run:")
+        print_changes(changes)
+    report.write()
+    slower = [c for c in changes if args.max_regression is not None and c[3] > c[2] * (1 + args.max_regression / 100)]
+    if slower:
+        print(f"{len(slower)} entr{'y' if len(slower) == 1 else 'ies'} regressed by more than "
+              f"{args.max_regression:g}%")
+    return 1 if report.failed or slower else 0
@@ -0,0 +1,86 @@
+"""Named shared-memory NumPy arrays for passing meshes between processes.
+
+A *manifest* maps array names to ``{"block", "shape", "dtype"}``. It is
+plain JSON, so it can travel in a Blender job or result, or as an argument
+to a pool task, while the data itself is never copied or pickled.
+
+Blocks outlive the process that created them, so a one-shot Blender stage
+can publish arrays and exit. Whoever ends up holding the manifest frees
+the blocks with ``release``. Python's resource tracker is told to forget
+every block; otherwise it would unlink them when the creating process exits.
+"""
+
+import uuid
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+PREFIX = "rtb"
+
+
+def _untrack(block):
+    try:
+        resource_tracker.unregister(block._name, "shared_memory")
+    except Exception:
+        pass
+
+
+def _create(shape, dtype, prefix):
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    block = shared_memory.SharedMemory(create=True, size=max(1, nbytes), name=f"{prefix}_{uuid.uuid4().hex[:16]}")
+    _untrack(block)
+    entry = {"block": block.name, "shape": [int(n) for n in shape], "dtype": np.dtype(dtype).str}
+    return block, entry
+
+
+def share(arrays, prefix=PREFIX):
+    """Copy ``{name: array}`` into new blocks and return their manifest."""
+    manifest = {}
+    for name, array in arrays.items():
+        array = np.asarray(array)
+        block, manifest[name] = _create(array.shape, array.dtype, prefix)
+        np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+        block.close()
+    return manifest
+
+
+def allocate(spec, prefix=PREFIX):
+    """New zeroed blocks for ``{name: (shape, dtype)}``, e.g. analysis outputs."""
+    manifest = {}
+    for name, (shape, dtype) in spec.items():
+        block, manifest[name] = _create(shape, dtype, prefix)
+        block.close()
+    return manifest
+
+
+@contextmanager
+def attach(manifest):
+    """Zero-copy ``{name: ndarray}`` views of the blocks in ``manifest``.
+
+    The views are only valid inside the ``with`` block; copy anything that
+    has to outlive it.
+    """
+    blocks, views = [], {}
+    try:
+        for name, entry in manifest.items():
+            block = shared_memory.SharedMemory(name=entry["block"])
+            _untrack(block)
+            blocks.append(block)
+            views[name] = np.ndarray(entry["shape"], np.dtype(entry["dtype"]), buffer=block.buf)
+        yield views
+    finally:
+        views.clear()
+        for block in blocks:
+            block.close()
+
+
+def release(manifest):
+    """Unlink every block of ``manifest``; missing blocks are ignored."""
+    for entry in manifest.values():
+        try:
+            block = shared_memory.SharedMemory(name=entry["block"])
+        except FileNotFoundError:
+            continue
+        block.close()
+        block.unlink()  # Also balances the tracker registration made on open.
@@ -0,0 +1,57 @@
+"""Humanoid bone layout shared by the rig, analysis and proxy stages.
+
+Positions are fractions of the character's bounds (x: width, y: depth,
+z: height from the feet) around its centre, matching the layout of
+``create_proper_ogrork_rig.py`` — the one rig whose legs point down.
+"""
+
+import numpy as np
+
+# (name, parent, head, tail) for the spine and left limbs.
+SPINE = [
+    ("Root", None, (0, 0, 0.00), (0, 0, 0.15)),
+    ("Spine1", "Root", (0, 0, 0.15), (0, 0, 0.35)),
+    ("Spine2", "Spine1", (0, 0, 0.35), (0, 0, 0.50)),
+    ("Spine3", "Spine2", (0, 0, 0.50), (0, 0, 0.65)),
+    ("Neck", "Spine3", (0, 0, 0.65), (0, 0, 0.75)),
+    ("Head", "Neck", (0, 0, 0.75), (0, 0, 1.00)),
+]
+LEFT_LIMBS = [
+    ("LeftUpLeg", "Root", (0.15, 0.00, 0.45), (0.15, -0.05, 0.25)),
+    ("LeftLeg", "LeftUpLeg", (0.15, -0.05, 0.25), (0.15, -0.08, 0.05)),
+    ("LeftFoot", "LeftLeg", (0.15, -0.08, 0.05), (0.15, 0.15, 0.00)),
+    ("LeftShoulder", "Spine3", (0.15, 0.00, 0.60), (0.28, 0.00, 0.58)),
+    ("LeftArm", "LeftShoulder", (0.28, 0.00, 0.58), (0.40, 0.00, 0.45)),
+    ("LeftForeArm", "LeftArm", (0.40, 0.00, 0.45), (0.48, 0.00, 0.35)),
+    ("LeftHand", "LeftForeArm", (0.48, 0.00, 0.35), (0.50, 0.00, 0.32)),
+]
+
+
+def _mirror(name):
+    return name.replace("Left", "Right") if name else name
+
+
+def humanoid_layout():
+    """Bone table with the right side mirrored from the left."""
+    right = [
+        (_mirror(n), _mirror(p), (-h[0], h[1], h[2]), (-t[0], t[1], t[2]))
+        for n, p, h, t in LEFT_LIMBS
+    ]
+    return SPINE + LEFT_LIMBS + right
+
+
+def humanoid_bones(bounds_min, bounds_max):
+    """Place the humanoid layout inside world-space bounds.
+
+    Returns (names, parents, heads, tails) with heads/tails as (B, 3) arrays.
+    """
+    lo = np.asarray(bounds_min, dtype=np.float64)
+    hi = np.asarray(bounds_max, dtype=np.float64)
+    size = hi - lo
+    origin = np.array([(lo[0] + hi[0]) / 2, (lo[1] + hi[1]) / 2, lo[2]])
+    layout = humanoid_layout()
+    names = [b[0] for b in layout]
+    parents = [b[1] for b in layout]
+    heads = origin + np.array([b[2] for b in layout]) * size
+    tails = origin + np.array([b[3] for b in layout]) * size
+    return names, parents, heads, tails
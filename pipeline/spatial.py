@@ -0,0 +1,307 @@
+"""Uniform-grid spatial index over a mesh's vertices, for batched neighbour queries.
+
+Answers which points are near this point, or near this bone segment, for
+a whole array of queries. ``SpatialGrid`` buckets the points once into a
+sparse grid (points sorted by cell, plus the start of every occupied cell)
+and answers the queries with NumPy:
+
+* ``radius``    every point within ``r`` of each query (CSR result);
+* ``knn``       the ``k`` nearest points of each query;
+* ``near_segments``  every point within ``r`` of each segment (bones).
+
+``index_for`` keeps the grids of the last few point arrays in this process
+and stores them in the ``spatial`` stage cache keyed by the array bytes.
+Welding (``pipeline.weld.weld_map``) is its only user so far. The bone
+weights (``pipeline.weights``, ``pipeline.diffusion``) need the distance
+from every vertex to every bone, a dense (V, ~20) array that a grid cannot
+shorten, so they stay brute force.
+"""
+
+import hashlib
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .cache import StageCache, make_key
+from .weights import point_segment_distance
+
+STAGE = "spatial"
+INDEX_VERSION = 1
+# Average points per occupied cell the default cell size aims for.
+POINTS_PER_CELL = 4
+# Candidate (query, point) pairs per vectorized block, to bound memory.
+CANDIDATE_BUDGET = 1 << 22
+CACHED_GRIDS = 4
+
+
+def points_digest(points):
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    h = hashlib.sha1(str(points.shape).encode())
+    h.update(points.data)
+    return h.hexdigest()
+
+
+def default_cell(points):
+    """Cell edge for about ``POINTS_PER_CELL`` points in the cell of a typical point.
+
+    Starts from the bounding volume and shrinks while the points crowd into
+    few cells, as they do on a surface mesh or around a dense core.
+    """
+    if not len(points):
+        return 1.0
+    extent = np.ptp(points, axis=0)
+    largest = float(extent.max()) or 1.0
+    # Flat or thin meshes: a zero extent would make the volume estimate collapse.
+    extent = np.maximum(extent, largest * 1e-3)
+    cell = max(float(np.cbrt(np.prod(extent) * POINTS_PER_CELL / len(points))), largest * 1e-4)
+    for _ in range(4):
+        coords = np.floor((points - points.min(axis=0)) / cell).astype(np.int64)
+        _, counts = np.unique(coords @ np.array([1 << 42, 1 << 21, 1], dtype=np.int64), return_counts=True)
+        crowding = float((counts.astype(np.float64) ** 2).sum() / len(points))
+        if crowding <= 2 * POINTS_PER_CELL or cell <= largest * 1e-4:
+            break
+        # Surface points fill cells by area: the count falls with the square of the edge.
+        cell = max(cell * np.sqrt(POINTS_PER_CELL / crowding), largest * 1e-4)
+    return cell
+
+
+def _expand(starts, stops):
+    """(row per item, flat positions) enumerating ``range(starts[i], stops[i])`` for every row."""
+    counts = np.maximum(stops - starts, 0)
+    rows = np.repeat(np.arange(len(starts)), counts)
+    offsets = np.cumsum(counts) - counts
+    return rows, np.arange(counts.sum()) - np.repeat(offsets, counts) + np.repeat(starts, counts)
+
+
+def _csr(rows, count, *columns):
+    """Sort items by row and return (offsets (count + 1), columns...)."""
+    order = np.argsort(rows, kind="stable")
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=count), out=offsets[1:])
+    return (offsets, *(c[order] for c in columns))
+
+
+def _top_k(rows, index, d, count, k):
+    """(distances (count, k), indices (count, k)): the ``k`` smallest ``d`` of each row, nearest first.
+
+    ``rows`` must be sorted; the candidates are laid out one row per query
+    so a single ``argpartition`` selects every row's nearest.
+    """
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=count), out=offsets[1:])
+    width = max(k, int(np.diff(offsets).max()) if count else 0)
+    column = np.arange(len(rows)) - offsets[rows]
+    dense = np.full((count, width), np.inf)
+    dense[rows, column] = d
+    slots = np.full((count, width), -1, dtype=np.int64)
+    slots[rows, column] = index
+    nearest = np.argpartition(dense, k - 1, axis=1)[:, :k]
+    near_d = np.take_along_axis(dense, nearest, axis=1)
+    order = np.argsort(near_d, axis=1, kind="stable")
+    nearest = np.take_along_axis(nearest, order, axis=1)
+    return np.take_along_axis(dense, nearest, axis=1), np.take_along_axis(slots, nearest, axis=1)
+
+
+class SpatialGrid:
+    """Points bucketed into cubic cells of edge ``cell``; only occupied cells are stored."""
+
+    def __init__(self, points, cell=None):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.cell = float(cell or default_cell(self.points))
+        self.origin = self.points.min(axis=0) if len(self.points) else np.zeros(3)
+        coords = self.cell_coords(self.points)
+        self.dims = coords.max(axis=0) + 1 if len(coords) else np.ones(3, dtype=np.int64)
+        keys = self.cell_keys(coords)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys, starts = np.unique(keys[self.order], return_index=True)
+        self.starts = np.append(starts, len(keys)).astype(np.int64)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        grid = cls.__new__(cls)
+        grid.points = arrays["points"]
+        grid.cell = float(arrays["cell"])
+        for name in ("origin", "dims", "order", "keys", "starts"):
+            setattr(grid, name, arrays[name])
+        return grid
+
+    def arrays(self):
+        return {"points": self.points, "cell": np.float64(self.cell), "origin": self.origin, "dims": self.dims,
+                "order": self.order, "keys": self.keys, "starts": self.starts}
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, **self.arrays())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls.from_arrays({name: data[name] for name in data.files})
+
+    def cell_coords(self, points):
+        return np.floor((np.asarray(points, dtype=np.float64) - self.origin) / self.cell).astype(np.int64)
+
+    def cell_keys(self, coords):
+        """Packed key per cell; coordinates outside the grid get -1."""
+        inside = np.all((coords >= 0) & (coords < self.dims), axis=-1)
+        keys = (coords[..., 0] * self.dims[1] + coords[..., 1]) * self.dims[2] + coords[..., 2]
+        return np.where(inside, keys, -1)
+
+    def _cell_ranges(self, keys):
+        """(start, stop) into ``order`` of the points in each cell key; empty for missing cells."""
+        slot = np.searchsorted(self.keys, keys)
+        found = (slot < len(self.keys)) & (self.keys[np.minimum(slot, len(self.keys) - 1)] == keys) & (keys >= 0)
+        slot = np.where(found, slot, 0)
+        return np.where(found, self.starts[slot], 0), np.where(found, self.starts[slot + 1], 0)
+
+    def _ring_cells(self, reach):
+        return min((2 * reach + 1) ** 3, len(self.keys))
+
+    def _block(self, reach):
+        """Queries per block so a block's candidates stay within ``CANDIDATE_BUDGET``."""
+        per_query = self._ring_cells(reach) * len(self.points) / max(len(self.keys), 1)
+        return max(1, int(CANDIDATE_BUDGET // max(per_query, 1)))
+
+    def _home_cells(self, queries):
+        """Cell of each query, clamped into the grid so outside queries start at its boundary."""
+        return np.clip(self.cell_coords(queries), 0, self.dims - 1)
+
+    def _candidates(self, cells, reach, box=None):
+        """(query row, point index) for every point in the cells within ``reach`` of each query's cell.
+
+        ``box`` ((Q, 3) low and high cell coordinates) skips the ring cells
+        outside each query's own search box.
+        """
+        if (2 * reach + 1) ** 3 > len(self.keys):
+            # The ring holds more cells than are occupied: every point is a candidate.
+            rows = np.repeat(np.arange(len(cells)), len(self.points))
+            return rows, np.tile(np.arange(len(self.points)), len(cells))
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps, steps, indexing="ij"), axis=-1).reshape(-1, 3)
+        ring = cells[:, None, :] + offsets
+        keys = self.cell_keys(ring)
+        if box is not None:
+            inside = np.all((ring >= box[0][:, None, :]) & (ring <= box[1][:, None, :]), axis=-1)
+            keys = np.where(inside, keys, -1)
+        starts, stops = self._cell_ranges(keys.ravel())
+        rows, flat = _expand(starts, stops)
+        return rows // len(offsets), self.order[flat]
+
+    def _ring_bound(self, queries, cells, reach):
+        """Distance from each query below which every point lies inside its ring.
+
+        A point outside the ring is beyond one of the ring's faces that is
+        not on the grid boundary (nothing lies past those).
+        """
+        lo = self.origin + np.maximum(cells - reach, 0) * self.cell
+        hi = self.origin + np.minimum(cells + reach + 1, self.dims) * self.cell
+        low = np.where(cells - reach > 0, queries - lo, np.inf)
+        high = np.where(cells + reach + 1 < self.dims, hi - queries, np.inf)
+        return np.minimum(low, high).min(axis=1)
+
+    def radius(self, queries, r):
+        """Points within ``r`` of each query: (offsets (Q + 1), indices, distances), nearest first."""
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        reach = max(1, int(np.ceil(r / self.cell)))
+        rows, indices, distances = [], [], []
+        step = self._block(reach)
+        for start in range(0, len(queries), step):
+            block = queries[start:start + step]
+            box = (self.cell_coords(block - r), self.cell_coords(block + r))
+            row, index = self._candidates(self.cell_coords(block), reach, box)
+            d = np.linalg.norm(self.points[index] - block[row], axis=1)
+            keep = d <= r
+            row, index, d = row[keep], index[keep], d[keep]
+            order = np.lexsort((index, d, row))
+            rows.append(row[order] + start)
+            indices.append(index[order])
+            distances.append(d[order])
+        if not rows:
+            return np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        return _csr(np.concatenate(rows), len(queries), np.concatenate(indices), np.concatenate(distances))
+
+    def pairs(self, r):
+        """(i, j) with i < j for every pair of indexed points within ``r`` of each other."""
+        offsets, indices, _ = self.radius(self.points, r)
+        i = np.repeat(np.arange(len(self.points)), np.diff(offsets))
+        keep = i < indices
+        return np.stack([i[keep], indices[keep]], axis=1)
+
+    def knn(self, queries, k):
+        """(distances (Q, k), indices (Q, k)) of the ``k`` nearest points; -1 / inf pad short rows.
+
+        Each query widens its ring of cells until its k-th distance is
+        within the ring, so dense regions stop after one ring.
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        distances = np.full((len(queries), k), np.inf)
+        indices = np.full((len(queries), k), -1, dtype=np.int64)
+        cells = self._home_cells(queries)
+        pending = np.arange(len(queries))
+        reach = 1
+        while len(pending):
+            step = self._block(reach)
+            for start in range(0, len(pending), step):
+                rows = pending[start:start + step]
+                row, index = self._candidates(cells[rows], reach)
+                d, index = _top_k(row, index, np.linalg.norm(self.points[index] - queries[rows][row], axis=1),
+                                  len(rows), k)
+                distances[rows], indices[rows] = d, index
+            if (2 * reach + 1) ** 3 > len(self.keys):
+                break
+            bound = self._ring_bound(queries[pending], cells[pending], reach)
+            pending = pending[distances[pending, k - 1] > bound]
+            reach *= 2
+        return distances, indices
+
+    def near_segments(self, heads, tails, r):
+        """Points within ``r`` of each segment: (offsets (S + 1), indices, distances)."""
+        heads = np.asarray(heads, dtype=np.float64).reshape(-1, 3)
+        tails = np.asarray(tails, dtype=np.float64).reshape(-1, 3)
+        rows, indices, distances = [], [], []
+        for s, (head, tail) in enumerate(zip(heads, tails)):
+            lo = np.maximum(self.cell_coords(np.minimum(head, tail) - r), 0)
+            hi = np.minimum(self.cell_coords(np.maximum(head, tail) + r), self.dims - 1)
+            if np.any(hi < lo):
+                continue
+            axes = [np.arange(a, b + 1) for a, b in zip(lo, hi)]
+            cells = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+            starts, stops = self._cell_ranges(self.cell_keys(cells))
+            index = self.order[_expand(starts, stops)[1]]
+            d = point_segment_distance(self.points[index], head[None], tail[None])[:, 0]
+            keep = d <= r
+            order = np.argsort(d[keep], kind="stable")
+            indices.append(index[keep][order])
+            distances.append(d[keep][order])
+            rows.append(np.full(keep.sum(), s))
+        if not rows:
+            return np.zeros(len(heads) + 1, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        return _csr(np.concatenate(rows), len(heads), np.concatenate(indices), np.concatenate(distances))
+
+
+_grids = OrderedDict()
+
+
+def index_for(points, cell=None, use_cache=True):
+    """The ``SpatialGrid`` of this exact point array: from memory, the stage cache, or built and stored."""
+    key = make_key(STAGE, INDEX_VERSION, points_digest(points), cell)
+    if key in _grids:
+        _grids.move_to_end(key)
+        return _grids[key]
+    cache = StageCache(STAGE) if use_cache else None
+    entry = cache.get(key) if cache else None
+    if entry is not None:
+        grid = SpatialGrid.load(entry / "grid.npz")
+    else:
+        grid = SpatialGrid(points, cell)
+        if cache:
+            with tempfile.TemporaryDirectory(prefix="spatial-") as tmp:
+                path = Path(tmp) / "grid.npz"
+                grid.save(path)
+                cache.put(key, {"grid.npz": path}, meta={"points": len(grid.points), "cell": grid.cell})
+    _grids[key] = grid
+    while len(_grids) > CACHED_GRIDS:
+        _grids.popitem(last=False)
+    return grid
@@ -0,0 +1,74 @@
+"""Split animated models into a model GLB and a separate clip pack.
+
+    python3 -m pipeline split-anims assets/Ogrork_Goblimp_rigged.glb --publish
+
+``<Name>_rigged.glb`` keeps the meshes, armature and skin and goes to the
+enemies directory. ``<Name>_clips.glb`` holds only the skeleton and the
+actions and goes to the clips directory. ``anim-library`` reads it under the
+character name. Each file is published only if its bytes changed, so a clip
+edit ships kilobytes and the mesh is neither re-imported nor re-downloaded.
+"""
+
+import os
+from pathlib import Path
+
+from .blender_runner import WorkerPool
+from .config import CLIPS_DIR, ENEMIES_DIR
+from .publish import STAGING_DIR, publish
+from .report import Report
+from .rig import enemy_name
+
+STAGE = "split"
+CLIP_PACK_SUFFIX = "_clips"
+
+
+def make_job(source):
+    source = Path(source).resolve()
+    name = enemy_name(source).replace("_rigged", "")
+    out_dir = STAGING_DIR / STAGE / name
+    return {
+        "source": str(source),
+        "model": str(out_dir / f"{name}_rigged.glb"),
+        "clips": str(out_dir / f"{name}{CLIP_PACK_SUFFIX}.glb"),
+    }
+
+
+def split(sources, workers=None, report=None):
+    """Run the split stage over ``sources``; returns {source: result}."""
+    report = report or Report(STAGE)
+    jobs = [(STAGE, make_job(source)) for source in sources]
+    workers = workers or max(1, min(len(jobs), (os.cpu_count() or 2) // 2))
+    results = {}
+    with WorkerPool(workers) as pool:
+        for (_, job), result in pool.map_unordered(jobs):
+            name = Path(job["source"]).name
+            if not result["ok"]:
+                report.add(STAGE, name, result.get("seconds", 0.0), "failed")
+                print(f"✗ {name}\n{result['error']}")
+            else:
+                sizes = {key: Path(result[key]).stat().st_size for key in ("model", "clips")}
+                report.add(STAGE, name, result["seconds"], clips=len(result["actions"]),
+                           model_bytes=sizes["model"], clip_bytes=sizes["clips"])
+            results[job["source"]] = result
+    return results
+
+
+def register(subparsers):
+    p = subparsers.add_parser("split-anims", help="write mesh-plus-skin and skeleton-plus-actions GLBs separately")
+    p.add_argument("sources", nargs="+", type=Path, help="rigged, animated .glb files")
+    p.add_argument("-j", "--workers", type=int, help="warm Blender workers")
+    p.add_argument("--publish", action="store_true",
+                   help=f"publish models into {ENEMIES_DIR.name}/ and clip packs into {CLIPS_DIR.name}/")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    results = split(args.sources, args.workers, report)
+    if args.publish:
+        done = [r for r in results.values() if r["ok"]]
+        publish([r["model"] for r in done], ENEMIES_DIR, report=report)
+        publish([r["clips"] for r in done], CLIPS_DIR, report=report)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
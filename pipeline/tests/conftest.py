@@ -0,0 +1,12 @@
+import pytest
+
+from pipeline import cache, spatial
+
+
+@pytest.fixture(autouse=True)
+def stage_cache(tmp_path, monkeypatch):
+    """Keep cached stage entries (spatial grids) out of the real cache."""
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path / "cache")
+    spatial._grids.clear()
+    yield
+    spatial._grids.clear()
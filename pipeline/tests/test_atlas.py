@@ -0,0 +1,58 @@
+import struct
+
+import numpy as np
+import pytest
+
+from pipeline.atlas import DEFAULT_QUALITY, atlas_format, atlas_layout, jpeg_quality
+
+LUMINANCE = [
+    16, 11, 10, 16, 24, 40, 51, 61, 12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56, 14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77, 24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101, 72, 92, 95, 98, 112, 100, 103, 99,
+]
+
+
+@pytest.mark.parametrize("padding", [0, 4, 8])
+def test_layout_has_no_overlap_and_keeps_padding(padding):
+    rng = np.random.default_rng(1)
+    sizes = [tuple(int(v) for v in rng.integers(16, 300, 2)) for _ in range(30)]
+    (width, height), rects = atlas_layout(sizes, padding=padding)
+    assert width & (width - 1) == 0 and height & (height - 1) == 0
+    for (x, y, w, h), size in zip(rects, sizes):
+        assert (w, h) == size
+        assert 0 <= x and 0 <= y and x + w <= width and y + h <= height
+    for i, (x1, y1, w1, h1) in enumerate(rects):
+        for x2, y2, w2, h2 in rects[i + 1:]:
+            # Separated by at least two paddings along some axis.
+            gap_x = max(x2 - (x1 + w1), x1 - (x2 + w2))
+            gap_y = max(y2 - (y1 + h1), y1 - (y2 + h2))
+            assert max(gap_x, gap_y) >= 2 * padding
+
+
+def test_layout_rejects_what_does_not_fit():
+    with pytest.raises(ValueError):
+        atlas_layout([(300, 300)] * 4, padding=8, max_size=512)
+
+
+def jpeg_header(quality):
+    """SOI, an APP0 segment and libjpeg's scaled luminance table, then SOS."""
+    scale = 5000 // quality if quality < 50 else 200 - 2 * quality
+    table = bytes(min(max((q * scale + 50) // 100, 1), 255) for q in LUMINANCE)
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + bytes(9)
+    dqt = b"\xff\xdb" + struct.pack(">H", 67) + b"\x00" + table
+    return b"\xff\xd8" + app0 + dqt + b"\xff\xda" + struct.pack(">H", 2)
+
+
+@pytest.mark.parametrize("quality", [30, 50, 75, 85, 90, 95, 100])
+def test_jpeg_quality_reads_the_luminance_table(quality):
+    assert abs(jpeg_quality(jpeg_header(quality)) - quality) <= 1
+    assert jpeg_quality(b"\x89PNG\r\n\x1a\n") is None
+
+
+def test_atlas_keeps_the_source_compression():
+    assert atlas_format([("JPEG", jpeg_header(80)), ("JPEG", jpeg_header(92))]) == ("JPEG", 92)
+    assert atlas_format([("JPEG", jpeg_header(80)), ("WEBP", b"RIFF\0\0\0\0WEBPVP8 ")]) == ("WEBP", 80)
+    assert atlas_format([("WEBP", b"RIFF\0\0\0\0WEBPVP8 ")]) == ("WEBP", DEFAULT_QUALITY)
+    assert atlas_format([("WEBP", b"RIFF\0\0\0\0WEBPVP8L")])[0] == "PNG"
+    assert atlas_format([("JPEG", jpeg_header(80)), ("PNG", b"")]) == ("PNG", None)
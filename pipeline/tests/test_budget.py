@@ -0,0 +1,53 @@
+"""Byte attribution of a GLB built here: every byte lands in exactly one row."""
+
+import numpy as np
+
+from pipeline.budget import attribute, read_layout
+from pipeline.glb_images import write_glb
+
+
+def fixture_glb(path):
+    positions = np.random.default_rng(3).uniform(-1, 1, (7, 3)).astype(np.float32)
+    indices = np.array([0, 1, 2, 2, 3, 4, 4, 5, 6], dtype=np.uint16)  # 18 bytes: the view pads to 20
+    image = b"\x89PNG\r\n\x1a\n" + bytes(37)
+    blobs = [positions.tobytes(), indices.tobytes() + bytes(2), image]
+    views, offset = [], 0
+    for blob in blobs:
+        views.append({"buffer": 0, "byteOffset": offset, "byteLength": len(blob)})
+        offset += len(blob)
+    doc = {
+        "asset": {"version": "2.0"},
+        "buffers": [{"byteLength": offset}],
+        "bufferViews": views,
+        "accessors": [
+            {"bufferView": 0, "componentType": 5126, "count": 7, "type": "VEC3"},
+            {"bufferView": 1, "componentType": 5123, "count": 9, "type": "SCALAR"},
+        ],
+        "meshes": [{"name": "body", "primitives": [{"attributes": {"POSITION": 0}, "indices": 1}]}],
+        "images": [{"name": "skin", "bufferView": 2, "mimeType": "image/png"}],
+    }
+    write_glb(path, doc, b"".join(blobs))
+    return path
+
+
+def test_rows_sum_to_file_size(tmp_path):
+    path = fixture_glb(tmp_path / "enemy.glb")
+    rows = attribute(path)
+    assert all(size > 0 for size in rows.values())
+    assert sum(rows.values()) == path.stat().st_size
+    assert rows[("mesh", "body", "POSITION")] == 7 * 12
+    assert rows[("mesh", "body", "indices")] == 9 * 2
+    assert rows[("image", "skin", "image/png")] == 45
+    assert rows[("padding", "buffer views", "")] == 2
+    # write_glb pads BIN to 4 bytes: 84 + 20 + 45 = 149 -> 152.
+    assert rows[("padding", "buffers", "")] == 3
+    assert rows[("container", "GLB headers", "")] == 12 + 8 + 8
+
+
+def test_layout_matches_chunks(tmp_path):
+    path = fixture_glb(tmp_path / "enemy.glb")
+    doc, sizes, json_bytes = read_layout(path)
+    assert sizes == [152]
+    assert doc["meshes"][0]["name"] == "body"
+    assert json_bytes % 4 == 0
+    assert 12 + 8 + json_bytes + 8 + 152 == path.stat().st_size
@@ -0,0 +1,124 @@
+"""Weight diffusion against dense reference solves, and its operator cache."""
+
+import numpy as np
+import pytest
+
+from pipeline import diffusion
+from pipeline.cache import StageCache, make_key
+
+pytest.importorskip("scipy")
+
+
+def tube(rings=12, segments=10, radius=0.2, height=2.0):
+    """Open cylinder around the z axis, with jittered vertices so the cotangents differ."""
+    angle = np.linspace(0.0, 2 * np.pi, segments, endpoint=False)
+    z = np.linspace(0.0, height, rings)
+    points = np.array([(radius * np.cos(a), radius * np.sin(a), h) for h in z for a in angle])
+    points += np.random.default_rng(5).normal(0.0, 0.01, points.shape)
+    triangles = []
+    for r in range(rings - 1):
+        for s in range(segments):
+            a, b = r * segments + s, r * segments + (s + 1) % segments
+            c, d = a + segments, b + segments
+            triangles += [(a, b, d), (a, d, c)]
+    return points, np.array(triangles)
+
+
+BONES = (np.array([[0.0, 0.0, 0.0], [0.0, 0.0, 1.0]]), np.array([[0.0, 0.0, 1.0], [0.0, 0.0, 2.0]]))
+
+
+@pytest.fixture(autouse=True)
+def fresh_meshes():
+    diffusion._meshes.clear()
+    yield
+    diffusion._meshes.clear()
+
+
+def dense_laplacian(points, triangles):
+    """Cotangent Laplacian and lumped masses, one triangle corner at a time."""
+    count = len(points)
+    laplacian, mass = np.zeros((count, count)), np.zeros(count)
+    for tri in triangles:
+        for corner in range(3):
+            i, j, k = tri[corner], tri[(corner + 1) % 3], tri[(corner + 2) % 3]
+            u, v = points[i] - points[k], points[j] - points[k]
+            cot = u @ v / np.linalg.norm(np.cross(u, v))
+            laplacian[i, j] += 0.5 * cot
+            laplacian[j, i] += 0.5 * cot
+        mass[tri] += np.linalg.norm(np.cross(points[tri[1]] - points[tri[0]], points[tri[2]] - points[tri[0]])) / 6
+    laplacian -= np.diag(laplacian.sum(axis=1))
+    return laplacian, mass
+
+
+def dense_bone_weights(points, triangles, heads, tails):
+    laplacian, mass = dense_laplacian(points, triangles)
+    dist = diffusion.point_segment_distance(points, heads, tails)
+    nearest = dist.argmin(axis=1)
+    scale = np.ptp(points, axis=0).max()
+    mh = mass / np.maximum(dist.min(axis=1), diffusion.MIN_DISTANCE * scale) ** 2
+    rhs = np.zeros((len(points), len(heads)))
+    rhs[np.arange(len(points)), nearest] = mh
+    return diffusion.normalize(np.linalg.solve(np.diag(mh) - laplacian, rhs)), laplacian, mass
+
+
+def test_laplacian_matches_dense_assembly():
+    points, triangles = tube()
+    laplacian, mass = diffusion.cotangent_laplacian(points, triangles)
+    reference, reference_mass = dense_laplacian(points, triangles)
+    np.testing.assert_allclose(laplacian.toarray(), reference, atol=1e-12)
+    np.testing.assert_allclose(mass, reference_mass, rtol=1e-12)
+    np.testing.assert_allclose(laplacian.toarray(), laplacian.toarray().T, atol=1e-12)
+    np.testing.assert_allclose(np.asarray(laplacian.sum(axis=1)).ravel(), 0.0, atol=1e-12)
+
+
+def test_bone_weights_match_dense_solve():
+    points, triangles = tube()
+    heads, tails = BONES
+    weights = diffusion.MeshDiffusion(points, triangles).bone_weights(heads, tails)
+    reference, _, _ = dense_bone_weights(points, triangles, heads, tails)
+    np.testing.assert_allclose(weights, reference, atol=1e-10)
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
+    # The bottom ring follows the lower bone, the top ring the upper one.
+    assert weights[:10, 0].min() > 0.9 and weights[-10:, 1].min() > 0.9
+
+
+def test_smooth_matches_dense_solve():
+    points, triangles = tube()
+    mesh = diffusion.MeshDiffusion(points, triangles)
+    weights = mesh.bone_weights(*BONES)
+    _, laplacian, mass = dense_bone_weights(points, triangles, *BONES)
+    step = (0.01 * mesh.scale) ** 2
+    reference = weights
+    for _ in range(2):
+        reference = np.linalg.solve(np.diag(mass) - step * laplacian, mass[:, None] * reference)
+    np.testing.assert_allclose(mesh.smooth(weights, passes=2), diffusion.normalize(reference), atol=1e-10)
+
+
+def test_operators_round_trip_through_the_stage_cache(monkeypatch):
+    points, triangles = tube()
+    digest = diffusion.mesh_digest(points, triangles)
+    laplacian, mass = diffusion.operators_for(points, triangles, digest)
+    entry = StageCache(diffusion.STAGE).get(make_key(diffusion.STAGE, diffusion.LAPLACIAN_VERSION, digest))
+    assert entry is not None and (entry / "laplacian.npz").exists()
+
+    monkeypatch.setattr(diffusion, "cotangent_laplacian", None)  # a second assembly would fail
+    cached_laplacian, cached_mass = diffusion.operators_for(points, triangles, digest)
+    assert (cached_laplacian != laplacian).nnz == 0
+    np.testing.assert_array_equal(cached_mass, mass)
+    weights = diffusion.MeshDiffusion(points, triangles, (cached_laplacian, cached_mass)).bone_weights(*BONES)
+    fresh = diffusion.MeshDiffusion(points, triangles, (laplacian, mass)).bone_weights(*BONES)
+    np.testing.assert_array_equal(weights, fresh)
+
+
+def test_for_mesh_reuses_the_factorization():
+    points, triangles = tube()
+    mesh = diffusion.for_mesh(points, triangles)
+    first = mesh.bone_weights(*BONES)
+    factor = next(iter(mesh._factors.values()))
+    assert diffusion.for_mesh(points.copy(), triangles.copy()) is mesh
+    np.testing.assert_array_equal(mesh.bone_weights(*BONES), first)
+    assert len(mesh._factors) == 1 and next(iter(mesh._factors.values())) is factor
+
+    indices, weights = diffusion.diffused_weights(points, triangles, *BONES)
+    np.testing.assert_array_equal(indices[np.arange(len(indices)), weights.argmax(axis=1)], first.argmax(axis=1))
+    np.testing.assert_allclose(weights.sum(axis=1), 1.0)
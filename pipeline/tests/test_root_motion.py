@@ -0,0 +1,71 @@
+"""Root-motion extraction: the in-place channels plus yaw and translation rebuild the pose."""
+
+import numpy as np
+import pytest
+
+from pipeline.root_motion import (axis_angle_quat, extract, matrix_quat, quat_multiply, summarize,
+                                  twist_angle)
+
+UP = np.array([0.0, 0.0, 1.0])
+
+
+def random_rest(rng):
+    q, r = np.linalg.qr(rng.normal(size=(3, 3)))
+    q *= np.sign(np.diag(r))
+    return q if np.linalg.det(q) > 0 else -q
+
+
+def walking_clips(rng, frames=(40, 25)):
+    """Two clips that drift over the ground and turn more than a full circle."""
+    clips = np.repeat(np.arange(len(frames)), frames)
+    count = len(clips)
+    locations = np.cumsum(rng.normal(0.0, 0.05, (count, 3)), axis=0)
+    turn = np.concatenate([np.linspace(0.0, 7.0, n) for n in frames])
+    wobble = axis_angle_quat(rng.normal(size=3), rng.normal(0.0, 0.3, count))
+    rotations = quat_multiply(axis_angle_quat(UP, turn), wobble)
+    return locations, rotations, clips
+
+
+def same_rotation(a, b):
+    # q and -q are the same rotation.
+    return np.minimum(np.abs(a - b).max(axis=-1), np.abs(a + b).max(axis=-1))
+
+
+def test_extract_round_trip():
+    rng = np.random.default_rng(2)
+    locations, rotations, clips = walking_clips(rng)
+    rest, head = random_rest(rng), rng.normal(size=3)
+    out = extract(locations, rotations, clips, head, rest, UP)
+
+    rest_quat = matrix_quat(rest)
+    position = head + locations @ rest.T
+    rebuilt = head + out["locations"] @ rest.T + out["translation"]
+    np.testing.assert_allclose(rebuilt, position, atol=1e-12)
+    armature_rot = quat_multiply(rest_quat, rotations)
+    rebuilt_rot = quat_multiply(axis_angle_quat(UP, out["yaw"]), quat_multiply(rest_quat, out["rotations"]))
+    assert same_rotation(rebuilt_rot, armature_rot).max() < 1e-12
+
+    first = np.searchsorted(clips, clips)
+    # Motion starts at zero in every clip and stays on the ground plane.
+    np.testing.assert_allclose(out["translation"][first], 0.0, atol=1e-15)
+    np.testing.assert_allclose(out["yaw"][first], 0.0, atol=1e-15)
+    np.testing.assert_allclose(out["translation"] @ UP, 0.0, atol=1e-12)
+    # In place, the bone keeps its first frame's ground position and heading.
+    in_place = head + out["locations"] @ rest.T
+    np.testing.assert_allclose(in_place - in_place @ np.outer(UP, UP),
+                               (position - position @ np.outer(UP, UP))[first], atol=1e-12)
+    in_place_yaw = twist_angle(quat_multiply(rest_quat, out["rotations"]), UP)
+    np.testing.assert_allclose(np.angle(np.exp(1j * (in_place_yaw - in_place_yaw[first]))), 0.0, atol=1e-9)
+    # The unwrapped yaw keeps counting past a full turn.
+    assert out["yaw"].max() > 2 * np.pi
+
+
+@pytest.mark.parametrize("closed", [True, False])
+def test_summarize_detects_loops(closed):
+    times = np.linspace(0.0, 2.0, 9)
+    angle = np.linspace(0.0, 2 * np.pi if closed else np.pi, 9)
+    translation = np.column_stack([np.sin(angle), 1.0 - np.cos(angle), np.zeros(9)])
+    summary = summarize(times, translation, np.zeros(9))
+    assert summary["returns_to_start"] is closed
+    assert summary["duration"] == 2.0
+    assert summary["speed"] == pytest.approx(summary["distance"] / 2.0)
@@ -0,0 +1,121 @@
+"""SpatialGrid queries and welding, checked against brute force."""
+
+import numpy as np
+import pytest
+
+from pipeline import spatial
+from pipeline.spatial import SpatialGrid, index_for
+from pipeline.weights import point_segment_distance
+from pipeline.weld import weld_map
+
+
+def point_sets():
+    rng = np.random.default_rng(7)
+    uniform = rng.uniform(-1.0, 1.0, (600, 3))
+    # A dense core plus sparse outliers, and a flat sheet: the cell size adapts to both.
+    clustered = np.concatenate([rng.normal(0.0, 0.05, (500, 3)), rng.uniform(-2.0, 2.0, (60, 3))])
+    sheet = np.column_stack([rng.uniform(0, 1, (400, 2)), np.zeros(400)])
+    return {"uniform": uniform, "clustered": clustered, "sheet": sheet}
+
+
+POINTS = point_sets()
+
+
+def queries_for(points):
+    rng = np.random.default_rng(11)
+    lo, hi = points.min(axis=0), points.max(axis=0)
+    # Inside the bounds, on indexed points, and well outside the grid.
+    return np.concatenate([rng.uniform(lo, hi, (40, 3)), points[:10], hi + rng.uniform(0.5, 2.0, (10, 3))])
+
+
+def rows(offsets, indices):
+    return [set(indices[offsets[q]:offsets[q + 1]].tolist()) for q in range(len(offsets) - 1)]
+
+
+@pytest.mark.parametrize("name", POINTS)
+@pytest.mark.parametrize("r", [0.05, 0.3])
+def test_radius_matches_brute_force(name, r):
+    points = POINTS[name]
+    queries = queries_for(points)
+    offsets, indices, distances = SpatialGrid(points).radius(queries, r)
+    dist = np.linalg.norm(queries[:, None] - points[None], axis=2)
+    assert rows(offsets, indices) == [set(np.flatnonzero(d <= r).tolist()) for d in dist]
+    for q in range(len(queries)):
+        found = distances[offsets[q]:offsets[q + 1]]
+        assert np.all(np.diff(found) >= 0)
+        np.testing.assert_allclose(found, dist[q, indices[offsets[q]:offsets[q + 1]]])
+
+
+@pytest.mark.parametrize("name", POINTS)
+@pytest.mark.parametrize("k", [1, 8])
+def test_knn_matches_brute_force(name, k):
+    points = POINTS[name]
+    queries = queries_for(points)
+    distances, indices = SpatialGrid(points).knn(queries, k)
+    dist = np.linalg.norm(queries[:, None] - points[None], axis=2)
+    np.testing.assert_allclose(distances, np.sort(dist, axis=1)[:, :k])
+    np.testing.assert_allclose(np.take_along_axis(dist, indices, axis=1), distances)
+
+
+def test_knn_pads_short_rows():
+    distances, indices = SpatialGrid(POINTS["uniform"][:3]).knn(np.zeros((1, 3)), 5)
+    assert np.all(indices[0, 3:] == -1) and np.all(np.isinf(distances[0, 3:]))
+
+
+@pytest.mark.parametrize("name", POINTS)
+def test_pairs_match_brute_force(name):
+    points = POINTS[name]
+    r = 0.1
+    found = SpatialGrid(points).pairs(r)
+    i, j = np.nonzero(np.triu(np.linalg.norm(points[:, None] - points[None], axis=2) <= r, k=1))
+    assert set(map(tuple, found.tolist())) == set(zip(i.tolist(), j.tolist()))
+
+
+@pytest.mark.parametrize("name", POINTS)
+def test_near_segments_match_brute_force(name):
+    points = POINTS[name]
+    rng = np.random.default_rng(3)
+    heads, tails = rng.uniform(-1.0, 1.0, (6, 3)), rng.uniform(-1.0, 1.0, (6, 3))
+    r = 0.2
+    offsets, indices, distances = SpatialGrid(points).near_segments(heads, tails, r)
+    dist = point_segment_distance(points, heads, tails).T
+    assert rows(offsets, indices) == [set(np.flatnonzero(d <= r).tolist()) for d in dist]
+    for s in range(len(heads)):
+        np.testing.assert_allclose(distances[offsets[s]:offsets[s + 1]], dist[s, indices[offsets[s]:offsets[s + 1]]])
+
+
+def test_index_for_reloads_cached_grid():
+    points = POINTS["clustered"]
+    grid = index_for(points)
+    spatial._grids.clear()
+    cached = index_for(points)
+    assert cached is not grid
+    for name, value in grid.arrays().items():
+        np.testing.assert_array_equal(cached.arrays()[name], value)
+
+
+def test_weld_merges_pair_across_cell_boundary():
+    tolerance = 1e-5
+    # The pair straddles x = 0.5 * tolerance, where rounding to a tolerance grid splits it.
+    positions = np.array([[0.49e-5, 0.0, 0.0], [0.51e-5, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.0]])
+    target, count = weld_map(positions, tolerance)
+    assert target.tolist() == [0, 0, 2, 3]
+    assert count == 3
+
+
+def test_weld_matches_brute_force_components():
+    rng = np.random.default_rng(5)
+    base = rng.uniform(0.0, 1.0, (200, 3))
+    positions = np.concatenate([base, base[:80] + rng.normal(0.0, 2e-4, (80, 3))])
+    tolerance = 1e-3
+    target, count = weld_map(positions, tolerance)
+    close = np.linalg.norm(positions[:, None] - positions[None], axis=2) <= tolerance
+    # Transitive closure by repeated label propagation.
+    labels = np.arange(len(positions))
+    while True:
+        spread = np.where(close, labels[None, :], len(positions)).min(axis=1)
+        if np.array_equal(spread, labels):
+            break
+        labels = spread
+    assert target.tolist() == labels.tolist()
+    assert count == len(np.unique(labels))
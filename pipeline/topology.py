@@ -0,0 +1,139 @@
+"""Mesh topology checks on plain NumPy arrays (triangles as (T, 3) vertex indices).
+
+``inspect`` finds everything that makes bone-heat weighting fail on
+generated meshes:
+
+* degenerate triangles (repeated corners) and zero-area faces;
+* loose vertices that no face uses;
+* non-manifold edges shared by more than two faces;
+* disconnected micro-islands (specks, floating shards).
+"""
+
+import numpy as np
+
+THRESHOLDS = {
+    # Relative to the squared largest extent of the model.
+    "min_area": 1e-12,
+    # An island is "micro" below both limits.
+    "island_vertices": 0.002,
+    "island_extent": 0.01,
+}
+
+
+def edge_face_counts(triangles):
+    """(unique edges (E, 2), number of triangles using each edge).
+
+    Edges are packed into one int64 key each, which ``np.unique`` sorts much
+    faster than rows.
+    """
+    triangles = np.asarray(triangles, dtype=np.int64)
+    edges = np.concatenate([triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]])
+    edges.sort(axis=1)
+    base = int(edges.max()) + 1 if len(edges) else 1
+    keys, counts = np.unique(edges[:, 0] * base + edges[:, 1], return_counts=True)
+    return np.stack([keys // base, keys % base], axis=1), counts
+
+
+def unique_edges(triangles):
+    return edge_face_counts(triangles)[0]
+
+
+def connected_components(count, edges):
+    """Component label per vertex; SciPy when available, else label propagation."""
+    try:
+        from scipy.sparse import coo_matrix
+        from scipy.sparse.csgraph import connected_components as cc
+    except ImportError:
+        labels = np.arange(count)
+        while True:
+            low = np.minimum(labels[edges[:, 0]], labels[edges[:, 1]])
+            before = labels.copy()
+            np.minimum.at(labels, edges[:, 0], low)
+            np.minimum.at(labels, edges[:, 1], low)
+            labels = labels[labels]
+            if np.array_equal(labels, before):
+                return labels
+    graph = coo_matrix((np.ones(len(edges)), (edges[:, 0], edges[:, 1])), shape=(count, count))
+    return cc(graph, directed=False)[1]
+
+
+def triangle_areas(points, triangles):
+    a, b, c = points[triangles[:, 0]], points[triangles[:, 1]], points[triangles[:, 2]]
+    return 0.5 * np.linalg.norm(np.cross(b - a, c - a), axis=1)
+
+
+def islands(vertex_count, triangles):
+    """Compact island label per vertex; loose vertices get their own labels."""
+    labels = connected_components(vertex_count, unique_edges(triangles)) if len(triangles) else \
+        np.arange(vertex_count)
+    return np.unique(labels, return_inverse=True)[1].ravel()
+
+
+def micro_islands(points, labels, used, limits):
+    """Labels of face-bearing islands that are tiny both in vertex count and in extent."""
+    count = labels.max() + 1
+    sizes = np.bincount(labels, minlength=count)
+    has_faces = np.bincount(labels, weights=used, minlength=count) > 0
+    lo = np.full((count, 3), np.inf)
+    hi = np.full((count, 3), -np.inf)
+    np.minimum.at(lo, labels, points)
+    np.maximum.at(hi, labels, points)
+    extent = float(np.ptp(points, axis=0).max()) or 1.0
+    island_extent = (hi - lo).max(axis=1) / extent
+    tiny = has_faces & (sizes < limits["island_vertices"] * len(points)) & (island_extent < limits["island_extent"])
+    # Never flag the largest island, however small the model.
+    tiny[sizes.argmax()] = False
+    return np.flatnonzero(tiny)
+
+
+def inspect(points, triangles, thresholds=None):
+    """Cleanliness report plus the offending elements.
+
+    Returns (report, problems): ``report`` holds plain counts; ``problems``
+    holds index arrays for ``degenerate`` triangles, ``loose`` vertices,
+    ``non_manifold`` edges (as (E, 2) vertex pairs) and ``micro_island``
+    vertices.
+    """
+    limits = {**THRESHOLDS, **(thresholds or {})}
+    points = np.asarray(points, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    extent = float(np.ptp(points, axis=0).max()) if len(points) else 1.0
+
+    repeated = ((triangles[:, 0] == triangles[:, 1]) | (triangles[:, 1] == triangles[:, 2])
+                | (triangles[:, 2] == triangles[:, 0]))
+    zero_area = triangle_areas(points, triangles) <= limits["min_area"] * extent ** 2
+    degenerate = np.flatnonzero(repeated | zero_area)
+
+    used = np.zeros(len(points), dtype=bool)
+    used[triangles.ravel()] = True
+    loose = np.flatnonzero(~used)
+
+    edges, counts = edge_face_counts(triangles)
+    non_manifold = edges[counts > 2]
+    boundary = int(np.count_nonzero(counts == 1))
+
+    labels = islands(len(points), triangles)
+    tiny = micro_islands(points, labels, used, limits)
+    micro_vertices = np.flatnonzero(np.isin(labels, tiny))
+
+    report = {
+        "vertices": int(len(points)),
+        "triangles": int(len(triangles)),
+        "degenerate_triangles": int(np.count_nonzero(repeated)),
+        "zero_area_triangles": int(np.count_nonzero(zero_area & ~repeated)),
+        "loose_vertices": int(len(loose)),
+        "non_manifold_edges": int(len(non_manifold)),
+        "boundary_edges": boundary,
+        "islands": int(len(np.unique(labels[used]))),
+        "micro_islands": int(len(tiny)),
+        "micro_island_vertices": int(len(micro_vertices)),
+    }
+    problems = {"degenerate": degenerate, "loose": loose, "non_manifold": non_manifold,
+                "micro_island": micro_vertices}
+    return report, problems
+
+
+def is_clean(report, islands=True):
+    """No problems left; micro-islands count only with ``islands`` (they may be kept on purpose)."""
+    keys = ("degenerate_triangles", "zero_area_triangles", "loose_vertices", "non_manifold_edges")
+    return not any(report[k] for k in keys + (("micro_islands",) if islands else ()))
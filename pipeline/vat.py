@@ -0,0 +1,58 @@
+from pathlib import Path
+
+from .blender_runner import run_stage
+from .config import ENEMIES_DIR
+from .publish import STAGING_DIR, publish_with_sidecars
+from .report import Report
+from .rig import enemy_name
+
+STAGE = "vat"
+VAT_DIR = ENEMIES_DIR / "vat"
+
+
+def bake(source, name=None, actions=None, fps=15, max_width=4096, output_dir=None, report=None):
+    report = report or Report(STAGE)
+    source = Path(source).resolve()
+    name = name or enemy_name(source).replace("_rigged", "")
+    job = {
+        "source": str(source),
+        "output_dir": str(output_dir or STAGING_DIR / "vat" / name),
+        "name": name,
+        "actions": actions,
+        "fps": fps,
+        "max_width": max_width,
+    }
+    with report.timed(STAGE, source.name) as entry:
+        result = run_stage(STAGE, job)
+        if not result["ok"]:
+            entry["status"] = "failed"
+            print(result["error"])
+        else:
+            entry.update(vertices=result["vertex_count"], width=result["width"], height=result["height"],
+                         clips=len(result["clips"]))
+    return result
+
+
+def publish_vat(files, dest_dir=VAT_DIR, report=None):
+    return publish_with_sidecars(files, dest_dir, report=report)
+
+
+def register(subparsers):
+    p = subparsers.add_parser("vat", help="bake clips into vertex animation textures for instanced crowds")
+    p.add_argument("source", type=Path, help="rigged, animated .glb")
+    p.add_argument("--name", help="output basename (default: enemy name)")
+    p.add_argument("--actions", nargs="+", help="actions to bake (default: all)")
+    p.add_argument("--fps", type=float, default=15, help="samples per second")
+    p.add_argument("--max-width", type=int, default=4096)
+    p.add_argument("--publish", action="store_true", help=f"publish into {VAT_DIR}")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    result = bake(args.source, args.name, args.actions, args.fps, args.max_width, report=report)
+    if result["ok"] and args.publish:
+        publish_vat(result["files"], report=report)
+    report.print_summary()
+    report.write()
+    return 0 if result["ok"] else 1
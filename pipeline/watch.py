@@ -0,0 +1,140 @@
+"""Watch mode: rebuild only the enemies and clips whose sources changed.
+
+Polls the asset directories (no extra dependency, works the same on every
+OS), waits for a quiet period so a burst of writes becomes one batch, maps
+each changed file to its stage job and feeds the batch to warm Blender
+workers. Results print as each job finishes; changed outputs are published
+and imported into Godot at the end of the batch.
+"""
+
+import os
+import re
+import time
+from pathlib import Path
+
+from . import godot_import, rig
+from .blender_runner import WorkerPool
+from .config import ASSETS_DIR, CLIPS_DIR, ENEMIES_DIR, find_godot
+from .publish import publish, staging_path
+from .report import Report
+
+STAGE = "watch"
+POLL_INTERVAL = 0.5
+DEBOUNCE = 1.5
+SOURCE_SUFFIXES = {".glb", ".gltf", ".fbx"}
+# Our own outputs may land in assets/ (legacy scripts, rig without --publish).
+OUTPUT_RE = re.compile(r"_rigged$")
+
+
+def clip_name(source):
+    return re.sub(r"\W+", "_", Path(source).stem).strip("_").lower()
+
+
+def snapshot(dirs):
+    state = {}
+    for d in map(Path, dirs):
+        if not d.is_dir():
+            continue
+        for p in d.rglob("*"):
+            if p.suffix.lower() in SOURCE_SUFFIXES and p.is_file():
+                st = p.stat()
+                state[p] = (st.st_size, st.st_mtime_ns)
+    return state
+
+
+def changed_paths(old, new):
+    return sorted(p for p, sig in new.items() if old.get(p) != sig)
+
+
+def wait_for_batch(dirs, previous, interval=POLL_INTERVAL, debounce=DEBOUNCE):
+    """Block until files change and then stay unchanged for ``debounce`` seconds.
+
+    Returns (changed paths, new snapshot).
+    """
+    current = previous
+    while True:
+        time.sleep(interval)
+        latest = snapshot(dirs)
+        if latest != current:
+            current = latest
+            settled_at = time.monotonic() + debounce
+            while time.monotonic() < settled_at:
+                time.sleep(interval)
+                latest = snapshot(dirs)
+                if latest != current:
+                    current = latest
+                    settled_at = time.monotonic() + debounce
+            changed = changed_paths(previous, current)
+            if changed:
+                return changed, current
+
+
+def plan(paths, weights="auto"):
+    """Map changed source files to (stage, job, publish destination)."""
+    jobs = []
+    for path in paths:
+        if OUTPUT_RE.search(path.stem):
+            continue
+        if path.suffix.lower() == ".fbx":
+            name = clip_name(path)
+            output = staging_path(f"{name}.glb")
+            jobs.append(("clip", {"source": str(path), "output": str(output), "name": name}, CLIPS_DIR))
+        else:
+            output = staging_path(rig.default_output(path).name)
+            jobs.append(("rig", rig.make_job(path, output, weights), ENEMIES_DIR))
+    return jobs
+
+
+def run_batch(pool, jobs, report, import_changes=True):
+    destinations = {job["output"]: dest for _, job, dest in jobs}
+    changed = []
+    for (stage, job), result in pool.map_unordered((stage, job) for stage, job, _ in jobs):
+        name = Path(job["source"]).name
+        if not result["ok"]:
+            report.add(stage, name, result.get("seconds", 0.0), "failed")
+            print(f"✗ {stage} {name}\n{result['error']}")
+            continue
+        report.add(stage, name, result["seconds"])
+        actions = publish([job["output"]], destinations[job["output"]], report=report)
+        changed += [dst for dst, action in actions.items() if action != "unchanged"]
+        print(f"✓ {stage} {name} in {result['seconds']:.2f}s ({', '.join(actions.values())})")
+    if changed and import_changes and find_godot():
+        godot_import.run(changed, report=report)
+    return changed
+
+
+def watch(dirs=None, workers=None, weights="auto", initial=False, import_changes=True):
+    dirs = dirs or [ASSETS_DIR]
+    workers = workers or max(1, min(4, (os.cpu_count() or 2) // 2))
+    state = {} if initial else snapshot(dirs)
+    print(f"Watching {', '.join(map(str, dirs))} with {workers} Blender worker(s). Ctrl+C to stop.")
+    with WorkerPool(workers) as pool:
+        try:
+            while True:
+                changed, state = wait_for_batch(dirs, state)
+                jobs = plan(changed, weights)
+                if not jobs:
+                    continue
+                print(f"\n{len(changed)} change(s) -> {len(jobs)} job(s)")
+                report = Report(STAGE)
+                start = time.perf_counter()
+                run_batch(pool, jobs, report, import_changes)
+                report.write()
+                print(f"Batch done in {time.perf_counter() - start:.2f}s")
+        except KeyboardInterrupt:
+            print("\nStopping watch")
+    return 0
+
+
+def register(subparsers):
+    p = subparsers.add_parser("watch", help="rebuild enemies and clips when source assets change")
+    p.add_argument("dirs", nargs="*", type=Path, help=f"directories to watch (default: {ASSETS_DIR})")
+    p.add_argument("-j", "--workers", type=int, help="warm Blender workers")
+    p.add_argument("--weights", choices=("auto", "vectorized", "root"), default="auto")
+    p.add_argument("--initial", action="store_true", help="build everything once before watching")
+    p.add_argument("--no-import", action="store_true", help="skip the Godot import after publishing")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    return watch(args.dirs, args.workers, args.weights, args.initial, not args.no_import)
@@ -0,0 +1,221 @@
+"""Pack each enemy's imported assets into its own web bundle, with a manifest.
+
+    python3 -m pipeline bundle
+    python3 -m pipeline bundle godot_fighter/battle-manager/enemies/ogrork_enemy.tscn
+
+A bundle is a ZIP that ``ProjectSettings.load_resource_pack`` mounts over
+``res://``. It holds what an exported game reads for an enemy scene: the
+scene, the text resources it references, and for every imported source
+(GLB, textures, clips) the ``.import`` remap and the ``.godot/imported``
+artifacts, never the source itself. A glTF's textures are found both ways
+they can exist: images Godot extracted from it, and image files it
+references by URI. Only files under the enemies and clips
+directories are bundled; scripts, the database and shared libraries stay
+in the main ``index.pck``.
+
+Bundles are named after their content hash and written to
+``public/godot/bundles/`` together with ``manifest.json`` ({scene: file,
+sha256, bytes, files}). ``EnemyBundles`` (``assets/globals/enemy_bundles.gd``)
+fetches the bundles of an encounter in parallel and caches them by hash.
+Entries are written in sorted order with fixed timestamps, so an unchanged
+enemy keeps its hash and stays cached in the browser.
+"""
+
+import hashlib
+import json
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import unquote
+
+from .cache import file_digest
+from .config import CLIPS_DIR, ENEMIES_DIR, GODOT_PROJECT, WEB_EXPORT_DIR, res_path
+from .errors import PipelineError
+from .godot import import_sidecar, read_import_file
+from .godot_import import IMPORTABLE_SUFFIXES
+from .gltf import parse_glb
+from .report import Report
+
+STAGE = "bundle"
+BUNDLES_DIR = WEB_EXPORT_DIR / "bundles"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+# Directories whose files belong to one enemy; everything else ships in index.pck.
+BUNDLED_ROOTS = (ENEMIES_DIR, CLIPS_DIR)
+TEXT_RESOURCES = {".tscn", ".tres"}
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp"}
+RES_PATH_RE = re.compile(r'"(res://[^"]+)"')
+ZIP_DATE = (2000, 1, 1, 0, 0, 0)
+
+
+def project_file(res):
+    return GODOT_PROJECT / res[len("res://"):]
+
+
+def bundled(path):
+    path = Path(path).resolve()
+    return any(path.is_relative_to(root.resolve()) for root in BUNDLED_ROOTS)
+
+
+def extracted_images(source):
+    """Images Godot extracted from a glTF, named ``<stem>_<image>.<ext>`` next to it."""
+    return sorted(p for p in source.parent.glob(f"{source.stem}_*")
+                  if p.suffix.lower() in IMAGE_SUFFIXES and p.is_file())
+
+
+def referenced_files(source):
+    """Files a glTF references by URI (``rig --images external`` images, .gltf buffers)."""
+    data = source.read_bytes()
+    doc = parse_glb(memoryview(data))[0] if source.suffix.lower() == ".glb" else json.loads(data)
+    uris = [item.get("uri") for key in ("images", "buffers") for item in doc.get(key, [])]
+    return sorted({(source.parent / unquote(uri)).resolve() for uri in uris
+                   if uri and not uri.startswith("data:")})
+
+
+def dependencies(scene):
+    """Bundled project files ``scene`` needs, following text resources and glTF images."""
+    scene = Path(scene).resolve()
+    found, pending = set(), [scene]
+    while pending:
+        path = pending.pop()
+        if path in found or (path != scene and not bundled(path)):
+            continue
+        if not path.is_file():
+            raise PipelineError(f"{res_path(path)} is referenced but missing")
+        found.add(path)
+        if path.suffix.lower() in TEXT_RESOURCES:
+            pending += [project_file(res).resolve() for res in RES_PATH_RE.findall(path.read_text())]
+        elif path.suffix.lower() in (".glb", ".gltf"):
+            pending += [p.resolve() for p in extracted_images(path)] + referenced_files(path)
+    return sorted(found)
+
+
+def exported_files(path):
+    """{res path: file} an exported game reads for ``path``: the file, or its remap and artifacts."""
+    if path.suffix.lower() not in IMPORTABLE_SUFFIXES:
+        return {res_path(path): path}
+    sidecar = import_sidecar(path)
+    info = read_import_file(sidecar)
+    artifacts = {res: project_file(res) for res in info.dest_files}
+    missing = [res for res, file in artifacts.items() if not file.is_file()]
+    if not info.exists or not artifacts or missing:
+        raise PipelineError(f"{res_path(path)} is not imported; run `python3 -m pipeline godot-import` first")
+    return {res_path(sidecar): sidecar, **artifacts}
+
+
+def write_bundle(files, path):
+    """Write a deterministic ZIP of {res path: file}."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(path, "w") as archive:
+        for res in sorted(files):
+            info = zipfile.ZipInfo(res[len("res://"):], date_time=ZIP_DATE)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            archive.writestr(info, files[res].read_bytes())
+
+
+def build_bundle(scene, out_dir):
+    scene = Path(scene).resolve()
+    files = {}
+    for path in dependencies(scene):
+        files.update(exported_files(path))
+    # Name by the inputs first, so an unchanged enemy is recognised before zipping.
+    inputs = hashlib.sha256()
+    for res in sorted(files):
+        inputs.update(res.encode() + b"\0" + file_digest(files[res]).encode() + b"\0")
+    final = out_dir / f"{scene.stem}-{inputs.hexdigest()[:16]}.zip"
+    if not final.is_file():
+        tmp = final.with_suffix(".zip.tmp")
+        write_bundle(files, tmp)
+        os.replace(tmp, final)
+    return {
+        "scene": res_path(scene),
+        "file": final.name,
+        "sha256": file_digest(final),
+        "bytes": final.stat().st_size,
+        "files": sorted(files),
+    }
+
+
+def discover(paths):
+    found = []
+    for path in map(Path, paths):
+        found += [path] if path.is_file() else sorted(path.glob("*.tscn"))
+    return [p.resolve() for p in found]
+
+
+def load_manifest(out_dir):
+    try:
+        return json.loads((Path(out_dir) / MANIFEST_NAME).read_text()).get("bundles", {})
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def write_manifest(bundles, out_dir):
+    """Merge ``bundles`` into the manifest and delete bundle files it no longer lists.
+
+    Entries of scenes that were not rebuilt are kept while their scene exists.
+    """
+    kept = {name: entry for name, entry in load_manifest(out_dir).items()
+            if project_file(entry["scene"]).is_file()}
+    manifest = {"version": MANIFEST_VERSION, "bundles": {**kept, **bundles}}
+    path = out_dir / MANIFEST_NAME
+    text = json.dumps(manifest, indent=2, sort_keys=True) + "\n"
+    if not path.is_file() or path.read_text() != text:
+        path.write_text(text)
+    listed = {b["file"] for b in manifest["bundles"].values()}
+    stale = [p for p in out_dir.glob("*.zip") if p.name not in listed]
+    for p in stale:
+        p.unlink()
+    return path, stale
+
+
+def bundle(scenes=None, out_dir=BUNDLES_DIR, workers=None, report=None):
+    """Build a bundle per scene (default: every enemy scene); returns {name: manifest entry}."""
+    report = report or Report(STAGE)
+    scenes = discover(scenes or [ENEMIES_DIR])
+    if not scenes:
+        raise PipelineError("no enemy scenes to bundle")
+    out_dir = Path(out_dir)
+
+    def timed(scene):
+        start = time.perf_counter()
+        try:
+            return build_bundle(scene, out_dir), time.perf_counter() - start
+        except PipelineError as exc:
+            return exc, time.perf_counter() - start
+
+    bundles = {}
+    with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 1) * 2)) as pool:
+        for scene, (result, seconds) in zip(scenes, pool.map(timed, scenes)):
+            if isinstance(result, PipelineError):
+                report.add(STAGE, scene.name, seconds, "failed", error=str(result))
+                print(f"✗ {scene.name}: {result}")
+                continue
+            bundles[scene.stem] = result
+            report.add(STAGE, scene.name, seconds, bytes=result["bytes"], files=len(result["files"]),
+                       bundle=result["file"])
+    if bundles:
+        path, stale = write_manifest(bundles, out_dir)
+        print(f"✓ {len(bundles)} bundle(s), {sum(b['bytes'] for b in bundles.values()) / 1e6:.2f} MB "
+              f"-> {path}" + (f" ({len(stale)} stale removed)" if stale else ""))
+    return bundles
+
+
+def register(subparsers):
+    p = subparsers.add_parser("bundle", help="pack each enemy scene into a hashed web bundle plus manifest")
+    p.add_argument("scenes", nargs="*", type=Path, help=f"enemy scenes or directories (default: {ENEMIES_DIR})")
+    p.add_argument("-o", "--output", type=Path, default=BUNDLES_DIR, help="bundle directory")
+    p.add_argument("-j", "--workers", type=int, help="bundles built at once")
+    p.set_defaults(func=main)
+
+
+def main(args):
+    report = Report(STAGE)
+    bundle(args.scenes, args.output, args.workers, report)
+    report.print_summary()
+    report.write()
+    return 1 if report.failed else 0
@@ -0,0 +1,71 @@
+"""Skin weight solving on plain NumPy arrays.
+
+Nothing here imports ``bpy``; the same code runs inside Blender (which ships
+NumPy) and in ordinary analysis processes.
+"""
+
+import numpy as np
+
+MAX_INFLUENCES = 4
+
+
+def point_segment_distance(points, heads, tails):
+    """Distances from every point to every segment, shape (len(points), len(heads))."""
+    points = np.asarray(points, dtype=np.float64)
+    heads = np.asarray(heads, dtype=np.float64)
+    tails = np.asarray(tails, dtype=np.float64)
+    dist = np.empty((len(points), len(heads)), dtype=np.float64)
+    for b, (a, d) in enumerate(zip(heads, tails - heads)):
+        length_sq = max(float(d @ d), 1e-12)
+        t = np.clip((points - a) @ d / length_sq, 0.0, 1.0)
+        closest = a + t[:, None] * d
+        dist[:, b] = np.linalg.norm(points - closest, axis=1)
+    return dist
+
+
+def top_k_normalized(scores, k=MAX_INFLUENCES, min_weight=1e-3):
+    """Keep the ``k`` largest scores per row and renormalise them to sum to one.
+
+    Returns (indices, weights), both shaped (rows, k).
+    """
+    k = min(k, scores.shape[1])
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    w = np.take_along_axis(scores, idx, axis=1)
+    w = np.where(w / np.maximum(w.max(axis=1, keepdims=True), 1e-12) < min_weight, 0.0, w)
+    w /= np.maximum(w.sum(axis=1, keepdims=True), 1e-12)
+    return idx, w
+
+
+def bone_segment_weights(points, heads, tails, k=MAX_INFLUENCES, falloff=4.0, scale=None):
+    """Inverse-distance weights of every point against every bone segment.
+
+    One pass over the whole (concatenated) vertex array; ``falloff`` is the
+    exponent applied to distances normalised by the scene size. Pass the
+    whole model's ``scale`` (largest bounds extent) when ``points`` is only
+    a chunk of it.
+    """
+    dist = point_segment_distance(points, heads, tails)
+    scale = scale or max(float(np.ptp(points, axis=0).max()), 1e-6)
+    scores = (dist / scale + 1e-4) ** -falloff
+    return top_k_normalized(scores, k)
+
+
+def quantize_groups(indices, weights, steps=255):
+    """Group vertices by (bone, quantised weight).
+
+    Blender's ``VertexGroup.add`` takes one weight per call, so writing
+    per-vertex weights costs one call per distinct weight instead of one per
+    vertex. Yields (bone, weight, vertex indices).
+    """
+    rows = np.repeat(np.arange(len(indices)), indices.shape[1])
+    bones = indices.ravel()
+    levels = np.rint(weights.ravel() * steps).astype(np.int64)
+    keep = levels > 0
+    rows, bones, levels = rows[keep], bones[keep], levels[keep]
+    order = np.lexsort((levels, bones))
+    rows, bones, levels = rows[order], bones[order], levels[order]
+    keys = bones * (steps + 1) + levels
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], len(keys)]
+    for s, e in zip(starts, ends):
+        yield int(bones[s]), levels[s] / steps, rows[s:e]
@@ -0,0 +1,85 @@
+"""Vertex welding on plain NumPy arrays.
+
+Generated meshes repeat vertices along every UV seam and normal split.
+Welding merges the vertices within the tolerance of each other (a radius
+query on the shared ``pipeline.spatial`` index) so each point in space
+becomes one vertex; UVs and normals stay per corner. The exporter then splits a vertex
+again only where a corner attribute really differs.
+"""
+
+import numpy as np
+
+from .spatial import index_for
+from .topology import connected_components
+
+
+def quantize(values, step):
+    return np.round(np.asarray(values, dtype=np.float64) / step).astype(np.int64)
+
+
+def unique_rows(keys):
+    """(first index of each row's group, group id per row, group count) for an (N, K) int array."""
+    keys = np.ascontiguousarray(keys)
+    packed = keys.view(np.dtype((np.void, keys.dtype.itemsize * keys.shape[1]))).ravel()
+    _, first, inverse = np.unique(packed, return_index=True, return_inverse=True)
+    return first, inverse.ravel(), len(first)
+
+
+def weld_map(positions, tolerance):
+    """Map every vertex to the lowest-index vertex it is welded to.
+
+    Vertices within ``tolerance`` of each other are welded, transitively;
+    unlike rounding to a grid, a pair straddling a cell boundary still
+    merges. Returns (representative index per vertex, number of welded
+    vertices).
+    """
+    count = len(positions)
+    labels = connected_components(count, index_for(positions).pairs(tolerance))
+    first = np.full(count, count, dtype=np.int64)
+    np.minimum.at(first, labels, np.arange(count))
+    return first[labels], int(len(np.unique(labels)))
+
+
+def split_count(corner_vertex, normals=None, uvs=None, normal_step=1e-3, uv_step=1e-5):
+    """Vertices an exporter emits: distinct (vertex, normal, UV) tuples over the corners."""
+    columns = [np.asarray(corner_vertex, dtype=np.int64)[:, None]]
+    if normals is not None:
+        columns.append(quantize(normals, normal_step))
+    if uvs is not None:
+        columns.append(quantize(uvs, uv_step))
+    return unique_rows(np.concatenate(columns, axis=1))[2]
+
+
+def merge_normals(corner_vertex, normals, vertex_count, max_angle):
+    """Smooth corner normals at vertices whose corners differ by less than ``max_angle`` (radians).
+
+    Real hard edges (a larger spread) keep their per-corner normals.
+    """
+    normals = np.asarray(normals, dtype=np.float64)
+    mean = np.zeros((vertex_count, 3))
+    np.add.at(mean, corner_vertex, normals)
+    mean /= np.maximum(np.linalg.norm(mean, axis=1, keepdims=True), 1e-12)
+    cos = np.einsum("ij,ij->i", normals, mean[corner_vertex])
+    worst = np.ones(vertex_count)
+    np.minimum.at(worst, corner_vertex, cos)
+    smooth = worst[corner_vertex] >= np.cos(max_angle)
+    return np.where(smooth[:, None], mean[corner_vertex], normals)
+
+
+def weld_indexed(positions, indices, normals=None, uvs=None, tolerance=1e-5, normal_step=1e-3, uv_step=1e-5):
+    """Weld an indexed (glTF-style) mesh: one vertex per welded position and distinct normal/UV.
+
+    Positions are welded with ``weld_map``, so this merges the same vertices
+    as the Blender weld. Returns (kept vertex rows, new index buffer with
+    degenerate triangles dropped); use ``positions[kept]`` etc. for the new
+    attribute arrays.
+    """
+    columns = [weld_map(positions, tolerance)[0][:, None]]
+    if normals is not None:
+        columns.append(quantize(normals, normal_step))
+    if uvs is not None:
+        columns.append(quantize(uvs, uv_step))
+    first, inverse, _ = unique_rows(np.concatenate(columns, axis=1))
+    tris = inverse[np.asarray(indices).reshape(-1, 3)]
+    valid = (tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) & (tris[:, 2] != tris[:, 0])
+    return first, tris[valid].astype(np.uint32)